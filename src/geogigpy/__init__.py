@@ -31,5 +31,7 @@ from feature import Feature
 from tree import Tree
 from diff import Diffentry
 from commit import Commit
+from pool import RepositoryPool
+from asyncrepo import AsyncRepository
 
 __version__ = "1.1-SNAPSHOT"
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    asyncrepo.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+
+import logging
+import threading
+from collections import deque
+from multiprocessing import TimeoutError
+from multiprocessing.pool import ThreadPool
+from repo import Repository
+
+DEFAULT_MAX_WORKERS = 8
+
+# Repository methods available in AsyncRepository objects
+ASYNC_METHODS = ["log", "diff", "children", "featuredata", "revparse", "synced", "pull", "push",
+                 "features", "blame", "versions", "featurediff", "show", "count"]
+
+_logger = logging.getLogger("geogigpy")
+
+_pool = None
+_poolLock = threading.Lock()
+_maxWorkers = DEFAULT_MAX_WORKERS
+
+
+def setMaxWorkers(maxworkers):
+    '''
+    Sets the maximum number of operations run at the same time by AsyncRepository objects
+    that do not have their own pool. It has to be called before any operation is run
+    '''
+    global _maxWorkers
+    _maxWorkers = maxworkers
+
+
+def _sharedpool():
+    global _pool
+    with _poolLock:
+        if _pool is None:
+            _pool = ThreadPool(_maxWorkers)
+        return _pool
+
+
+class AsyncResult(object):
+    '''
+    The result of an operation run by an AsyncRepository, with the same interface as the
+    AsyncResult objects returned by multiprocessing pools
+    '''
+
+    def __init__(self, callback=None):
+        self._callback = callback
+        self._event = threading.Event()
+        self._success = None
+        self._value = None
+
+    def _set(self, success, value):
+        self._success = success
+        self._value = value
+        try:
+            if success and self._callback is not None:
+                self._callback(value)
+        except Exception, e:
+            # the pool discards errors raised by the operations it runs, so they are logged here
+            _logger.error("Error in callback of asynchronous operation: %s" % e, exc_info=True)
+        finally:
+            self._event.set()
+
+    def ready(self):
+        return self._event.is_set()
+
+    def successful(self):
+        if not self.ready():
+            raise ValueError("The operation has not finished yet")
+        return self._success
+
+    def wait(self, timeout=None):
+        self._event.wait(timeout)
+
+    def get(self, timeout=None):
+        '''Returns the result of the operation, or raises the exception it raised'''
+        self.wait(timeout)
+        if not self.ready():
+            raise TimeoutError
+        if self._success:
+            return self._value
+        raise self._value
+
+
+def _asyncmethod(name):
+    def method(self, *args, **kwargs):
+        callback = kwargs.pop("callback", None)
+        return self.submit(getattr(Repository, name), *args, callback=callback, **kwargs)
+    method.__name__ = name
+    method.__doc__ = ("Runs Repository.%s in the background and returns an AsyncResult. "
+                      "If a callback is passed, it is called with the result" % name)
+    return method
+
+
+class AsyncRepository(object):
+    '''
+    A wrapper around a Repository that runs its operations in a pool of worker threads and
+    returns an AsyncResult for each of them, so the calling thread is never blocked waiting
+    for geogig. Results can be waited for with AsyncResult.get(), or received in a callback,
+    which makes it possible to use it from an event loop.
+
+    Operations on the same repository are run one after another, since Repository objects
+    are not meant to be used from several threads, while operations on different repositories
+    run at the same time, up to the size of the pool. All AsyncRepository objects share a pool
+    unless one is passed.
+
+    repo can be a Repository or the url of one. In the latter case, the Repository object is
+    created, using the passed connector, when the first operation is run
+    '''
+
+    def __init__(self, repo, connector=None, pool=None):
+        if isinstance(repo, Repository):
+            self._repo = repo
+            self.url = repo.url
+        else:
+            self._repo = None
+            self.url = repo
+        self.connector = connector
+        self.pool = pool
+        self._lock = threading.Lock()
+        self._queue = deque()
+        self._running = False
+
+    def repository(self):
+        '''Returns the wrapped Repository object. It should only be used from worker threads'''
+        if self._repo is None:
+            self._repo = Repository(self.url, self.connector)
+        return self._repo
+
+    def submit(self, func, *args, **kwargs):
+        '''
+        Runs a function that takes a Repository as its first argument in the background,
+        passing the remaining arguments to it, and returns an AsyncResult
+        '''
+        callback = kwargs.pop("callback", None)
+        result = AsyncResult(callback)
+        with self._lock:
+            self._queue.append((func, args, kwargs, result))
+            start = not self._running
+            self._running = True
+        if start:
+            self._next()
+        return result
+
+    def _next(self):
+        # Operations are queued here and passed to the pool one at a time, so operations
+        # waiting for this repository never hold a thread of the pool
+        with self._lock:
+            if not self._queue:
+                self._running = False
+                return
+            operation = self._queue.popleft()
+        pool = self.pool or _sharedpool()
+        pool.apply_async(self._run, operation)
+
+    def _run(self, func, args, kwargs, result):
+        try:
+            try:
+                value = func(self.repository(), *args, **kwargs)
+            except Exception, e:
+                result._set(False, e)
+            else:
+                result._set(True, value)
+        finally:
+            self._next()
+
+
+for _name in ASYNC_METHODS:
+    setattr(AsyncRepository, _name, _asyncmethod(_name))
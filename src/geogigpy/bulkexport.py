@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    bulkexport.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+
+from cliconnector import CLIConnector
+from bulkjobs import (BulkJob, fileformat, perthread, runjobs, DEFAULT_MAX_WORKERS,
+                      SHP, GEOPKG, SPATIALITE, POSTGIS)
+
+_EXTENSIONS = {".shp": SHP, ".gpkg": GEOPKG, ".sqlite": SPATIALITE, ".db": SPATIALITE}
+
+
+def exportformat(target):
+    '''
+    Returns the format to use to export to the passed target: a dict with the arguments of
+    Repository.exportpg for PostGIS, or a file path whose extension defines the format otherwise
+    '''
+    return fileformat(target, _EXTENSIONS, "export")
+
+
+class ExportJob(BulkJob):
+    '''
+    The export of a tree to a target, as passed to Repository.exportmany. options contains
+    additional arguments for the export method of its format, such as charset or overwrite.
+    Once it has been run, elapsed contains the number of seconds it took, and error the
+    exception raised if it failed
+    '''
+
+    def __init__(self, ref, path, target, options=None):
+        BulkJob.__init__(self)
+        self.ref = ref
+        self.path = path
+        self.target = target
+        self.options = options or {}
+        self.format = exportformat(target)
+
+    def run(self, repo):
+        ref = self.ref
+        if self.format == SHP:
+            repo.exportshp(ref, self.path, self.target, **self.options)
+        elif self.format == GEOPKG:
+            repo.exportgeopkg(ref, self.path, self.target, **self.options)
+        elif self.format == SPATIALITE:
+            repo.exportsl(ref, self.path, self.target, **self.options)
+        else:
+            kwargs = dict(self.target)
+            kwargs.update(self.options)
+            kwargs.setdefault("table", None)
+            kwargs.setdefault("user", None)
+            repo.exportpg(ref, self.path, **kwargs)
+
+    def startedtext(self):
+        return "Exporting %s" % self
+
+    def finishedtext(self):
+        status = "failed" if self.error is not None else "exported"
+        return "%s %s in %.2f s" % (self, status, self.elapsed)
+
+    def __str__(self):
+        if self.format == POSTGIS:
+            target = "%s/%s" % (self.target.get("database"), self.target.get("table") or self.path)
+        else:
+            target = self.target
+        return "%s:%s -> %s" % (self.ref, self.path, target)
+
+
+def _job(job):
+    if isinstance(job, ExportJob):
+        return job
+    return ExportJob(*job)
+
+
+def exportmany(repo, jobs, maxworkers=DEFAULT_MAX_WORKERS, connector=CLIConnector,
+               progressFunc=None, progressTextFunc=None):
+    '''
+    Runs a set of exports from a repository, with up to maxworkers of them running at the
+    same time. See Repository.exportmany for a description of the arguments.
+
+    Returns the list of ExportJob objects, with the time each of them took
+    '''
+    jobs = [_job(job) for job in jobs]
+    if not jobs:
+        return jobs
+    # Each worker uses its own connector, so with a CLI connector exports run in separate
+    # geogig processes. Exports through a shared Py4J gateway would run one after another
+    if connector is None:
+        workerrepo = lambda: repo
+    else:
+        workerrepo = perthread(lambda: type(repo)(repo.url, connector()))
+    runjobs(jobs, lambda job: job.run(workerrepo()), maxworkers, progressFunc, progressTextFunc)
+    return jobs
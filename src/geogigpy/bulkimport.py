@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    bulkimport.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+
+import os
+import shutil
+import tempfile
+import threading
+import geogig
+from cliconnector import CLIConnector
+from geogigexception import GeoGigException, PoolException
+from bulkjobs import (BulkJob, fileformat, perthread, runjobs, DEFAULT_MAX_WORKERS,
+                      SHP, GEOJSON, GEOPKG, SPATIALITE, POSTGIS)
+
+_EXTENSIONS = {".shp": SHP, ".geojson": GEOJSON, ".json": GEOJSON, ".gpkg": GEOPKG,
+               ".sqlite": SPATIALITE, ".db": SPATIALITE}
+
+
+def importformat(source):
+    '''
+    Returns the format of the passed source: a dict with the arguments of Repository.importpg
+    for PostGIS, or a file path whose extension defines the format otherwise
+    '''
+    return fileformat(source, _EXTENSIONS, "import")
+
+
+class ImportSource(BulkJob):
+    '''
+    A source to import, as passed to Repository.importmany. dest is the path of the tree to
+    import it into. It defaults to the name of the table for databases, and to the name of the
+    file without its extension otherwise. options contains additional arguments for the import
+    method of its format, such as table for GeoPackage and SpatiaLite sources, or charset.
+
+    Once it has been imported, elapsed contains the number of seconds it took, including
+    counting the imported features, features the number of features imported, and error the
+    exception raised if it failed
+    '''
+
+    def __init__(self, source, dest=None, options=None):
+        BulkJob.__init__(self)
+        self.source = source
+        self.options = options or {}
+        self.format = importformat(source)
+        if dest is None:
+            if self.format == POSTGIS:
+                dest = source.get("table")
+            elif self.format in (GEOPKG, SPATIALITE):
+                dest = self.options.get("table")
+            else:
+                dest = os.path.splitext(os.path.basename(source))[0]
+        if not dest:
+            raise GeoGigException("A destination path is needed to import %s" % source)
+        self.dest = dest
+        self.features = None
+
+    @property
+    def throughput(self):
+        '''The number of features imported per second'''
+        if not self.elapsed or self.features is None:
+            return None
+        return self.features / self.elapsed
+
+    def run(self, repo):
+        options = dict(self.options)
+        if self.format == SHP:
+            repo.importshp(self.source, dest=self.dest, **options)
+        elif self.format == GEOJSON:
+            repo.importgeojson(self.source, dest=self.dest, **options)
+        elif self.format == GEOPKG:
+            repo.importgeopkg(self.source, options.pop("table", None) or self.dest, self.dest, **options)
+        elif self.format == SPATIALITE:
+            repo.importsl(self.source, options.pop("table", None) or self.dest, dest=self.dest, **options)
+        else:
+            kwargs = dict(self.source)
+            kwargs.update(options)
+            kwargs["dest"] = self.dest
+            repo.importpg(**kwargs)
+        self.features = repo.count(geogig.WORK_HEAD, self.dest)
+
+    def startedtext(self):
+        return "Importing %s" % self
+
+    def finishedtext(self):
+        if self.error is not None:
+            return "%s failed after %.2f s" % (self, self.elapsed)
+        return "%s imported %i features in %.2f s" % (self, self.features, self.elapsed)
+
+    def __str__(self):
+        if self.format == POSTGIS:
+            source = "%s/%s" % (self.source.get("database"), self.source.get("table"))
+        else:
+            source = self.source
+        return "%s -> %s" % (source, self.dest)
+
+
+def _source(source):
+    if isinstance(source, ImportSource):
+        return source
+    if isinstance(source, (tuple, list)):
+        return ImportSource(*source)
+    return ImportSource(source)
+
+
+class _StagingRepository(object):
+    '''
+    An empty repository where a worker imports its sources. Its content is committed
+    and fetched by the target repository once all sources have been imported
+    '''
+
+    def __init__(self, repoclass, path, connector):
+        self.repo = repoclass(path, connector(), init=True)
+        self.repo.config("user.name", "geogigpy")
+        self.repo.config("user.email", "geogigpy@localhost")
+        self.dests = []
+
+
+def importmany(repo, sources, maxworkers=DEFAULT_MAX_WORKERS, connector=CLIConnector,
+               progressFunc=None, progressTextFunc=None):
+    '''
+    Imports a set of sources into the working tree of a repository, with up to maxworkers
+    of them being imported at the same time, and adds them to the staging area.
+    See Repository.importmany for a description of the arguments.
+
+    Returns the list of ImportSource objects, with the time each of them took and the
+    number of features imported
+    '''
+    sources = [_source(source) for source in sources]
+    if not sources:
+        return sources
+    dests = [source.dest for source in sources]
+    if len(set(dests)) != len(dests):
+        raise GeoGigException("Sources have to be imported into different paths")
+
+    folder = tempfile.mkdtemp(prefix="geogigimport")
+    stagings = []
+    lock = threading.Lock()
+
+    def createstaging():
+        with lock:
+            path = os.path.join(folder, str(len(stagings)))
+            stagings.append(path)
+        worker = _StagingRepository(type(repo), path, connector)
+        with lock:
+            stagings[stagings.index(path)] = worker
+        return worker
+    staging = perthread(createstaging)
+
+    def run(source):
+        worker = staging()
+        source.run(worker.repo)
+        worker.dests.append(source.dest)
+
+    try:
+        error = None
+        try:
+            runjobs(sources, run, maxworkers, progressFunc, progressTextFunc)
+        except PoolException, e:
+            error = e  # the sources that were imported are still merged
+        imported = []
+        for i, worker in enumerate(stagings):
+            if isinstance(worker, _StagingRepository) and worker.dests:
+                # the name of the temporary folder makes the remote name unique
+                _merge(repo, worker, "%s_%i" % (os.path.basename(folder), i))
+                imported.extend(worker.dests)
+        _add(repo, imported)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    if error is not None:
+        raise error
+    return sources
+
+
+def _add(repo, paths):
+    '''Adds the passed paths to the staging area one by one, since geogig add takes a single path'''
+    for path in paths:
+        repo.add([path])
+
+
+def _merge(repo, worker, remote):
+    '''Brings the trees imported in a staging repository into the working tree of the target one'''
+    _add(worker.repo, worker.dests)
+    worker.repo.commit("Imported %s" % ", ".join(worker.dests))
+    commitid = worker.repo.revparse(geogig.HEAD)
+    repo.addremote(remote, worker.repo.url.replace('\\', '/'), None, None)
+    try:
+        repo.fetch(remote)
+        repo.checkout(commitid, worker.dests)
+    finally:
+        repo.removeremote(remote)
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    bulkjobs.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+
+import os
+import time
+import threading
+from multiprocessing.pool import ThreadPool
+from collections import OrderedDict
+from geogigexception import GeoGigException, PoolException
+
+DEFAULT_MAX_WORKERS = 4
+
+# Formats of the sources and targets of bulk imports and exports
+SHP = "shp"
+GEOJSON = "geojson"
+GEOPKG = "geopkg"
+SPATIALITE = "sl"
+POSTGIS = "pg"
+
+
+def fileformat(location, extensions, operation):
+    '''
+    Returns the format of the passed location: POSTGIS for a dict with database connection
+    arguments, or the format in the extensions dict for the extension of a file path otherwise
+    '''
+    if isinstance(location, dict):
+        return POSTGIS
+    ext = os.path.splitext(location)[1].lower()
+    if ext not in extensions:
+        raise GeoGigException("Cannot infer %s format for %s" % (operation, location))
+    return extensions[ext]
+
+
+def perthread(factory):
+    '''Returns a function that returns an object created by factory, creating one for each thread that calls it'''
+    local = threading.local()
+
+    def get():
+        if not hasattr(local, "value"):
+            local.value = factory()
+        return local.value
+    return get
+
+
+def runall(func, items, maxworkers=DEFAULT_MAX_WORKERS):
+    '''
+    Calls func with each of the passed items in a pool of up to maxworkers threads. Returns a list
+    with a (succeeded, value) tuple for each item, where value is the result or the exception raised
+    '''
+    def call(item):
+        try:
+            return True, func(item)
+        except Exception, e:
+            return False, e
+
+    pool = ThreadPool(min(maxworkers, len(items)) or 1)
+    try:
+        return pool.map(call, items, 1)
+    finally:
+        pool.close()
+        pool.join()
+
+
+class BulkJob(object):
+    '''
+    Base class for the jobs run by runjobs. Once a job has been run, elapsed contains
+    the number of seconds it took, and error the exception raised if it failed
+    '''
+
+    def __init__(self):
+        self.elapsed = None
+        self.error = None
+
+    def startedtext(self):
+        raise NotImplementedError
+
+    def finishedtext(self):
+        raise NotImplementedError
+
+
+def runjobs(jobs, run, maxworkers=DEFAULT_MAX_WORKERS, progressFunc=None, progressTextFunc=None):
+    '''
+    Calls run with each of the passed BulkJob objects, with up to maxworkers of them running at
+    the same time, and records the time each of them takes and the error it raises, if any.
+
+    progressFunc is called with the percentage of finished jobs, and progressTextFunc with the
+    text of each job when it starts and finishes, as done by a Py4J progress listener.
+
+    Raises a PoolException if any job fails, once all of them have been run
+    '''
+    lock = threading.Lock()
+    finished = [0]
+
+    def runjob(job):
+        if progressTextFunc is not None:
+            progressTextFunc(job.startedtext())
+        start = time.time()
+        try:
+            run(job)
+        except Exception, e:
+            job.error = e
+        job.elapsed = time.time() - start
+        with lock:
+            finished[0] += 1
+            done = finished[0]
+        if progressTextFunc is not None:
+            progressTextFunc(job.finishedtext())
+        if progressFunc is not None:
+            progressFunc(done * 100 / len(jobs))
+
+    runall(runjob, jobs, maxworkers)
+    errors = OrderedDict((job, job.error) for job in jobs if job.error is not None)
+    if errors:
+        results = OrderedDict((job, job.elapsed) for job in jobs if job.error is None)
+        raise PoolException(results, errors)
@@ -30,31 +30,36 @@ import datetime
 import logging
 import subprocess
 import tempfile
-from copy import deepcopy
-from collections import defaultdict
+from collections import defaultdict, deque
+from itertools import izip
 
 import geogig
-from feature import Feature
+from feature import Feature, FeatureBatch
 from tree import Tree
 from commit import Commit
-from diff import Diffentry, ATTRIBUTE_DIFF_MODIFIED
+from diff import (Diffentry, ATTRIBUTE_DIFF_MODIFIED, ATTRIBUTE_DIFF_ADDED, ATTRIBUTE_DIFF_REMOVED,
+                  ATTRIBUTE_DIFF_UNCHANGED)
 from connector import Connector
 from commitish import Commitish
 from geometry import Geometry
+from objectcache import objectCache, immutablekey, immutablerefspec
 from geogigexception import (GeoGigException,
                              GeoGigConflictException,
                              UnconfiguredUserException)
 
 
-def _run(command, addcolor=True):
+_NOCOLOR = ["--color", "never"]
+
+
+def _run(command, addcolor=True, cwd=None):
     command = ['geogig'] + command
     if addcolor:
-        command.extend(["--color", "never"])
+        command.extend(_NOCOLOR)
     commandstr = " ".join(command)
     if os.name != 'nt':
         command = commandstr
     output = []
-    proc = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE,
+    proc = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, cwd=cwd,
                             stdin=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
     for line in iter(proc.stdout.readline, ""):
         line = line.strip("\n")
@@ -68,9 +73,216 @@ def _run(command, addcolor=True):
     return output
 
 
+_ERROR_LINES = 100
+
+
+def _runiter(command, addcolor=True, cwd=None):
+    '''
+    Starts a geogig command and returns a generator that yields the lines of its output as
+    they are produced. Since the return code is only known once the output has been read,
+    an error is raised after all lines have been yielded, with the last lines of the output
+    as message
+    '''
+    command = ['geogig'] + command
+    if addcolor:
+        command.extend(_NOCOLOR)
+    commandstr = " ".join(command)
+    if os.name != 'nt':
+        command = commandstr
+    proc = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, cwd=cwd,
+                            stdin=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+    return _iteroutput(proc, commandstr)
+
+
+def _iteroutput(proc, commandstr):
+    tail = deque(maxlen=_ERROR_LINES)
+    completed = False
+    try:
+        for line in iter(proc.stdout.readline, ""):
+            line = line.strip("\n")
+            tail.append(line)
+            yield line
+        completed = True
+    finally:
+        if not completed and proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        proc.wait()
+    if proc.returncode:
+        logging.error("Error running " + commandstr + "\n" + " ".join(tail))
+        raise GeoGigException(list(tail))
+    logging.info("Executed " + commandstr)
+
+
+_ATTRIBUTE_DIFF_TYPES = frozenset([ATTRIBUTE_DIFF_MODIFIED, ATTRIBUTE_DIFF_ADDED,
+                                   ATTRIBUTE_DIFF_REMOVED, ATTRIBUTE_DIFF_UNCHANGED])
+
+
+# Number of commits read from a log before they are stored in the object cache
+_COMMIT_RECORDS_BATCH = 1000
+
+
+# Feature types by feature type id, and feature type ids by commit id and tree path.
+# Both are identified by their content, so they are shared by all connectors
+_featuretypes = {}
+_ftypeids = {}
+_MAX_MEMOIZED = 10000
+
+
+def _memoize(memo, key, value):
+    if len(memo) >= _MAX_MEMOIZED:
+        memo.clear()
+    memo[key] = value
+
+
+def _person(value):
+    '''
+    Parses the name and date in an author or committer line, which has the form
+    "name email timestamp offset". The name can contain spaces
+    '''
+    tokens = value.rsplit(" ", 3)
+    return tokens[0], datetime.datetime.fromtimestamp((int(tokens[2]) - int(tokens[3])) // 1000)
+
+
+def _parsecommit(lines):
+    '''
+    Parses the description of a commit printed by rev-list. Returns a tuple with the
+    fields of the commit, in the order used by _commitrecord, or None if there is no commit
+    '''
+    commitid = tree = parents = None
+    author = authordate = committer = committerdate = None
+    messagetext = []
+    message = False
+    for line in lines:
+        if message:
+            if line[:1] in ("\t", " "):
+                messagetext.append(line.strip())
+                continue
+            message = False
+        key, sep, value = line.partition(" ")
+        if key == "commit":
+            commitid = value.strip()
+        elif key == "tree":
+            tree = value.strip()
+        elif key == "parent":
+            if sep:
+                parents = value.split()
+        elif key == "author":
+            author, authordate = _person(value)
+        elif key == "committer":
+            committer, committerdate = _person(value)
+        elif key == "message":
+            message = True
+    if commitid is None:
+        return None
+    return (commitid, tree, parents, "\n".join(messagetext), author, authordate, committer, committerdate)
+
+
+def _commitrecord(commit):
+    return (commit.commitid, commit.treeid, commit._parents, commit.message, commit.authorname,
+            commit.authordate, commit.committername, commit.committerdate)
+
+
+def _decodeint(value):
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def _decodefloat(value):
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def _decodeboolean(value):
+    return value.lower() == "true"
+
+
+def _decodestring(value):
+    return value
+
+
+def _geometrydecoder(crs):
+    def decode(value):
+        return Geometry(value, crs)
+    return decode
+
+
+def _safedecoder(decoder):
+    def decode(value):
+        try:
+            return decoder(value)
+        except Exception:
+            return value
+    return decode
+
+
+_GEOMETRY_TYPES = ["POINT", "LINESTRING", "POLYGON", "MULTIPOINT", "MULTILINESTRING", "MULTIPOLYGON"]
+
+# Functions that convert the string representation of an attribute value into a Python
+# object, keyed by attribute type name
+_decoders = {"BOOLEAN": _decodeboolean,
+             "BYTE": _decodeint,
+             "SHORT": _decodeint,
+             "INTEGER": _decodeint,
+             "LONG": _decodeint,
+             "FLOAT": _decodefloat,
+             "DOUBLE": _decodefloat}
+
+# Decoders for all the type names found so far, including geometry types with a CRS
+_resolvedDecoders = {}
+
+
+def registerDecoder(valuetype, decoder):
+    '''
+    Sets the function used to convert values of the passed attribute type (such as "DATE" or
+    "UUID") from the string representation used by geogig. If it raises an exception, the
+    string is used as value
+    '''
+    _decoders[valuetype] = _safedecoder(decoder)
+    _resolvedDecoders.clear()
+
+
+def _decoder(valuetype):
+    decoder = _resolvedDecoders.get(valuetype)
+    if decoder is None:
+        decoder = _decoders.get(valuetype)
+        if decoder is None:
+            tokens = valuetype.split(" ")
+            if valuetype in _GEOMETRY_TYPES or len(tokens) > 1:
+                crs = " ".join(tokens[1:]) if len(tokens) > 1 else None
+                decoder = _geometrydecoder(crs)
+            else:
+                decoder = _decodestring
+        _resolvedDecoders[valuetype] = decoder
+    return decoder
+
+
+def _chunks(paths, maxlength):
+    '''Splits a list of paths in lists whose elements, joined with blank spaces, are not longer than maxlength'''
+    chunk = []
+    length = 0
+    for path in paths:
+        if chunk and length + len(path) + 1 > maxlength:
+            yield chunk
+            chunk = []
+            length = 0
+        chunk.append(path)
+        length += len(path) + 1
+    if chunk:
+        yield chunk
+
+
 class CLIConnector(Connector):
     ''' A connector that calls the CLI version of geogig and parses CLI output'''
 
+    # Maximum length of a command line. Commands taking a list of paths are split
+    # in several calls to avoid exceeding it. None means no limit
+    maxcommandlength = 8000 if os.name == 'nt' else 100000
+
     def __init__(self):
         self.commandslog = []
 
@@ -92,9 +304,29 @@ class CLIConnector(Connector):
         return output[0].split(":")[1].strip()
 
     def run(self, command):
-        os.chdir(self.repo.url)
         self.commandslog.append(" ".join(command))
-        return _run(command)
+        return _run(command, cwd=self.repo.url)
+
+    def runiter(self, command):
+        '''Like run, but returns a generator of output lines instead of a list'''
+        self.commandslog.append(" ".join(command))
+        return _runiter(command, cwd=self.repo.url)
+
+    def runpaths(self, commands, paths, after=[]):
+        '''
+        Runs a command with the passed paths added after the passed commands and before
+        the ones in after. If the command line would be too long, the paths are split
+        and the command is run several times. Returns the output of all runs
+        '''
+        if self.maxcommandlength is None:
+            return self.run(commands + paths + after)
+        # run adds the color option at the end of the command line
+        fixed = ['geogig'] + commands + after + _NOCOLOR
+        maxlength = self.maxcommandlength - len(" ".join(fixed)) - 1
+        output = []
+        for chunk in _chunks(paths, maxlength):
+            output.extend(self.run(commands + chunk + after))
+        return output
 
     def revparse(self, rev):
         commands = ['rev-parse', rev]
@@ -140,7 +372,9 @@ class CLIConnector(Connector):
             raise GeoGigException("Not a valid GeoGig repository: " + self.repo.url)
 
     def children(self, ref=geogig.HEAD, path=None, recursive=False):
-        children = []
+        return list(self.iterchildren(ref, path, recursive))
+
+    def iterchildren(self, ref=geogig.HEAD, path=None, recursive=False):
         if path is None:
             fullref = ref
         else:
@@ -148,54 +382,33 @@ class CLIConnector(Connector):
         commands = ['ls-tree', fullref, "-v"]
         if recursive:
             commands.append("-r")
-        output = self.run(commands)
-        for line in output:
-            if line != '':
-                tokens = line.split(" ")
-                if tokens[1] == "feature":
-                    children.append(Feature(self.repo, ref, tokens[3]))
-                elif tokens[1] == "tree":
-                    try:
-                        size = int(tokens[5])
-                    except:
-                        size = None
-                    children.append(Tree(self.repo, ref, tokens[3], size))
-        return children
+        batchsize = self.repo.featurebatchsize
+        batch = None
+        for line in self.runiter(commands):
+            tokens = line.split(" ")
+            # error messages are mixed with the output, and the error is raised once it has been read
+            if len(tokens) < 4:
+                continue
+            if tokens[1] == "feature":
+                feature = Feature(self.repo, ref, tokens[3])
+                if batchsize > 1:
+                    if batch is None or batch.isfull():
+                        batch = FeatureBatch(self.repo, batchsize)
+                    batch.add(feature)
+                yield feature
+            elif tokens[1] == "tree":
+                try:
+                    size = int(tokens[5])
+                except:
+                    size = None
+                ftypeid = tokens[0] if tokens[0] != geogig.NULL_ID else None
+                yield Tree(self.repo, ref, tokens[3], size, tokens[2], ftypeid)
 
     def commitFromString(self, lines):
-        message = False
-        messagetext = []
-        parents = None
-        commitid = None
-        for line in lines:
-            tokens = line.split(' ')
-            if message:
-                if line.startswith("\t") or line.startswith(" "):
-                    messagetext.append(line.strip())
-                else:
-                    message = False
-            else:
-                if tokens[0] == 'commit':
-                    commitid = tokens[1]
-                if tokens[0] == 'tree':
-                    tree = tokens[1]
-                if tokens[0] == 'parent':
-                    if len(tokens) > 1:
-                        parents = [t for t in tokens[1:] if t != ""]
-                elif tokens[0] == 'author':
-                    author = " ".join(tokens[1:-3])
-                    authordate = datetime.datetime.fromtimestamp((int(tokens[-2]) - int(tokens[-1])) // 1000)
-                elif tokens[0] == 'committer':
-                    committer = tokens[1]
-                    committerdate = datetime.datetime.fromtimestamp((int(tokens[-2]) - int(tokens[-1])) // 1000)
-                elif tokens[0] == 'message':
-                    message = True
-
-        if commitid is not None:
-            c = Commit(self.repo, commitid, tree, parents, "\n".join(messagetext), author, authordate, committer, committerdate)
-            return c
-        else:
+        fields = _parsecommit(lines)
+        if fields is None:
             return None
+        return Commit(self.repo, *fields)
 
     def addremote(self, name, url, username, password):
         if username and password:
@@ -221,7 +434,9 @@ class CLIConnector(Connector):
         return remotes
 
     def log(self, tip, sincecommit=None, until=None, since=None, path=None, n=None):
-        commits = []
+        return list(self.iterlog(tip, sincecommit, until, since, path, n))
+
+    def iterlog(self, tip, sincecommit=None, until=None, since=None, path=None, n=None):
         param = tip if sincecommit is None else (sincecommit + ".." + tip)
         commands = ['rev-list', param]
         if path:
@@ -236,28 +451,45 @@ class CLIConnector(Connector):
             commands.extend(["--since", since])
         if n is not None:
             commands.extend(["-n", str(n)])
+        cache = objectCache()
+        records = []
         try:
-            output = self.run(commands)
+            commitlines = []
+            for line in self.runiter(commands):
+                if line == '':
+                    commit = self.commitFromString(commitlines)
+                    if commit is not None:
+                        if cache is not None:
+                            records.append((commit.commitid, _commitrecord(commit)))
+                            if len(records) == _COMMIT_RECORDS_BATCH:
+                                cache.putmany("commit", records)
+                                records = []
+                        yield commit
+                        commitlines = []
+                else:
+                    commitlines.append(line)
+
+            if commitlines:
+                commit = self.commitFromString(commitlines)
+                if commit is not None:
+                    if cache is not None:
+                        records.append((commit.commitid, _commitrecord(commit)))
+                    yield commit
         except GeoGigException, e:
             if "HEAD does not resolve" in e.args[0]:  # empty repo
-                return []
+                return
             else:
                 raise e
-        commitlines = []
-        for line in output:
-            if line == '':
-                commit = self.commitFromString(commitlines)
-                if commit is not None:
-                    commits.append(commit)
-                    commitlines = []
-            else:
-                commitlines.append(line)
-
-        if commitlines:
-            commit = self.commitFromString(commitlines)
-            if commit is not None:
-                commits.append(commit)
-        return commits
+        finally:
+            if records:
+                cache.putmany("commit", records)
+
+    def cachedcommit(self, commitid):
+        cache = objectCache()
+        record = None if cache is None else cache.get("commit", commitid)
+        if record is None:
+            return None
+        return Commit(self.repo, *record)
 
     def conflicts(self):
         conflictsfile = os.path.join(self.repo.url, ".geogig", "conflicts")
@@ -286,8 +518,7 @@ class CLIConnector(Connector):
         else:
             raise GeoGigException("Unknown option:" + version)
         commands.append("-p")
-        commands.extend(paths)
-        self.run(commands)
+        self.runpaths(commands, paths)
         self.add(paths)
 
     def checkout(self, ref, paths=None, force=False):
@@ -345,6 +576,7 @@ class CLIConnector(Connector):
 
     def add(self, paths=[]):
         if paths:
+            # geogig add only supports a single path per call
             for path in paths:
                 self.run(['add', path])
         else:
@@ -363,22 +595,21 @@ class CLIConnector(Connector):
                 raise e
 
     def diffentryFromString(self, oldcommitref, newcommitref, line):
-        tokens = line.strip().split(" ")
-        path = " ".join(tokens[0:-2])
-        oldref = tokens[-2]
-        newref = tokens[-1]
+        # paths can contain spaces, but ids cannot
+        path, oldref, newref = line.strip().rsplit(" ", 2)
         return Diffentry(self.repo, oldcommitref, newcommitref, oldref, newref, path)
 
     def diff(self, refa, refb, path=None):
-        diffs = []
+        return list(self.iterdiff(refa, refb, path))
+
+    def iterdiff(self, refa, refb, path=None):
         commands = ['diff-tree', refa, refb]
         if path is not None:
             commands.extend(["--", path])
-        output = self.run(commands)
-        for line in output:
-            if line != '':
-                diffs.append(self.diffentryFromString(refa, refb, line))
-        return diffs
+        for line in self.runiter(commands):
+            # lines that are not entries, such as error messages, are skipped
+            if line.count(" ") >= 2:
+                yield self.diffentryFromString(refa, refb, line)
 
     def difftreestats(self, refa, refb):
         output = self.run(['diff-tree', refa, refb, "--tree-stats"])
@@ -390,7 +621,17 @@ class CLIConnector(Connector):
         return stats
 
     def treediff(self, path, refa, refb):
-        attribs = None
+        attribs = self._treediffattribs(path, refa, refb)
+        features = []
+        for featurepath, changes in self._itertreediff(attribs, path, refa, refb, None, False):
+            features.append([changes.get(attrib) for attrib in attribs])
+        return attribs, features
+
+    def itertreediff(self, path, refa, refb, attributes=None, skipunchanged=False):
+        attribs = self._treediffattribs(path, refa, refb)
+        return self._itertreediff(attribs, path, refa, refb, attributes, skipunchanged)
+
+    def _treediffattribs(self, path, refa, refb):
         try:
             ftypea = self.featuretype(refa, path)
         except GeoGigException:
@@ -399,39 +640,64 @@ class CLIConnector(Connector):
             ftypeb = self.featuretype(refb, path)
         except GeoGigException:
             ftypeb = {}
-        attribs = deepcopy(ftypea)
+        attribs = dict(ftypea)
         attribs.update(ftypeb)   # we assume that there are no repeated attrib names with different type
+        return attribs
 
-        commands = ['diff-tree', refa, refb, "--", path, "--describe"]
-        lines = self.run(commands)
-        features = []
-        difflines = []
-        i = 0
-        previousLine = None
-        while i < len(lines):
-            line = lines[i]
-            if line == '':
-                if difflines:
-                    changes = self.difffromstring(difflines, attribs)
-                    features.append(changes)
-                    difflines = []
-            else:
-                if difflines:
-                    difflines.append(line)
-                    tokens = line.split(" ")
-                    i += 1
-                    difflines.append(lines[i])
-                    if tokens[0] == ATTRIBUTE_DIFF_MODIFIED:
-                        i += 1
-                        difflines.append(lines[i])
+    def _itertreediff(self, attribs, path, refa, refb, attributes, skipunchanged):
+        '''
+        Yields a tuple (featurepath, changes) for each changed feature, reading the output of
+        diff-tree as it is produced. Only the attributes in the passed list (or all of them, if
+        it is None) are included in changes, and only the changed ones if skipunchanged is True
+        '''
+        wanted = None if attributes is None else set(attributes)
+        for featurepath, rawchanges in self._iterdescribe(path, refa, refb):
+            changes = {}
+            for changeType, attribute, value, value2 in rawchanges:
+                if ((wanted is not None and attribute not in wanted)
+                        or (skipunchanged and changeType == ATTRIBUTE_DIFF_UNCHANGED)):
+                    continue
+                decode = _decoder(attribs.get(attribute, "STRING"))
+                value = None if value == "[NULL]" else decode(value)
+                if changeType == ATTRIBUTE_DIFF_MODIFIED:
+                    value2 = None if value2 == "[NULL]" else decode(value2)
+                    changes[attribute] = (changeType, value, value2)
                 else:
-                    difflines.append(line)
-            i += 1
-
-        if difflines:
-            changes = self.difffromstring(difflines, attribs)
-            features.append(changes)
-        return attribs, features
+                    changes[attribute] = (changeType, value)
+            yield featurepath, changes
+
+    def iterchangedattributes(self, path, refa, refb):
+        '''
+        Yields a tuple (featurepath, attributes) for each changed feature, with the set of names
+        of its changed attributes. Feature types are not needed and values are not decoded
+        '''
+        for featurepath, rawchanges in self._iterdescribe(path, refa, refb):
+            yield featurepath, set(attribute for changeType, attribute, value, value2 in rawchanges
+                                   if changeType != ATTRIBUTE_DIFF_UNCHANGED)
+
+    def _iterdescribe(self, path, refa, refb):
+        '''
+        Yields a tuple (featurepath, changes) for each changed feature in the output of diff-tree,
+        with changes as a list of (changetype, attribute, value, value2) tuples, with values as
+        printed by geogig. value2 is None unless the attribute was modified
+        '''
+        commands = ['diff-tree', refa, refb, "--", path, "--describe"]
+        lines = self.runiter(commands)
+        for featurepath in lines:
+            if featurepath == '':
+                continue
+            changes = []
+            for line in lines:
+                if line == '':
+                    break
+                changeType, sep, attribute = line.partition(" ")
+                if not sep or changeType not in _ATTRIBUTE_DIFF_TYPES:
+                    continue  # not an attribute change, such as an error message
+                value = lines.next()
+                value2 = lines.next() if changeType == ATTRIBUTE_DIFF_MODIFIED else None
+                changes.append((changeType, attribute, value, value2))
+            if changes:
+                yield featurepath, changes
 
     def difffromstring(self, lines, attribs):
         i = 1
@@ -614,52 +880,75 @@ class CLIConnector(Connector):
 
         self.run(commands)
 
+    def _cached(self, kind, key, func, *args):
+        '''
+        Returns the object of the passed kind and key from the object cache, or computes it
+        calling func with the passed args and stores it. If there is no object cache or the
+        key is None, func is always called
+        '''
+        cache = objectCache()
+        if cache is None or key is None:
+            return func(*args)
+        value = cache.get(kind, key)
+        if value is None:
+            value = func(*args)
+            cache.put(kind, key, value)
+        return value
+
     def featuredata(self, ref, path):
+        return self._cached("featuredata", immutablekey(ref, path), self._featuredata, ref, path)
+
+    def _featuredata(self, ref, path):
         refandpath = ref + ":" + path
         output = self.run(["show", "--raw", refandpath])
         return self.parseattribs(output[2:])
 
     def cat(self, reference):
+        return self._cached("cat", immutablekey(reference), self._cat, reference)
+
+    def _cat(self, reference):
         return "\n".join(self.run(["cat", reference]))
 
     def parseattribs(self, lines):
         attributes = {}
+        resolved = _resolvedDecoders
         iterator = iter(lines)
-        while True:
-            try:
-                name = iterator.next()
-                attribtype = iterator.next()
-                value = iterator.next()
-                value = self.valuefromstring(value, attribtype)
-                attributes[name] = (value, attribtype)
-            except StopIteration:
-                return attributes
+        for name, attribtype, value in izip(iterator, iterator, iterator):
+            if value == "[NULL]":
+                attributes[name] = (None, attribtype)
+            else:
+                decoder = resolved.get(attribtype) or _decoder(attribtype)
+                attributes[name] = (decoder(value), attribtype)
+        return attributes
 
     def valuefromstring(self, value, valuetype):
         if value == "[NULL]":
             return None
-        tokens = valuetype.split(" ")
-        try:
-            if valuetype == "BOOLEAN":
-                return str(value).lower() == "true"
-            elif valuetype in ["BYTE", "SHORT", "INTEGER", "LONG"]:
-                return int(value)
-            elif valuetype in ["FLOAT", "DOUBLE"]:
-                return float(value)
-            elif (valuetype in ["POINT", "LINESTRING", "POLYGON", "MULTIPOINT", "MULTILINESTRING", "MULTIPOLYGON"]
-                    or len(tokens) > 1):
-                crs = " ".join(tokens[1:]) if len(tokens) > 1 else None
-                return Geometry(value, crs)
-            else:
-                return value
-        except:
-            return value
+        return _decoder(valuetype)(value)
 
     def featuresdata(self, refs):
+        cache = objectCache()
+        if cache is None:
+            return self._featuresdata(refs)
         features = {}
-        commands = ["show", "--raw"]
-        commands.extend(refs)
-        output = self.run(commands)
+        missing = []
+        for ref in refs:
+            key = immutablerefspec(ref)
+            data = None if key is None else cache.get("featuredata", key)
+            if data is None:
+                missing.append(ref)
+            else:
+                features[ref] = data
+        if missing:
+            data = self._featuresdata(missing)
+            cache.putmany("featuredata", [(immutablerefspec(ref), d) for ref, d in data.iteritems()
+                                          if immutablerefspec(ref) is not None])
+            features.update(data)
+        return features
+
+    def _featuresdata(self, refs):
+        features = {}
+        output = self.runpaths(["show", "--raw"], list(refs))
         iterator = iter(output)
         lines = []
         name = None
@@ -682,14 +971,28 @@ class CLIConnector(Connector):
             features[name] = self.parseattribs(lines)
         return features
 
-    def featuretype(self, ref, tree):
-        show = self.show(ref + ":" + tree)
-        ftypeid = show.splitlines()[3].split(" ")[-1]
-        show = self.show(ftypeid)
+    def featuretype(self, ref, tree, ftypeid=None):
+        if ftypeid is None:
+            refspec = ref + ":" + tree
+            ftypeid = _ftypeids.get(refspec)
+            if ftypeid is None:
+                ftypeid = self.show(refspec).splitlines()[3].split(" ")[-1]
+                if immutablekey(ref) is not None:
+                    _memoize(_ftypeids, refspec, ftypeid)
+        attribs = _featuretypes.get(ftypeid)
+        if attribs is None:
+            attribs = self._cached("featuretype", immutablekey(ftypeid), self._featuretype, ftypeid)
+            _memoize(_featuretypes, ftypeid, attribs)
+        return dict(attribs)
+
+    def _featuretype(self, ftypeid):
+        show = self._show(ftypeid)
         attribs = {}
         for line in show.splitlines()[3:]:
-            tokens = line.split(":")
-            attribs[tokens[0]] = tokens[1].strip()[1:-1]
+            # lines have the form "name: <TYPE>", and names can contain colons
+            name, sep, typename = line.rpartition(": <")
+            if sep:
+                attribs[name] = typename.rstrip()[:-1]
         return attribs
 
     def featurediff(self, ref, ref2, path):
@@ -800,32 +1103,29 @@ class CLIConnector(Connector):
         self.run(commands)
 
     def insertfeatures(self, features):
-        s = ""
-        for path, attrs in features.iteritems():
-            s += path + "\n"
-            for attrName, attrValue in attrs.iteritems():
-                if attrValue is not None:
-                    s += attrName + "\t" + _tostr(attrValue) + "\n"
-            s += "\n"
-
-        tmp = tempfile.NamedTemporaryFile(delete=False)
-        fileName = tmp.name
-        tmp.close()
-        with codecs.open(fileName, 'w', 'utf-8') as f:
-            f.write(s)
-        commands = ["insert", "-f", fileName]
-        self.run(commands)
+        if isinstance(features, dict):
+            features = features.iteritems()
+        fd, fileName = tempfile.mkstemp(suffix=".txt")
+        os.close(fd)
+        try:
+            with codecs.open(fileName, 'w', 'utf-8') as f:
+                count = _writefeatures(f, features)
+            if count:
+                self.run(["insert", "-f", fileName])
+        finally:
+            os.remove(fileName)
 
     def removepaths(self, paths, recursive=False):
-        paths.insert(0, "rm")
-        if recursive:
-            paths.append("-r")
-        self.run(paths)
+        after = ["-r"] if recursive else []
+        self.runpaths(["rm"], list(paths), after)
 
     def applypatch(self, patchfile):
         self.run(["apply", patchfile])
 
     def show(self, ref):
+        return self._cached("show", immutablerefspec(ref), self._show, ref)
+
+    def _show(self, ref):
         return "\n".join(self.run(["show", ref]))
 
     def config(self, param, value, global_=False):
@@ -839,6 +1139,9 @@ class CLIConnector(Connector):
         value = value[0] if value else None
         return value
 
+    def fetch(self, remote):
+        self.run(["fetch", remote])
+
     def pull(self, remote, branch, rebase=False):
         commands = ["pull", remote, branch]
         if rebase:
@@ -859,6 +1162,20 @@ class CLIConnector(Connector):
         self.run(commands)
 
 
+def _writefeatures(f, features):
+    '''Writes features in the format used by the insert command, one at a time. Returns the number of features written'''
+    count = 0
+    for path, attrs in features:
+        lines = [path]
+        for attrName, attrValue in attrs.iteritems():
+            if attrValue is not None:
+                lines.append(attrName + "\t" + _tostr(attrValue))
+        lines.append("\n")
+        f.write("\n".join(lines))
+        count += 1
+    return count
+
+
 def _tostr(v):
     try:
         d = float(v)
@@ -28,16 +28,77 @@ __revision__ = '$Format:%H$'
 from commitish import Commitish
 import datetime
 import time
+from collections import OrderedDict
 from geogig import NULL_ID
 from utils import prettydate
 
+DEFAULT_CACHE_SIZE = 10000
 
-class Commit(Commitish):
+# Number of commits retrieved when a commit is not found in the cache, so walking
+# the history from it does not need a new call for each parent
+_PREFETCH = 50
+
+
+class CommitCache(object):
+    '''
+    A bounded cache of Commit objects, keyed by commit id.
+    When it is full, the least recently used commits are discarded
+    '''
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._commits = OrderedDict()
+
+    def get(self, commitid):
+        try:
+            commit = self._commits.pop(commitid)
+        except KeyError:
+            self.misses += 1
+            return None
+        self._commits[commitid] = commit
+        self.hits += 1
+        return commit
+
+    def put(self, commit):
+        self._commits.pop(commit.commitid, None)
+        self._commits[commit.commitid] = commit
+        self._trim()
+
+    def putall(self, commits):
+        for commit in commits:
+            self._commits.pop(commit.commitid, None)
+            self._commits[commit.commitid] = commit
+        self._trim()
 
-    _commitcache = {}
+    def resize(self, maxsize):
+        self.maxsize = maxsize
+        self._trim()
+
+    def clear(self):
+        self._commits.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _trim(self):
+        while len(self._commits) > self.maxsize:
+            self._commits.popitem(last=False)
+
+    def __contains__(self, commitid):
+        return commitid in self._commits
+
+    def __len__(self):
+        return len(self._commits)
+
+
+class Commit(Commitish):
 
     ''' A geogig commit'''
 
+    __slots__ = ('commitid', 'treeid', '_parents', 'message', 'authorname', 'authordate',
+                 'committername', 'committerdate')
+
     def __init__(self, repo, commitid, treeid, parents, message, authorname, authordate, committername, committerdate):
         Commitish.__init__(self, repo, commitid)
         self.repo = repo
@@ -60,10 +121,15 @@ class Commit(Commitish):
             return Commitish(repo, NULL_ID)
         else:
             cid = repo.revparse(ref)
-            if (repo.url, cid) not in Commit._commitcache:
-                log = repo.log(cid, n=1)
-                Commit._commitcache[(repo.url, cid)] = log[0]
-            return Commit._commitcache[(repo.url, cid)]
+            commit = repo.commitcache.get(cid)
+            if commit is None:
+                commit = repo.connector.cachedcommit(cid)
+                if commit is not None:
+                    repo.commitcache.put(commit)
+                else:
+                    log = repo.log(cid, n=_PREFETCH)
+                    commit = log[0]
+            return commit
 
     @property
     def parents(self):
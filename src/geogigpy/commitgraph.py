@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    commitgraph.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+
+import re
+import time
+import heapq
+import logging
+from geogig import NULL_ID
+
+_logger = logging.getLogger("geogigpy")
+
+_FROMA = 1
+_FROMB = 2
+_BOTH = _FROMA | _FROMB
+_STALE = 4
+
+_ID = re.compile("^[0-9a-f]{40}$")
+
+
+def _timestamp(date):
+    try:
+        return time.mktime(date.timetuple())
+    except AttributeError:
+        try:
+            return float(date) / 1000  # milliseconds, as returned by the server
+        except (TypeError, ValueError):
+            return 0.0
+
+
+class CommitGraph(object):
+    '''
+    An index of the commits in a repository, with the parents, generation number and
+    commit date of each of them, used to answer ancestry queries without running geogig.
+
+    The generation number of a commit is one more than the largest generation number of
+    its parents (root commits have generation 1), so a commit can only be an ancestor of
+    commits with a larger generation number.
+
+    Commits are added using the output of log. Since commit ids are derived from their
+    content, entries never become invalid. If a filename is passed, the index is loaded from
+    it and new entries are appended to it when save() is called
+    '''
+
+    def __init__(self, filename=None):
+        self.filename = filename
+        self._parents = {}
+        self._generations = {}
+        self._dates = {}
+        self._pending = {}
+        self._unsaved = []
+        if filename is not None:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.filename) as f:
+                for line in f:
+                    tokens = line.split()
+                    # skip lines left incomplete by an interrupted write, or otherwise corrupt
+                    if not line.endswith("\n") or len(tokens) < 3:
+                        continue
+                    if not all(_ID.match(t) for t in tokens[:1] + tokens[3:]):
+                        continue
+                    try:
+                        generation = int(tokens[1])
+                        date = float(tokens[2])
+                    except ValueError:
+                        continue
+                    commitid = intern(tokens[0])
+                    self._parents[commitid] = tuple(intern(p) for p in tokens[3:])
+                    self._generations[commitid] = generation
+                    self._dates[commitid] = date
+        except IOError:
+            pass
+        # commits whose parents were dropped cannot be walked, so they are dropped as well
+        children = {}
+        dropped = []
+        for commitid, parents in self._parents.iteritems():
+            for parent in parents:
+                children.setdefault(parent, []).append(commitid)
+                if parent not in self._parents:
+                    dropped.append(commitid)
+        while dropped:
+            commitid = dropped.pop()
+            if commitid in self._parents:
+                del self._parents[commitid]
+                del self._generations[commitid]
+                del self._dates[commitid]
+                dropped.extend(children.get(commitid, []))
+
+    def save(self):
+        '''Appends the commits added since the last time it was saved to the index file'''
+        if self.filename is None or not self._unsaved:
+            return
+        lines = []
+        for commitid in self._unsaved:
+            tokens = [commitid, str(self._generations[commitid]), repr(self._dates[commitid])]
+            tokens.extend(self._parents[commitid])
+            lines.append(" ".join(tokens) + "\n")
+        try:
+            with open(self.filename, "a") as f:
+                f.write("".join(lines))
+            self._unsaved = []
+        except IOError, e:
+            _logger.warning("Cannot write commit graph to %s: %s" % (self.filename, e))
+
+    def add(self, commits):
+        '''
+        Adds the passed Commit objects. A commit is indexed once all its ancestors have been
+        added. Until then, its parents that are not known are returned by missingparents()
+        '''
+        for commit in commits:
+            if commit.commitid not in self._generations:
+                parents = tuple(intern(p) for p in commit._parents if p != NULL_ID)
+                date = _timestamp(commit.committerdate)
+                self._pending[intern(commit.commitid)] = (parents, date)
+        self._resolve()
+
+    def _resolve(self):
+        blocked = set()
+        stack = list(self._pending)
+        while stack:
+            commitid = stack[-1]
+            if commitid not in self._pending or commitid in blocked:
+                stack.pop()
+                continue
+            parents, date = self._pending[commitid]
+            unresolved = [p for p in parents if p in self._pending and p not in blocked]
+            if unresolved:
+                stack.extend(unresolved)
+                continue
+            stack.pop()
+            if any(p not in self._generations for p in parents):
+                blocked.add(commitid)
+                continue
+            self._generations[commitid] = 1 + max([self._generations[p] for p in parents] or [0])
+            self._parents[commitid] = parents
+            self._dates[commitid] = date
+            self._unsaved.append(commitid)
+            del self._pending[commitid]
+
+    def missingparents(self):
+        '''Returns the ids of the parents of added commits that are not in the graph'''
+        return set(p for parents, date in self._pending.itervalues() for p in parents
+                   if p not in self._generations and p not in self._pending)
+
+    def parents(self, commitid):
+        return list(self._parents[commitid])
+
+    def generation(self, commitid):
+        return self._generations[commitid]
+
+    def date(self, commitid):
+        '''Returns the commit date of the passed commit, in seconds since the epoch'''
+        return self._dates[commitid]
+
+    def isancestor(self, ancestor, commitid):
+        '''Returns True if the first commit is an ancestor of the second one, or the same commit'''
+        if ancestor == commitid:
+            return True
+        generation = self._generations[ancestor]
+        visited = set([commitid])
+        stack = [commitid]
+        while stack:
+            for parent in self._parents[stack.pop()]:
+                if parent == ancestor:
+                    return True
+                if parent not in visited and self._generations[parent] > generation:
+                    visited.add(parent)
+                    stack.append(parent)
+        return False
+
+    def _paint(self, commita, commitb, onpop, interesting):
+        '''
+        Walks the history of both commits from the newest to the oldest commit, marking each
+        commit with the side it can be reached from, and calling onpop with each commit and
+        its marks once they are final. onpop returns the marks to pass to the parents of the
+        commit. The walk stops when none of the commits left to visit is interesting
+        '''
+        flags = {commita: _FROMA}
+        flags[commitb] = flags.get(commitb, 0) | _FROMB
+        queue = [(-self._generations[c], c) for c in flags]
+        heapq.heapify(queue)
+        active = sum(1 for c in flags if interesting(flags[c]))
+        while queue and active:
+            g, commitid = heapq.heappop(queue)
+            if interesting(flags[commitid]):
+                active -= 1
+            commitflags = onpop(commitid, flags[commitid])
+            for parent in self._parents[commitid]:
+                if parent not in flags:
+                    flags[parent] = commitflags
+                    heapq.heappush(queue, (-self._generations[parent], parent))
+                    if interesting(commitflags):
+                        active += 1
+                else:
+                    before = interesting(flags[parent])
+                    flags[parent] |= commitflags
+                    active += interesting(flags[parent]) - before
+
+    def mergebases(self, commita, commitb):
+        '''Returns the ids of the best common ancestors of the two passed commits'''
+        candidates = []
+
+        def onpop(commitid, flags):
+            if flags & _BOTH == _BOTH and not flags & _STALE:
+                candidates.append(commitid)
+                return flags | _STALE
+            return flags
+
+        self._paint(commita, commitb, onpop, lambda flags: not flags & _STALE)
+        return [c for c in candidates
+                if not any(o != c and self.isancestor(c, o) for o in candidates)]
+
+    def mergebase(self, commita, commitb):
+        '''Returns the id of the best common ancestor of the two passed commits, or None if there is none'''
+        bases = self.mergebases(commita, commitb)
+        if not bases:
+            return None
+        return max(bases, key=lambda c: (self._generations[c], self._dates[c]))
+
+    def aheadbehind(self, commita, commitb):
+        '''
+        Returns a tuple with the number of commits that can be reached from the first commit
+        but not from the second one, and the number of those that can be reached from the
+        second one but not from the first one
+        '''
+        counts = {_FROMA: 0, _FROMB: 0, _BOTH: 0}
+
+        def onpop(commitid, flags):
+            counts[flags] += 1
+            return flags
+
+        self._paint(commita, commitb, onpop, lambda flags: flags != _BOTH)
+        return counts[_FROMA], counts[_FROMB]
+
+    def __contains__(self, commitid):
+        return commitid in self._generations
+
+    def __len__(self):
+        return len(self._generations)
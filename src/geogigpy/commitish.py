@@ -35,6 +35,8 @@ class Commitish(object):
     This does not store the information of the commit, but it is supposed to serve to perform actual work
     on that snapshot, like retrieving trees and feature for the version it represents'''
 
+    __slots__ = ('ref', 'repo', '_diff', '_id')
+
     def __init__(self, repo, ref):
         self.ref = ref
         self.repo = repo
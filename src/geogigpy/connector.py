@@ -62,6 +62,9 @@ class Connector(object):
     def children(self, ref, path, recursive):
         raise NotImplementedError
 
+    def iterchildren(self, ref, path, recursive):
+        return iter(self.children(ref, path, recursive))
+
     def addremote(self, name, url, username, password):
         raise NotImplementedError
 
@@ -74,6 +77,13 @@ class Connector(object):
     def log(self, tip, sincecommit, until, since, path, n):
         raise NotImplementedError
 
+    def cachedcommit(self, commitid):
+        '''Returns the commit with the passed id if it can be found without running any command, or None'''
+        return None
+
+    def iterlog(self, tip, sincecommit, until, since, path, n):
+        return iter(self.log(tip, sincecommit, until, since, path, n))
+
     def conflicts(self):
         raise NotImplementedError
 
@@ -113,6 +123,9 @@ class Connector(object):
     def diff(self, refa, refb, path):
         raise NotImplementedError
 
+    def iterdiff(self, refa, refb, path):
+        return iter(self.diff(refa, refb, path))
+
     def difftreestats(self, refa, refb):
         raise NotImplementedError
 
@@ -164,7 +177,7 @@ class Connector(object):
     def featuresdata(self, refs):
         raise NotImplementedError
 
-    def featuretype(self, ref, tree):
+    def featuretype(self, ref, tree, ftypeid=None):
         raise NotImplementedError
 
     def featurediff(self, ref, ref2, path):
@@ -215,6 +228,12 @@ class Connector(object):
     def getconfig(self, param):
         raise NotImplementedError
 
+    def iterchangedattributes(self, path, refa, refb):
+        raise NotImplementedError
+
+    def fetch(self, remote):
+        raise NotImplementedError
+
     def pull(self, remote, branch, rebase):
         raise NotImplementedError
 
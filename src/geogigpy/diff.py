@@ -25,8 +25,10 @@ __copyright__ = '(C) 2013-2016 Boundless, http://boundlessgeo.com'
 __revision__ = '$Format:%H$'
 
 
+import binascii
 from feature import Feature
 from geogig import NULL_ID
+from utils import internref
 
 TYPE_MODIFIED = "Modified"
 TYPE_ADDED = "Added"
@@ -34,18 +36,62 @@ TYPE_REMOVED = "Removed"
 
 ATTRIBUTE_DIFF_MODIFIED, ATTRIBUTE_DIFF_ADDED, ATTRIBUTE_DIFF_REMOVED, ATTRIBUTE_DIFF_UNCHANGED = ["M", "A", "R", "U"]
 
+_binaryids = True
+
+
+def setBinaryIds(binary):
+    '''
+    Sets whether new Diffentry objects store object ids as 20-byte binary strings instead
+    of 40-char hex ones. They are returned as hex strings in both cases
+    '''
+    global _binaryids
+    _binaryids = binary
+
+
+def _packid(objectid):
+    if _binaryids and len(objectid) == 40:
+        try:
+            return binascii.unhexlify(objectid)
+        except TypeError:
+            pass
+    return objectid
+
+
+def _unpackid(packed):
+    if len(packed) == 20:
+        return binascii.hexlify(packed)
+    return packed
+
 
 class Diffentry(object):
 
     '''A difference between two references for a given path'''
 
+    __slots__ = ('repo', 'path', '_oldref', '_newref', 'oldcommitref', 'newcommitref')
+
     def __init__(self, repo, oldcommitref, newcommitref, oldref, newref, path):
         self.repo = repo
         self.path = path
         self.oldref = oldref
         self.newref = newref
-        self.oldcommitref = oldcommitref
-        self.newcommitref = newcommitref
+        self.oldcommitref = internref(oldcommitref)
+        self.newcommitref = internref(newcommitref)
+
+    @property
+    def oldref(self):
+        return _unpackid(self._oldref)
+
+    @oldref.setter
+    def oldref(self, oldref):
+        self._oldref = _packid(oldref)
+
+    @property
+    def newref(self):
+        return _unpackid(self._newref)
+
+    @newref.setter
+    def newref(self, newref):
+        self._newref = _packid(newref)
 
     def oldobject(self):
         if self.oldref == NULL_ID:
@@ -25,18 +25,25 @@ __copyright__ = '(C) 2013-2016 Boundless, http://boundlessgeo.com'
 __revision__ = '$Format:%H$'
 
 
+import weakref
 from geogigexception import GeoGigException
 from geometry import Geometry
+from utils import internref
+
+DEFAULT_BATCH_SIZE = 100
 
 
 class Feature(object):
 
+    __slots__ = ('repo', 'ref', 'path', '_attributes', '_featuretype', '_batch', '__weakref__')
+
     def __init__(self, repo, ref, path):
         self.repo = repo
-        self.ref = ref
+        self.ref = internref(ref)
         self.path = path
         self._attributes = None
         self._featuretype = None
+        self._batch = None
 
     @property
     def attributes(self):
@@ -101,9 +108,18 @@ class Feature(object):
         return self.repo.featurediff(self.ref, feature.ref, self.path)
 
     def query(self):
+        if self._batch is not None:
+            batch = self._batch
+            self._batch = None
+            batch.load()
+            if self._attributes is not None:
+                return
         data = self.repo.featuredata(self.ref, self.path)
         if len(data) == 0:
             raise GeoGigException("Feature at the specified path does not exist")
+        self._setdata(data)
+
+    def _setdata(self, data):
         self._attributes = dict(((k, v[0]) for k, v in data.iteritems()))
         self._featuretype = dict(((k, v[1]) for k, v in data.iteritems()))
 
@@ -142,3 +158,40 @@ class Feature(object):
 
     def __str__(self):
         return self.ref + ":" + self.path
+
+
+class FeatureBatch(object):
+    '''
+    A group of sibling features whose attributes are all retrieved with a single
+    command the first time that any of them is queried
+    '''
+
+    def __init__(self, repo, size=DEFAULT_BATCH_SIZE):
+        self.repo = repo
+        self.size = size
+        self._features = []
+
+    def isfull(self):
+        return len(self._features) >= self.size
+
+    def add(self, feature):
+        self._features.append(weakref.ref(feature))
+        feature._batch = self
+
+    def load(self):
+        features = [ref() for ref in self._features]
+        features = [f for f in features if f is not None and f._attributes is None]
+        self._features = []
+        for f in features:
+            f._batch = None
+        if not features:
+            return
+        refs = [str(f) for f in features]
+        try:
+            data = self.repo.connector.featuresdata(refs)
+        except GeoGigException:
+            # features will be queried one by one
+            return
+        for f, ref in zip(features, refs):
+            if data.get(ref):
+                f._setdata(data[ref])
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    featuretable.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+
+from array import array
+from feature import Feature
+from geometry import Geometry
+from geogigexception import GeoGigException
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+DEFAULT_CHUNK_SIZE = 10000
+
+# Name of the column with the paths of the features
+PATH_COLUMN = "__path__"
+
+INTEGER, FLOAT, BOOLEAN, GEOMETRY, OBJECT = range(5)
+
+_INTEGER_TYPES = ["BYTE", "SHORT", "INTEGER", "LONG"]
+_FLOAT_TYPES = ["FLOAT", "DOUBLE"]
+_GEOMETRY_TYPES = ["GEOMETRY", "POINT", "LINESTRING", "POLYGON", "MULTIPOINT", "MULTILINESTRING",
+                   "MULTIPOLYGON", "GEOMETRYCOLLECTION"]
+
+# array typecode used for integer columns when numpy is not available. 'l' is only
+# 64 bits wide in some platforms, so larger values are stored in a list in the others
+_INTCODE = 'l' if array('l').itemsize == 8 else None
+
+_NAN = float("nan")
+
+
+def columnkind(typename):
+    '''Returns the kind of column used for an attribute type, as returned by Repository.featuretype'''
+    if typename in _INTEGER_TYPES:
+        return INTEGER
+    if typename in _FLOAT_TYPES:
+        return FLOAT
+    if typename == "BOOLEAN":
+        return BOOLEAN
+    if typename.split(" ")[0] in _GEOMETRY_TYPES:
+        return GEOMETRY
+    return OBJECT
+
+
+def iterfeaturetable(repo, ref, path, chunksize=DEFAULT_CHUNK_SIZE):
+    '''
+    Returns a generator of tables with the features in the passed ref and path, each of
+    them with up to chunksize features. See featuretable for a description of the tables
+    '''
+    kinds = dict((name, columnkind(t)) for name, t in repo.featuretype(ref, path).iteritems())
+    features = []
+    for child in repo.connector.iterchildren(ref, path):
+        if isinstance(child, Feature):
+            features.append((str(child), child.path))
+            if len(features) == chunksize:
+                yield _table(repo, features, kinds)
+                features = []
+    if features:
+        yield _table(repo, features, kinds)
+
+
+def featuretable(repo, ref, path, chunksize=DEFAULT_CHUNK_SIZE):
+    '''
+    Returns a dict with the attributes of the features in the passed ref and path, with
+    attribute names as keys and columns of values as values. The paths of the features
+    are in the PATH_COLUMN column.
+
+    Columns are numpy arrays if numpy is installed: int64 for integer attributes (float64
+    if there are missing values), float64 for decimal ones (with NaN as missing value),
+    bool for boolean ones (object if there are missing values), and object for strings and
+    geometries, which are stored as WKB. Otherwise, arrays from the array module are used
+    for numbers and lists for the rest.
+
+    Features are listed and their data retrieved in chunks of chunksize features, and the
+    Feature objects created while listing them are not kept
+    '''
+    chunks = None
+    for chunk in iterfeaturetable(repo, ref, path, chunksize):
+        if chunks is None:
+            chunks = dict((name, [column]) for name, column in chunk.iteritems())
+        else:
+            for name, column in chunk.iteritems():
+                chunks[name].append(column)
+    if chunks is None:
+        kinds = dict((name, columnkind(t)) for name, t in repo.featuretype(ref, path).iteritems())
+        return _table(repo, [], kinds)
+    return dict((name, _concat(columns)) for name, columns in chunks.iteritems())
+
+
+def todataframe(table):
+    '''Returns a pandas DataFrame with the columns of a table, indexed by feature path'''
+    try:
+        import pandas
+    except ImportError:
+        raise GeoGigException("pandas is needed to create a DataFrame")
+    columns = dict((k, v) for k, v in table.iteritems() if k != PATH_COLUMN)
+    return pandas.DataFrame(columns, index=list(table[PATH_COLUMN]))
+
+
+def _fetch(repo, refs):
+    try:
+        return repo.connector.featuresdata(refs)
+    except GeoGigException:
+        data = {}
+        for ref in refs:
+            fref, fpath = ref.split(":", 1)
+            try:
+                data[ref] = repo.connector.featuredata(fref, fpath)
+            except GeoGigException:
+                pass
+        return data
+
+
+def _table(repo, features, kinds):
+    data = _fetch(repo, [ref for ref, path in features]) if features else {}
+    values = dict((name, []) for name in kinds)
+    paths = []
+    for ref, path in features:
+        attrs = data.get(ref)
+        if not attrs:
+            continue
+        paths.append(path)
+        for name, column in values.iteritems():
+            value = attrs.get(name)
+            column.append(None if value is None else value[0])
+    table = dict((name, _column(values[name], kind)) for name, kind in kinds.iteritems())
+    table[PATH_COLUMN] = _column(paths, OBJECT)
+    return table
+
+
+def _column(values, kind):
+    if kind == GEOMETRY:
+        values = [v.wkb if isinstance(v, Geometry) else v for v in values]
+    try:
+        if numpy is not None:
+            return _numpycolumn(values, kind)
+        return _arraycolumn(values, kind)
+    except (TypeError, ValueError, OverflowError):
+        # values that could not be converted when parsing are kept as strings
+        return _numpycolumn(values, OBJECT) if numpy is not None else values
+
+
+def _numpycolumn(values, kind):
+    hasnulls = None in values
+    if kind == INTEGER and not hasnulls:
+        return numpy.array(values, dtype=numpy.int64)
+    if kind in (INTEGER, FLOAT):
+        return numpy.array([_NAN if v is None else v for v in values], dtype=numpy.float64)
+    if kind == BOOLEAN and not hasnulls:
+        return numpy.array(values, dtype=numpy.bool_)
+    column = numpy.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def _arraycolumn(values, kind):
+    hasnulls = None in values
+    if kind == INTEGER and not hasnulls and _INTCODE is not None:
+        return array(_INTCODE, values)
+    if kind in (INTEGER, FLOAT) and (hasnulls or kind == FLOAT):
+        return array('d', [_NAN if v is None else v for v in values])
+    if kind == BOOLEAN and not hasnulls:
+        return array('b', values)
+    return values
+
+
+def _concat(columns):
+    '''Concatenates the chunks of a column, copying each of them only once'''
+    if len(columns) == 1:
+        return columns[0]
+    if numpy is not None:
+        if any(c.dtype == object for c in columns):
+            column = numpy.empty(sum(len(c) for c in columns), dtype=object)
+            start = 0
+            for c in columns:
+                column[start:start + len(c)] = c
+                start += len(c)
+            return column
+        return numpy.concatenate(columns)
+    if all(isinstance(c, array) for c in columns):
+        typecodes = set(c.typecode for c in columns)
+        typecode = typecodes.pop() if len(typecodes) == 1 else ('d' if 'd' in typecodes else None)
+        if typecode is not None:
+            column = array(typecode)
+            for c in columns:
+                column.extend(c if c.typecode == typecode else array(typecode, c))
+            return column
+    column = []
+    for c in columns:
+        column.extend(c)
+    return column
@@ -44,3 +44,18 @@ class InterruptedOperationException(Exception):
 
 class GeoGigConflictException(InterruptedOperationException):
     pass
+
+
+class PoolException(GeoGigException):
+    '''
+    Raised when an operation run on several repositories fails for some of them.
+    results contains the results of the repositories where it succeeded, and errors
+    the exceptions raised by the ones where it failed, both keyed by repository url.
+    It is also raised by Repository.exportmany and importmany, keyed by job
+    '''
+
+    def __init__(self, results, errors):
+        GeoGigException.__init__(self, "%i operations failed: %s"
+                                 % (len(errors), ", ".join(str(k) for k in errors)))
+        self.results = results
+        self.errors = errors
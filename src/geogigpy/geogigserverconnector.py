@@ -26,23 +26,76 @@ __revision__ = '$Format:%H$'
 
 
 import re
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 from connector import Connector
 from commit import Commit
 import xml.etree.ElementTree as ET
 from geogigexception import GeoGigException
 import geogig
+try:
+    from requests.packages.urllib3.util.retry import Retry
+except ImportError:
+    Retry = None
 
 
 SHA_MATCHER = re.compile(r"\b([a-f0-9]{40})\b")
 
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 30
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+
+_sessions = {}
+_sessionsLock = threading.Lock()
+
+
+def _session(poolsize, retries, backoff):
+    '''
+    Returns a session with a pool of keep-alive connections. Sessions are shared by all
+    connectors using the same settings, so connections are reused across repositories
+    and across connector instances
+    '''
+    key = (poolsize, retries, backoff)
+    with _sessionsLock:
+        if key not in _sessions:
+            if Retry is not None:
+                maxretries = Retry(total=retries, backoff_factor=backoff,
+                                   status_forcelist=[502, 503, 504])
+            else:
+                maxretries = retries
+            adapter = HTTPAdapter(pool_connections=poolsize, pool_maxsize=poolsize,
+                                  max_retries=maxretries)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[key] = session
+        return _sessions[key]
+
 
 class GeoGigServerConnector(Connector):
     ''' A connector that connects to a geogig repo through a geogig-server instance'''
 
-    def __init__(self, credentials=None):
+    def __init__(self, credentials=None, poolsize=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT,
+                 retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+        '''
+        credentials: a tuple of (username, password), if the server requires authentication
+
+        poolsize: the maximum number of connections to keep open to each host
+
+        timeout: the number of seconds to wait for the server to respond
+
+        retries: the number of times a failed request is retried, waiting
+        backoff * (2 ^ (retry number - 1)) seconds before each retry
+        '''
         Connector.__init__(self)
         self.credentials = credentials
+        self.timeout = timeout
+        self.session = _session(poolsize, retries, backoff)
+
+    def _get(self, url, params=None):
+        return self.session.get(url, params=params, auth=self.credentials, timeout=self.timeout)
 
     def log(self, tip, sincecommit=None, until=None, since=None, path=None, n=None):
         if since is not None or path is not None:
@@ -50,23 +103,26 @@ class GeoGigServerConnector(Connector):
         if SHA_MATCHER.match(tip) is None:
             tip = self.revparse(tip)
         if sincecommit and SHA_MATCHER.match(sincecommit) is None:
-            tip = self.revparse(sincecommit)
-        oldref = "&oldRefSpec=" + sincecommit if sincecommit else ""
-        url = self.repo.url + "/commits?newRefSpec=%s%s" % (tip, oldref)
-        r = requests.get(url, auth=self.credentials)
+            sincecommit = self.revparse(sincecommit)
+        params = {"newRefSpec": tip}
+        if sincecommit:
+            params["oldRefSpec"] = sincecommit
+        r = self._get(self.repo.url + "/commits", params)
         r.raise_for_status()
         commits = r.json()['commits']
         log = []
         for c in commits:
-            commit = Commit(self.repo, c['sha'], None, c.get('parent', geogig.NULL_ID), c['message'],
+            parents = c.get('parent', geogig.NULL_ID)
+            if isinstance(parents, basestring):
+                parents = [parents]
+            commit = Commit(self.repo, c['sha'], None, parents, c['message'],
                             c['author']['name'], c['author']['date'], c['committer']['name'], c['committer']['date'])
             log.append(commit)
         return log
 
     def checkisrepo(self):
         try:
-            url = self.repo.url + '/commits'
-            r = requests.get(url)
+            r = self._get(self.repo.url + '/commits')
             response = r.json()
             return 'currentBranch' in response
         except:
@@ -74,8 +130,7 @@ class GeoGigServerConnector(Connector):
 
     def revparse(self, rev):
         try:
-            url = self.repo.url + '/refparse'
-            r = requests.get(url, params={'name': rev}, auth=self.credentials)
+            r = self._get(self.repo.url + '/refparse', {'name': rev})
             root = ET.fromstring(r.text)
             id = root.iter('objectId').next().text
             return id
@@ -84,5 +139,6 @@ class GeoGigServerConnector(Connector):
 
     @staticmethod
     def createrepo(url, name):
-        r = requests.put(url, data=name)
+        session = _session(DEFAULT_POOL_SIZE, DEFAULT_RETRIES, DEFAULT_BACKOFF)
+        r = session.put(url, data=name, timeout=DEFAULT_TIMEOUT)
         r.raise_for_status()
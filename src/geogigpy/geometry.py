@@ -25,11 +25,228 @@ __copyright__ = '(C) 2014-2016 Boundless, http://boundlessgeo.com'
 __revision__ = '$Format:%H$'
 
 
+import re
+import sys
+import struct
+from array import array
+
+_HEADER = re.compile(r"\s*([A-Za-z]+)(?:\s+(ZM|Z|M)\b)?\s*", re.IGNORECASE)
+
+_WKB_CODES = {"POINT": 1, "LINESTRING": 2, "POLYGON": 3, "MULTIPOINT": 4,
+              "MULTILINESTRING": 5, "MULTIPOLYGON": 6, "GEOMETRYCOLLECTION": 7}
+
+
 class Geometry(object):
 
+    '''
+    A geometry, as a WKT string and a CRS definition.
+    The WKT string is parsed the first time that coordinates are needed. Coordinates
+    are stored as flat arrays of doubles, with all the ordinates of each point
+    one after another
+    '''
+
+    __slots__ = ('geom', 'crs', '_parsed', '_bounds', '_numpoints', '_wkb')
+
     def __init__(self, geom, crs):
         self.geom = geom
         self.crs = crs
+        self._parsed = None
+        self._bounds = None
+        self._numpoints = None
+        self._wkb = None
+
+    def _parse(self):
+        if self._parsed is None:
+            self._parsed, pos = _parsegeometry(self.geom, 0)
+        return self._parsed
+
+    @property
+    def geomtype(self):
+        '''Returns the type of this geometry, as an uppercase WKT name (i.e. MULTIPOLYGON)'''
+        return self._parse()[0]
+
+    @property
+    def dimension(self):
+        '''Returns the number of ordinates of each point'''
+        return self._parse()[1]
+
+    @property
+    def coordinates(self):
+        '''
+        Returns the coordinates of this geometry. A point or a linestring is represented by an
+        array of doubles, a polygon by a list of those arrays (one for each ring), and multipart
+        geometries by a list of the representations of their parts. For a geometry collection,
+        a list of (geomtype, dimension, coordinates) tuples is returned
+        '''
+        return self._parse()[3]
+
+    @property
+    def numpoints(self):
+        '''Returns the number of points in this geometry'''
+        if self._numpoints is None:
+            self._numpoints = sum(len(a) // dim for a, dim in _arrays(self._parse()))
+        return self._numpoints
+
+    @property
+    def bounds(self):
+        '''Returns the bounds of this geometry as a (minx, miny, maxx, maxy) tuple, or None if it is empty'''
+        if self._bounds is None and self.numpoints:
+            minx = miny = float("inf")
+            maxx = maxy = float("-inf")
+            for a, dim in _arrays(self._parse()):
+                if a:
+                    xs = a[0::dim]
+                    ys = a[1::dim]
+                    minx = min(minx, min(xs))
+                    maxx = max(maxx, max(xs))
+                    miny = min(miny, min(ys))
+                    maxy = max(maxy, max(ys))
+            self._bounds = (minx, miny, maxx, maxy)
+        return self._bounds
+
+    def intersectsbounds(self, bounds):
+        '''Returns True if the bounds of this geometry intersect the passed (minx, miny, maxx, maxy) tuple'''
+        b = self.bounds
+        if b is None:
+            return False
+        return not (b[0] > bounds[2] or b[2] < bounds[0] or b[1] > bounds[3] or b[3] < bounds[1])
+
+    @property
+    def wkb(self):
+        '''Returns this geometry as little-endian ISO WKB'''
+        if self._wkb is None:
+            chunks = []
+            _writewkb(self._parse(), chunks)
+            self._wkb = "".join(chunks)
+        return self._wkb
 
     def __str__(self):
         return self.geom
+
+
+def _skipspaces(s, pos):
+    while s[pos].isspace():
+        pos += 1
+    return pos
+
+
+def _parsegeometry(s, pos):
+    '''Parses a WKT geometry starting at pos. Returns a (geomtype, dimension, ordinates, coordinates) tuple and the end position'''
+    m = _HEADER.match(s, pos)
+    if m is None:
+        raise ValueError("Wrong WKT geometry: " + s[pos:pos + 50])
+    geomtype = m.group(1).upper()
+    ordinates = (m.group(2) or "").upper()
+    pos = m.end()
+    if s[pos:pos + 5].upper() == "EMPTY":
+        dim = len(ordinates) + 2
+        if geomtype in ["POINT", "LINESTRING"]:
+            return (geomtype, dim, ordinates, array('d')), pos + 5
+        return (geomtype, dim, ordinates, []), pos + 5
+    if geomtype == "GEOMETRYCOLLECTION":
+        pos = _skipspaces(s, pos) + 1
+        parts = []
+        while True:
+            part, pos = _parsegeometry(s, pos)
+            parts.append(part)
+            pos = _skipspaces(s, pos)
+            pos += 1
+            if s[pos - 1] == ")":
+                break
+        dim = parts[0][1] if parts else 2
+        return (geomtype, dim, ordinates, parts), pos
+    nested, pos = _parsenested(s, pos)
+    dim = _dimension(nested)
+    coords = _toarrays(nested)
+    if geomtype == "MULTIPOINT" and isinstance(coords, array):
+        # MULTIPOINT (x y, x y) instead of MULTIPOINT ((x y), (x y))
+        coords = [coords[i:i + dim] for i in xrange(0, len(coords), dim)]
+    return (geomtype, dim, ordinates, coords), pos
+
+
+def _parsenested(s, pos):
+    pos = _skipspaces(s, pos) + 1
+    pos = _skipspaces(s, pos)
+    if s[pos] != "(":
+        end = s.index(")", pos)
+        return s[pos:end], end + 1
+    items = []
+    while True:
+        item, pos = _parsenested(s, pos)
+        items.append(item)
+        pos = _skipspaces(s, pos)
+        pos += 1
+        if s[pos - 1] == ")":
+            return items, pos
+
+
+def _dimension(nested):
+    while isinstance(nested, list):
+        nested = nested[0]
+    return len(nested.split(",", 1)[0].split())
+
+
+def _toarrays(nested):
+    if isinstance(nested, list):
+        return [_toarrays(n) for n in nested]
+    return array('d', [float(v) for v in nested.replace(",", " ").split()])
+
+
+def _arrays(parsed):
+    '''Yields all the coordinate arrays in a parsed geometry, along with their dimension'''
+    geomtype, dim, ordinates, coords = parsed
+    if geomtype == "GEOMETRYCOLLECTION":
+        for part in coords:
+            for a in _arrays(part):
+                yield a
+    else:
+        stack = [coords]
+        while stack:
+            c = stack.pop()
+            if isinstance(c, array):
+                yield c, dim
+            else:
+                stack.extend(reversed(c))
+
+
+def _writewkb(parsed, chunks):
+    geomtype, dim, ordinates, coords = parsed
+    code = _WKB_CODES[geomtype]
+    if dim == 4:
+        code += 3000
+    elif dim == 3:
+        code += 2000 if ordinates == "M" else 1000
+    chunks.append(struct.pack("<BI", 1, code))
+    if geomtype == "GEOMETRYCOLLECTION":
+        chunks.append(struct.pack("<I", len(coords)))
+        for part in coords:
+            _writewkb(part, chunks)
+    elif geomtype == "POINT":
+        if len(coords):
+            chunks.append(_pointsbytes(coords))
+        else:
+            chunks.append(struct.pack("<" + "d" * dim, *([float("nan")] * dim)))
+    elif geomtype == "LINESTRING":
+        chunks.append(struct.pack("<I", len(coords) // dim))
+        chunks.append(_pointsbytes(coords))
+    elif geomtype == "POLYGON":
+        _writerings(coords, dim, chunks)
+    else:
+        parttype = geomtype[len("MULTI"):]
+        chunks.append(struct.pack("<I", len(coords)))
+        for part in coords:
+            _writewkb((parttype, dim, ordinates, part), chunks)
+
+
+def _writerings(rings, dim, chunks):
+    chunks.append(struct.pack("<I", len(rings)))
+    for ring in rings:
+        chunks.append(struct.pack("<I", len(ring) // dim))
+        chunks.append(_pointsbytes(ring))
+
+
+def _pointsbytes(a):
+    if sys.byteorder == "big":
+        a = array('d', a)
+        a.byteswap()
+    return a.tostring()
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    objectcache.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+
+import re
+import time
+import sqlite3
+import cPickle
+import threading
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+# When the cache is full, objects are removed until its size is below this fraction of the maximum
+_EVICTION_TARGET = 0.9
+
+# Access times are only updated when they are older than this, to avoid a write for each read
+_ATIME_RESOLUTION = 3600
+
+_OBJECTID = re.compile(r"^[a-f0-9]{40}$")
+
+_cache = None
+
+
+def setObjectCache(filename, maxsize=DEFAULT_MAX_SIZE):
+    '''
+    Sets the file where objects that never change, such as the data of a feature in a given
+    commit, are cached, so they can be used without running geogig, even by other processes.
+    The file is created if it does not exist. Passing None disables the cache
+    '''
+    global _cache
+    if _cache is not None:
+        _cache.close()
+    _cache = None if filename is None else ObjectCache(filename, maxsize)
+
+
+def objectCache():
+    '''Returns the ObjectCache in use, or None if objects are not being cached'''
+    return _cache
+
+
+def immutablekey(ref, path=None):
+    '''
+    Returns the key to use for an object identified by a ref and, optionally, a path, or None if
+    the ref is not an object id, and the object it points to can therefore change
+    '''
+    if ref is None or _OBJECTID.match(ref) is None:
+        return None
+    if path is None:
+        return ref
+    return ref + ":" + path
+
+
+def immutablerefspec(refspec):
+    '''Like immutablekey, but for a refspec in the form ref:path'''
+    ref, sep, path = refspec.partition(":")
+    return immutablekey(ref, path if sep else None)
+
+
+class ObjectCache(object):
+    '''
+    A cache of parsed objects stored in a SQLite database, keyed by the kind of object and its id.
+    Ids must identify content that cannot change, such as a commit id or a commit id and a path.
+
+    When the size of the stored objects exceeds maxsize bytes, the least recently used ones
+    are removed
+    '''
+
+    def __init__(self, filename, maxsize=DEFAULT_MAX_SIZE):
+        self.filename = filename
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(filename, timeout=30, check_same_thread=False)
+        self._db.text_factory = str
+        self._db.execute("CREATE TABLE IF NOT EXISTS objects (kind TEXT, id TEXT, data BLOB, "
+                         "size INTEGER, atime REAL, PRIMARY KEY (kind, id))")
+        self._db.execute("CREATE INDEX IF NOT EXISTS objects_atime ON objects (atime)")
+        self._db.commit()
+        self._size = self._storedsize()
+
+    def _storedsize(self):
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+
+    def get(self, kind, objectid):
+        '''Returns the cached object, or None if it is not in the cache'''
+        with self._lock:
+            row = self._db.execute("SELECT data, atime FROM objects WHERE kind=? AND id=?",
+                                   (kind, objectid)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            now = time.time()
+            if now - row[1] > _ATIME_RESOLUTION:
+                self._db.execute("UPDATE objects SET atime=? WHERE kind=? AND id=?", (now, kind, objectid))
+                self._db.commit()
+        return cPickle.loads(str(row[0]))
+
+    def put(self, kind, objectid, value):
+        self.putmany(kind, [(objectid, value)])
+
+    def putmany(self, kind, items):
+        '''Stores a set of objects of the same kind, passed as (id, object) tuples'''
+        now = time.time()
+        rows = []
+        for objectid, value in items:
+            data = cPickle.dumps(value, cPickle.HIGHEST_PROTOCOL)
+            rows.append((kind, objectid, sqlite3.Binary(data), len(data), now))
+        if not rows:
+            return
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?)", rows)
+            self._db.commit()
+            self._size += sum(row[3] for row in rows)
+            if self._size > self.maxsize:
+                self._evict()
+
+    def _evict(self):
+        # other processes might be using the same file, so the actual size is checked
+        self._size = self._storedsize()
+        target = self.maxsize * _EVICTION_TARGET
+        if self._size <= target:
+            return
+        torelease = self._size - target
+        released = 0
+        rowids = []
+        for rowid, size in self._db.execute("SELECT rowid, size FROM objects ORDER BY atime"):
+            rowids.append((rowid,))
+            released += size
+            if released >= torelease:
+                break
+        self._db.executemany("DELETE FROM objects WHERE rowid=?", rowids)
+        self._db.commit()
+        self._size -= released
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM objects")
+            self._db.commit()
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM objects").fetchone()[0]
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    persistentconnector.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+
+import os
+import time
+import socket
+import atexit
+import logging
+import threading
+import subprocess
+from py4j.java_gateway import JavaGateway, GatewayClient
+from py4j.protocol import Py4JNetworkError
+from geogigexception import GeoGigException
+from cliconnector import CLIConnector
+from py4jconnector import _runGateway, _runGatewayIter
+
+_workers = {}
+_workersLock = threading.Lock()
+_workerCommand = "geogig-gateway"
+_startupTimeout = 60
+
+_logger = logging.getLogger("geogigpy")
+
+
+def setWorkerCommand(command):
+    '''
+    Sets the command used to start a worker process. It must start a geogig
+    gateway server listening on the port passed as its only argument
+    '''
+    global _workerCommand
+    _workerCommand = command
+
+
+def setStartupTimeout(secs):
+    '''Sets the maximum time to wait for a worker process to accept connections'''
+    global _startupTimeout
+    _startupTimeout = secs
+
+
+def _freeport():
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+    finally:
+        s.close()
+
+
+class GeoGigWorker(object):
+    '''
+    A long-lived geogig process serving all the commands for a single repository.
+    Commands are sent one after another through the same connection, and the
+    process is restarted if it is found dead before running a command
+    '''
+
+    def __init__(self, url):
+        self.url = url
+        self.proc = None
+        self.gateway = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        port = _freeport()
+        command = [_workerCommand, str(port)]
+        devnull = open(os.devnull, "w")
+        self.proc = subprocess.Popen(command, shell=(os.name == 'nt'), stdout=devnull,
+                                     stderr=subprocess.STDOUT)
+        devnull.close()
+        deadline = time.time() + _startupTimeout
+        # the same gateway is used for all attempts, since it only connects when called
+        gateway = JavaGateway(GatewayClient(port=port))
+        while True:
+            if self.proc.poll() is not None:
+                gateway.close()
+                self.proc = None
+                raise GeoGigException("Cannot start geogig worker process. Check that %s is in your PATH"
+                                      % _workerCommand)
+            try:
+                gateway.entry_point.isGeoGigServer()
+                break
+            except Exception:
+                if time.time() > deadline:
+                    gateway.close()
+                    self.stop()
+                    raise GeoGigException("Timed out waiting for geogig worker process to start")
+                time.sleep(0.2)
+        self.gateway = gateway
+        _logger.debug("Started geogig worker for %s at port %i" % (self.url, port))
+
+    def stop(self):
+        if self.gateway is not None:
+            try:
+                self.gateway.shutdown()
+            except Exception:
+                pass
+            self.gateway = None
+        if self.proc is not None:
+            if self.proc.poll() is None:
+                self.proc.terminate()
+            self.proc.wait()
+            self.proc = None
+
+    def isalive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def _ensurealive(self):
+        if not self.isalive():
+            if self.proc is not None:
+                _logger.warning("geogig worker for %s is not running. Restarting it" % self.url)
+            self.stop()
+            self.start()
+
+    def _crashed(self, commands):
+        return GeoGigException("geogig worker process for %s crashed while running '%s'"
+                               % (self.url, " ".join(commands)))
+
+    def run(self, commands, func=_runGateway):
+        with self.lock:
+            self._ensurealive()
+            try:
+                return func(commands, self.url, gateway=self.gateway)
+            except Py4JNetworkError:
+                self.stop()
+                raise self._crashed(commands)
+
+    def runiter(self, commands):
+        '''
+        Runs a command and returns a generator over its output. Pages of output are
+        requested as the generator is consumed
+        '''
+        gateway, lines = self.run(commands, lambda commands, url, gateway:
+                                  (gateway, _runGatewayIter(commands, url, gateway=gateway)))
+        return self._iterlines(commands, gateway, lines)
+
+    def _iterlines(self, commands, gateway, lines):
+        try:
+            for line in lines:
+                yield line
+        except Py4JNetworkError:
+            with self.lock:
+                # the worker may have been restarted by another command in the meantime
+                if self.gateway is gateway:
+                    self.stop()
+            raise self._crashed(commands)
+
+
+def _worker(url):
+    with _workersLock:
+        if url not in _workers:
+            _workers[url] = GeoGigWorker(url)
+        return _workers[url]
+
+
+def stopWorkers():
+    '''Stops all running worker processes. They will be restarted if new commands are run'''
+    with _workersLock:
+        for worker in _workers.values():
+            worker.stop()
+        _workers.clear()
+
+atexit.register(stopWorkers)
+
+
+class PersistentCLIConnector(CLIConnector):
+    '''
+    A connector that parses geogig output just like the CLI connector, but sends commands
+    to a geogig process that is kept alive for each repository, instead of starting a new
+    JVM for each command
+    '''
+
+    maxcommandlength = None
+
+    def __init__(self):
+        self.commandslog = []
+
+    def run(self, commands):
+        self.commandslog.append(" ".join(commands))
+        return _worker(self.repo.url).run(commands)
+
+    def runiter(self, commands):
+        self.commandslog.append(" ".join(commands))
+        return _worker(self.repo.url).runiter(commands)
+
+    def stopworker(self):
+        '''Stops the worker process for the repository of this connector'''
+        with _workersLock:
+            worker = _workers.pop(self.repo.url, None)
+        if worker is not None:
+            worker.stop()
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    pool.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+
+import threading
+import multiprocessing
+from collections import OrderedDict
+from repo import Repository
+from cliconnector import CLIConnector
+from geogigexception import PoolException
+from bulkjobs import runall, DEFAULT_MAX_WORKERS
+
+
+def _call(repo, func, args, kwargs):
+    if isinstance(func, basestring):
+        return getattr(repo, func)(*args, **kwargs)
+    return func(repo, *args, **kwargs)
+
+
+def _runinprocess(task):
+    url, connector, func, args, kwargs = task
+    try:
+        return True, _call(Repository(url, connector()), func, args, kwargs)
+    except Exception, e:
+        return False, e
+
+
+class RepositoryPool(object):
+    '''
+    Runs the same operation on a set of repositories, with a bounded number of them
+    being processed at the same time.
+
+    By default, operations are run in threads, and each repository uses its own connector,
+    created by calling the connector argument. The default CLIConnector starts a separate
+    geogig process for each command, so commands for different repositories run in parallel.
+
+    If processes is True, a pool of processes is used instead. In that case, each operation
+    creates its own Repository object, and both the operation and its result must be picklable
+    '''
+
+    def __init__(self, urls, maxworkers=DEFAULT_MAX_WORKERS, processes=False, connector=CLIConnector):
+        self.urls = list(urls)
+        self.maxworkers = maxworkers
+        self.processes = processes
+        self.connector = connector
+        self._repos = {}
+        self._reposLock = threading.Lock()
+
+    def repository(self, url):
+        '''
+        Returns the Repository object used for the passed url when running operations in threads.
+        It is created the first time it is needed and reused afterwards, so its caches are kept
+        '''
+        with self._reposLock:
+            repo = self._repos.get(url)
+        if repo is None:
+            repo = Repository(url, self.connector())
+            with self._reposLock:
+                repo = self._repos.setdefault(url, repo)
+        return repo
+
+    def map(self, func, *args, **kwargs):
+        '''
+        Runs an operation on all repositories and returns an OrderedDict with repository urls
+        as keys and the results of the operation as values.
+
+        func can be the name of a Repository method, such as "log" or "pull", or a function
+        that takes a Repository object as its first argument. The remaining arguments are
+        passed to it.
+
+        If the operation fails for any repository, a PoolException is raised after all of them
+        have been processed, with the results and the errors of each repository
+        '''
+        if self.processes:
+            tasks = [(url, self.connector, func, args, kwargs) for url in self.urls]
+            pool = multiprocessing.Pool(min(self.maxworkers, len(tasks)) or 1)
+            try:
+                outcomes = pool.map(_runinprocess, tasks, 1)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            outcomes = runall(lambda url: _call(self.repository(url), func, args, kwargs),
+                              self.urls, self.maxworkers)
+
+        results = OrderedDict()
+        errors = OrderedDict()
+        for url, (succeeded, value) in zip(self.urls, outcomes):
+            if succeeded:
+                results[url] = value
+            else:
+                errors[url] = value
+        if errors:
+            raise PoolException(results, errors)
+        return results
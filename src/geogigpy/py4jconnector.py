@@ -35,11 +35,28 @@ import time
 import gc
 import re
 import signal
+import weakref
+import threading
+from collections import deque
+try:
+    from py4j.finalizer import ThreadSafeFinalizer
+except ImportError:
+    ThreadSafeFinalizer = None
 
 _proc = None
 _gateway = None
 _geogigPort = None
 
+_maxNewProxies = 1000
+_maxCollectInterval = 60
+_lastCollectTime = time.time()
+_proxiesAfterCollect = 0
+
+_ARGS_SEPARATOR = "\x1f"
+_splitters = weakref.WeakKeyDictionary()
+_gatewayLocks = weakref.WeakKeyDictionary()
+_gatewayLocksLock = threading.Lock()
+
 _logger = logging.getLogger("geogigpy")
 
 
@@ -48,6 +65,35 @@ def setGatewayPort(port):
     _geogigPort = port
 
 
+def setCollectionBudget(maxproxies=None, interval=None):
+    '''
+    Sets when the Python garbage collector is run to release Java objects that are no
+    longer used. It is run before a command if more than maxproxies Java objects have been
+    created since the last collection, or if more than interval seconds have passed
+    '''
+    global _maxNewProxies, _maxCollectInterval
+    if maxproxies is not None:
+        _maxNewProxies = maxproxies
+    if interval is not None:
+        _maxCollectInterval = interval
+
+
+def _proxycount():
+    if ThreadSafeFinalizer is None:
+        return 0
+    return len(ThreadSafeFinalizer.finalizers)
+
+
+def _collectIfNeeded():
+    global _lastCollectTime, _proxiesAfterCollect
+    now = time.time()
+    if (_proxycount() - _proxiesAfterCollect > _maxNewProxies
+            or now - _lastCollectTime > _maxCollectInterval):
+        gc.collect()
+        _lastCollectTime = now
+        _proxiesAfterCollect = _proxycount()
+
+
 def _connect():
     global _gateway
     try:
@@ -62,44 +108,166 @@ def _connect():
 
 def _javaGateway():
     global _gateway
-    if _gateway is None:
-        _connect()
+    with _gatewayLocksLock:
+        if _gateway is None:
+            _connect()
     return _gateway
 
 
-def _runGateway(_commands, url, addcolor=True):
+def _gatewayLock(gateway):
+    '''
+    Returns the lock that has to be held while running a command or reading its output
+    through the passed gateway, since it keeps a single output buffer for all threads
+    '''
+    with _gatewayLocksLock:
+        lock = _gatewayLocks.get(gateway)
+        if lock is None:
+            lock = threading.RLock()
+            _gatewayLocks[gateway] = lock
+        return lock
+
+
+class _PagedOutput(object):
+    '''
+    The output of a command run through a gateway, read page by page as it is needed.
+    The gateway keeps a single output buffer, so if another command is run before
+    all pages have been read, the remaining ones have to be read in advance
+    '''
+
+    def __init__(self, gateway):
+        self.gateway = gateway
+        self.pages = deque()
+        self.finished = False
+
+    def nextpage(self):
+        if self.pages:
+            return self.pages.popleft()
+        with _gatewayLock(self.gateway):
+            if self.pages:
+                return self.pages.popleft()
+            if self.finished:
+                return None
+            page = self.gateway.entry_point.nextOutputPage()
+            if page is None:
+                self.finished = True
+                _activeOutputs.pop(id(self.gateway), None)
+            return page
+
+    def detach(self):
+        while not self.finished:
+            page = self.gateway.entry_point.nextOutputPage()
+            if page is None:
+                self.finished = True
+            else:
+                self.pages.append(page)
+
+
+_activeOutputs = {}
+
+
+def _execute(_commands, url, addcolor, gateway):
+    active = _activeOutputs.pop(id(gateway), None)
+    if active is not None:
+        active.detach()
     commands = list(_commands)
-    gc.collect()
+    _collectIfNeeded()
     if addcolor:
         commands.extend(["--color", "never"])
     command = " ".join(commands)
     command = command.replace("\r", "")
 
-    strclass = _javaGateway().jvm.String
-    array = _javaGateway().new_array(strclass, len(commands))
-    for i, c in enumerate(commands):
-        array[i] = c
+    array = _javaArray(gateway, commands)
     start = time.clock()
-    returncode = _javaGateway().entry_point.runCommand(url, array)
+    try:
+        returncode = gateway.entry_point.runCommand(url, array)
+    finally:
+        gateway.detach(array)
     end = time.clock()
     diff = end - start
     _logger.debug("Executed " + hidePassword(command) + " in " + str(diff) + " millisecs")
+    return returncode, command
+
+
+def _javaArray(gateway, commands):
+    '''
+    Creates a Java String[] with the passed strings. It is created in a single call,
+    by splitting a string that contains all of them
+    '''
+    joined = _ARGS_SEPARATOR.join(commands)
+    if commands and joined.count(_ARGS_SEPARATOR) == len(commands) - 1:
+        splitter = _splitters.get(gateway)
+        if splitter is None:
+            splitter = gateway.jvm.java.util.regex.Pattern.compile(_ARGS_SEPARATOR)
+            _splitters[gateway] = splitter
+        return splitter.split(joined, -1)
+    strclass = gateway.jvm.String
+    array = gateway.new_array(strclass, len(commands))
+    for i, c in enumerate(commands):
+        array[i] = c
+    return array
+
+
+def _readall(gateway):
     output = [""]
-    page = _javaGateway().entry_point.nextOutputPage()
+    page = gateway.entry_point.nextOutputPage()
     while page is not None:
         output.append(page)
-        page = _javaGateway().entry_point.nextOutputPage()
+        page = gateway.entry_point.nextOutputPage()
     output = "".join(output)
     output = output.strip("\r\n").splitlines()
-    output = [s.strip("\r\n") for s in output]
+    return [s.strip("\r\n") for s in output]
+
+
+def _raiseerror(command, output):
+    errormsg = "\n".join(output)
+    _logger.error("Error running command '%s': %s" % (hidePassword(command), errormsg))
+    raise GeoGigException(errormsg)
+
+
+def _runGateway(_commands, url, addcolor=True, gateway=None):
+    gateway = gateway or _javaGateway()
+    with _gatewayLock(gateway):
+        returncode, command = _execute(_commands, url, addcolor, gateway)
+        output = _readall(gateway)
     if returncode:
-        errormsg = "\n".join(output)
-        _logger.error("Error running command '%s': %s" % (hidePassword(command), errormsg))
-        raise GeoGigException("\n".join(output))
+        _raiseerror(command, output)
 
     return output
 
 
+def _runGatewayIter(_commands, url, addcolor=True, gateway=None):
+    '''
+    Runs a command and returns a generator that yields its output lines, fetching
+    output pages from the gateway only as they are needed
+    '''
+    gateway = gateway or _javaGateway()
+    with _gatewayLock(gateway):
+        returncode, command = _execute(_commands, url, addcolor, gateway)
+        if returncode:
+            _raiseerror(command, _readall(gateway))
+        output = _PagedOutput(gateway)
+        _activeOutputs[id(gateway)] = output
+    return _iterlines(output)
+
+
+def _iterlines(output):
+    remainder = ""
+    started = False
+    page = output.nextpage()
+    while page is not None:
+        lines = (remainder + page).split("\n")
+        remainder = lines.pop()
+        for line in lines:
+            line = line.strip("\r")
+            if started or line:
+                started = True
+                yield line
+        page = output.nextpage()
+    remainder = remainder.strip("\r")
+    if remainder:
+        yield remainder
+
+
 def hidePassword(command):
     p = re.compile(r"--password \S*")
     return p.sub("--password [PASSWORD_HIDDEN] ", command)
@@ -147,6 +315,8 @@ class Py4JConnectionException(Exception):
 class Py4JCLIConnector(CLIConnector):
     ''' A connector that uses a Py4J gateway server to connect to geogig'''
 
+    maxcommandlength = None
+
     def __init__(self):
         self.commandslog = []
 
@@ -180,6 +350,10 @@ class Py4JCLIConnector(CLIConnector):
         self.commandslog.append(" ".join(commands))
         return _runGateway(commands, self.repo.url)
 
+    def runiter(self, commands):
+        self.commandslog.append(" ".join(commands))
+        return _runGatewayIter(commands, self.repo.url)
+
     def setRepository(self, repo):
         '''
         Sets the repository to use when later passing commands to this connector using the "run" method
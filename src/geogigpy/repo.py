@@ -25,12 +25,23 @@ __copyright__ = '(C) 2013-2016 Boundless, http://boundlessgeo.com'
 __revision__ = '$Format:%H$'
 
 
+import os
 import re
+from collections import OrderedDict
+from itertools import islice
 from commitish import Commitish
 from tag import Tag
 import geogig
 from geogigexception import GeoGigException
-from feature import Feature
+from feature import Feature, DEFAULT_BATCH_SIZE
+from commit import CommitCache, DEFAULT_CACHE_SIZE
+from commitgraph import CommitGraph
+from objectcache import immutablekey
+from featuretable import featuretable, iterfeaturetable, todataframe, DEFAULT_CHUNK_SIZE
+from bulkjobs import DEFAULT_MAX_WORKERS
+from bulkexport import exportmany
+from bulkimport import importmany
+from cliconnector import CLIConnector
 from tree import Tree
 from utils import mkdir
 from py4jconnector import Py4JCLIConnector
@@ -57,20 +68,50 @@ def _resolveref(ref):
 
 SHA_MATCHER = re.compile(r"\b([a-f0-9]{40})\b")
 
+# Maximum number of tips for which the full history is kept in the log cache
+_MAX_CACHED_HISTORIES = 8
+
+# Maximum number of tree sizes kept by each repository
+_MAX_CACHED_SIZES = 10000
+
+# Number of commits retrieved at once when adding new commits to a commit graph
+# that already contains older ones
+_GRAPH_FETCH = 100
+
+# The line with the number of features in the output of show for a tree
+_SIZE = re.compile(r"^Size:\s*(\d+)", re.MULTILINE)
+
+
+def _recordpaths(features, paths):
+    '''Yields the passed (path, attributes) tuples, appending each path to the passed list'''
+    for path, attrs in features:
+        paths.append(path)
+        yield path, attrs
+
 
 class Repository(object):
 
-    _logcache = None
+    # Number of features returned by children() and features() whose attributes are
+    # retrieved together when one of them is first queried. 1 disables batching
+    featurebatchsize = DEFAULT_BATCH_SIZE
 
-    def __init__(self, url, connector=None, init=False, initParams=None):
+    def __init__(self, url, connector=None, init=False, initParams=None, commitcachesize=DEFAULT_CACHE_SIZE):
         '''
         url: The url of the repository. Only file paths are supported so far. Remote repos are not supported
 
         connector: the connector to use to communicate with the repository
 
         init: True if the repository should be initialized
+
+        commitcachesize: the maximum number of commits to keep in the commit cache of this repository
         '''
         self.url = url
+        self.commitcache = CommitCache(commitcachesize)
+        self._logcache = OrderedDict()
+        self._headtip = None
+        self._extendfrom = None
+        self._commitgraph = None
+        self._treesizes = {}
         self.connector = Py4JCLIConnector() if connector is None else connector
         if init:
             try:
@@ -114,7 +155,22 @@ class Repository(object):
         return self.connector.createdat()
 
     def cleancache(self):
-        self._logcache = None
+        '''
+        Signals that HEAD might have changed. Histories are cached by the id of their tip commit,
+        so they are kept, but HEAD will be resolved again the next time it is needed
+        '''
+        self._headtip = None
+        self._extendfrom = None
+
+    def _headadvanced(self):
+        '''
+        Signals that new commits have been added on top of HEAD, so the history of the new HEAD
+        can be computed by retrieving just the new commits and adding the cached history of the
+        previous HEAD
+        '''
+        if self._headtip is not None:
+            self._extendfrom = self._headtip
+        self._headtip = None
 
     def description(self):
         '''Returns the description of this repository'''
@@ -192,12 +248,56 @@ class Repository(object):
             pull = 0
         else:
             trackedbranchhead = self.revparse("refs/remotes/" + remotename + "/" + branch)
-            log = self.log(branch, trackedbranchhead)
-            push = len(log)
+            push = self.aheadbehind(localtip, trackedbranchhead)[0]
+            # the remote side uses a range log, so no commit graph is built or written for it
             log = repo.log(branch, trackedbranchhead)
             pull = len(log)
         return push, pull
 
+    @property
+    def commitgraph(self):
+        '''
+        Returns the CommitGraph used to answer ancestry queries. For local repositories, it is
+        stored in the .geogig folder, so it is kept between sessions
+        '''
+        if self._commitgraph is None:
+            folder = os.path.join(self.url, ".geogig")
+            filename = os.path.join(folder, "commitgraph") if os.path.isdir(folder) else None
+            self._commitgraph = CommitGraph(filename)
+        return self._commitgraph
+
+    def _indexcommits(self, *refs):
+        '''
+        Makes sure that the passed refs and all their ancestors are in the commit graph, and
+        returns their ids. Only the commits that are not in the graph are retrieved
+        '''
+        graph = self.commitgraph
+        ids = [self.revparse(_resolveref(ref)) for ref in refs]
+        missing = set(i for i in ids if i not in graph)
+        while missing:
+            for commitid in missing:
+                n = _GRAPH_FETCH if len(graph) else None
+                commits = self.connector.log(commitid, n=n)
+                self.commitcache.putall(commits)
+                graph.add(commits)
+            missing = graph.missingparents()
+        graph.save()
+        return ids
+
+    def isancestor(self, ref, ref2):
+        '''Returns True if the first ref is an ancestor of the second one, or they are the same commit'''
+        ida, idb = self._indexcommits(ref, ref2)
+        return self.commitgraph.isancestor(ida, idb)
+
+    def aheadbehind(self, ref, ref2):
+        '''
+        Returns a tuple with the number of commits in the history of the first ref that are not
+        in the history of the second one, and the number of commits in the history of the second
+        one that are not in the history of the first one
+        '''
+        ida, idb = self._indexcommits(ref, ref2)
+        return self.commitgraph.aheadbehind(ida, idb)
+
     def mergemessage(self):
         '''
         Return the merge message if the repo is in a merge operation stopped due to conflicts.
@@ -213,12 +313,106 @@ class Repository(object):
         Date limits can be passed using the since and until parameters
         A maximum number of commits can be set using the n parameter
         '''
-        tip = tip or geogig.HEAD
-        if path is not None or tip != geogig.HEAD or n is not None or since is not None or until is not None or sincecommit is not None:
-            return self.connector.log(_resolveref(tip), _resolveref(sincecommit), _resolveref(until), _resolveref(since), path, n)
-        if self._logcache is None:
-            self._logcache = self.connector.log(_resolveref(tip), _resolveref(sincecommit), _resolveref(until), _resolveref(since), path, n)
-        return self._logcache
+        tip = _resolveref(tip or geogig.HEAD)
+        sincecommit = _resolveref(sincecommit)
+        log = self._cachedlog(tip, sincecommit, until, since, path, n, True)
+        if log is not None:
+            return log
+        log = self.connector.log(tip, sincecommit, _resolveref(until), _resolveref(since), path, n)
+        self.commitcache.putall(log)
+        return log
+
+    def iterlog(self, tip=None, sincecommit=None, until=None, since=None, path=None, n=None):
+        '''
+        Like log, but returns a generator of Commit objects, which are created as the
+        output of geogig is read, instead of a list
+        '''
+        tip = _resolveref(tip or geogig.HEAD)
+        sincecommit = _resolveref(sincecommit)
+        log = self._cachedlog(tip, sincecommit, until, since, path, n, False)
+        if log is not None:
+            return iter(log)
+        log = self.connector.iterlog(tip, sincecommit, _resolveref(until), _resolveref(since), path, n)
+        return self._cachecommits(log)
+
+    def _cachedlog(self, tip, sincecommit, until, since, path, n, fetch):
+        '''
+        Returns the requested log using the cached history of the tip, or None if it cannot be
+        computed from it. If fetch is True and no filter is used, the full history of the tip
+        is retrieved and cached
+        '''
+        if path is not None or until is not None or since is not None:
+            return None
+        if n is None and sincecommit is None and fetch:
+            tipid = self._resolvetip(tip)
+            if tipid is None:
+                return None
+            return list(self._history(tipid))
+        tipid = self._knowntip(tip)
+        if tipid not in self._logcache:
+            return None
+        return self._filterhistory(self._history(tipid), sincecommit, n)
+
+    def _knowntip(self, tip):
+        '''Returns the id of the passed tip if it can be known without running any command'''
+        if tip == geogig.HEAD:
+            return self._headtip
+        if SHA_MATCHER.match(tip) is not None:
+            return tip
+        return None
+
+    def _resolvetip(self, tip):
+        tipid = self._knowntip(tip)
+        if tipid is None:
+            try:
+                tipid = self.revparse(tip)
+            except GeoGigException:
+                return None  # an empty repo or a wrong ref. Let the connector handle it
+            if tip == geogig.HEAD:
+                self._headtip = tipid
+        return tipid
+
+    def _history(self, tipid):
+        '''Returns the full history of a given commit id, using the cache when possible'''
+        history = self._logcache.pop(tipid, None)
+        if history is None and self._extendfrom in self._logcache:
+            newcommits = self.connector.log(tipid, self._extendfrom)
+            # Commits from a merged branch would not be in the order used by geogig log,
+            # so only linear histories on top of the cached one are extended
+            if (newcommits and newcommits[-1]._parents == [self._extendfrom]
+                    and all(c._parents is not None and len(c._parents) == 1 for c in newcommits)):
+                history = newcommits + self._logcache[self._extendfrom]
+                self.commitcache.putall(newcommits)
+        if history is None:
+            history = self.connector.log(tipid)
+            self.commitcache.putall(history)
+        self._logcache[tipid] = history
+        while len(self._logcache) > _MAX_CACHED_HISTORIES:
+            self._logcache.popitem(last=False)
+        return history
+
+    def _filterhistory(self, history, sincecommit, n):
+        log = history
+        if sincecommit is not None:
+            sinceid = self.revparse(sincecommit)
+            # Only a linear history can be cut at the sincecommit without knowing
+            # the ancestors of the sincecommit that are in other branches
+            for i, commit in enumerate(history):
+                if commit.commitid == sinceid:
+                    log = history[:i]
+                    break
+                if i + 1 == len(history) or commit._parents != [history[i + 1].commitid]:
+                    return None
+            else:
+                return None
+        if n is not None:
+            log = log[:n]
+        return list(log)
+
+    def _cachecommits(self, commits):
+        for commit in commits:
+            self.commitcache.put(commit)
+            yield commit
 
     def commitatdate(self, t):
         '''Returns a Commit corresponding to a given instant, which is passed as a datetime.datetime'''
@@ -241,12 +435,20 @@ class Repository(object):
 
     def features(self, ref=geogig.HEAD, path=None, recursive=False):
         '''Returns a set of Feature objects with all the features for the passed ref and path'''
-        return [e for e in self.children(ref, path, recursive) if isinstance(e, Feature)]
+        return list(self.iterfeatures(ref, path, recursive))
+
+    def iterfeatures(self, ref=geogig.HEAD, path=None, recursive=False):
+        '''Like features, but returns a generator of Feature objects instead of a list'''
+        return (e for e in self.iterchildren(ref, path, recursive) if isinstance(e, Feature))
 
     def children(self, ref=geogig.HEAD, path=None, recursive=False):
         '''Returns a set of Tree and Feature objects with all the children for the passed ref and path'''
         return self.connector.children(_resolveref(ref), path, recursive)
 
+    def iterchildren(self, ref=geogig.HEAD, path=None, recursive=False):
+        '''Like children, but returns a generator of Tree and Feature objects instead of a list'''
+        return self.connector.iterchildren(_resolveref(ref), path, recursive)
+
     @property
     def branches(self):
         ''' Returns a dict with branch names as keys and branch refs as values'''
@@ -288,6 +490,10 @@ class Repository(object):
         If a path is passed, it only shows changes corresponding to that path'''
         return self.connector.diff(_resolveref(refa), _resolveref(refb), path)
 
+    def iterdiff(self, refa=geogig.HEAD, refb=geogig.WORK_HEAD, path=None):
+        '''Like diff, but returns a generator of DiffEntry objects instead of a list'''
+        return self.connector.iterdiff(_resolveref(refa), _resolveref(refb), path)
+
     def difftreestats(self, refa=geogig.HEAD, refb=geogig.WORK_HEAD):
         '''Returns a dict with tree changes statistics for the passed refs. Keys are paths, values are tuples
         in the form  (added, deleted, modified) corresponding to changes made to that path'''
@@ -304,6 +510,16 @@ class Repository(object):
         unmodified'''
         return self.connector.treediff(path, _resolveref(refa), _resolveref(refb))
 
+    def itertreediff(self, path, refa=geogig.HEAD, refb=geogig.WORK_HEAD, attributes=None, skipunchanged=False):
+        '''
+        Like treediff, but returns a generator that yields a tuple (featurepath, changes) for each
+        changed feature as soon as it is read, so the whole diff is never kept in memory.
+        changes is a dict with attribute names as keys and change tuples, as described in
+        treediff, as values. If a list of attribute names is passed, only those are included.
+        If skipunchanged is True, unchanged attributes are not included
+        '''
+        return self.connector.itertreediff(path, _resolveref(refa), _resolveref(refb), attributes, skipunchanged)
+
     def unstaged(self):
         '''Returns a list of diffEntry with the differences between staging area and working tree'''
         return self.diff(geogig.STAGE_HEAD, geogig.WORK_HEAD)
@@ -375,8 +591,7 @@ class Repository(object):
         Raises an UnconfiguredUserException if there is no user configured and it cannot commit
         '''
         self.connector.commit(message, paths)
-        self.cleancache()
-        # TODO: maybe add the commit instead of invalidating the whole cache
+        self._headadvanced()
 
     def commitfromgeopkg(self, geopkg, message):
         '''
@@ -393,15 +608,121 @@ class Repository(object):
         '''
         return self.connector.blame(path)
 
+    def blamemany(self, path, ref=geogig.HEAD):
+        '''
+        Returns a generator of (featurepath, blame) tuples with authorship information for all the
+        features under the passed path, with blame in the same form as returned by the blame method,
+        although values are converted to appropriate types, as in featuredata.
+
+        It is computed in a single pass over the commits that modified the path, running one diff
+        per commit instead of one blame per feature. The blame of a feature is yielded as soon as
+        the commits that last modified all its attributes have been found. Changes are compared
+        with the first parent of each commit, so changes made by merge commits are not seen.
+        Attributes that no diff changed are credited to the oldest commit whose diff changed the
+        feature, or to the root commit if the feature was added in it. That commit can be newer
+        than the one that actually set them, if the feature was added or modified by a merge.
+        Features that no diff changed at all fall back to the blame method, which runs one
+        command per feature and uses the current HEAD
+        '''
+        tipid = self.revparse(_resolveref(ref))
+        values = {}
+        for child in self.iterchildren(tipid, path, recursive=True):
+            if isinstance(child, Feature):
+                values[child.path] = child.attributes
+        unresolved = dict((fpath, set(attrs)) for fpath, attrs in values.iteritems())
+        blames = dict((fpath, {}) for fpath in values)
+        oldest = {}
+        for commit in self.iterlog(tipid, path=path):
+            if not unresolved:
+                return
+            parents = [p for p in commit._parents if p != geogig.NULL_ID]
+            if not parents:
+                # a root commit added all the features it contains
+                for child in self.iterchildren(commit.commitid, path, recursive=True):
+                    if child.path in unresolved:
+                        oldest[child.path] = commit
+                continue
+            if len(parents) != 1:
+                continue
+            # only the names of the changed attributes are needed, so values are not decoded
+            diffs = self.connector.iterchangedattributes(path, parents[0], commit.commitid)
+            for fpath, changes in diffs:
+                remaining = unresolved.get(fpath)
+                if remaining is None:
+                    continue
+                oldest[fpath] = commit
+                for name in changes:
+                    if name in remaining:
+                        remaining.discard(name)
+                        blames[fpath][name] = (values[fpath][name], commit.commitid, commit.authorname)
+                if not remaining:
+                    del unresolved[fpath]
+                    del values[fpath]
+                    del oldest[fpath]
+                    yield fpath, blames.pop(fpath)
+        for fpath, remaining in unresolved.iteritems():
+            commit = oldest.get(fpath)
+            if commit is None:
+                blame = self.blame(fpath)
+                for name in remaining:
+                    blames[fpath][name] = (values[fpath][name],) + tuple(blame[name][1:])
+            else:
+                for name in remaining:
+                    blames[fpath][name] = (values[fpath][name], commit.commitid, commit.authorname)
+            yield fpath, blames[fpath]
+
     def count(self, ref, path):
         '''Returns the count of objects in a given path'''
-        output = self.show(_resolveref(ref) + ":" + path)
-        return int(output.split("\n")[1][5:].strip())
+        ref = _resolveref(ref)
+        key = immutablekey(ref, path)
+        size = self._treesizes.get(key)
+        if size is None:
+            match = _SIZE.search(self.show(ref + ":" + path))
+            if match is None:
+                raise GeoGigException("Cannot get the size of %s:%s" % (ref, path))
+            size = int(match.group(1))
+            self._remembersize(key, size)
+        return size
+
+    def treecounts(self, ref=geogig.HEAD, path=None):
+        '''
+        Returns an OrderedDict with the paths of the trees in the passed ref and path as keys and the
+        number of features in each of them as values. They are all read with a single ls-tree command
+        '''
+        ref = _resolveref(ref)
+        counts = OrderedDict()
+        for child in self.connector.iterchildren(ref, path):
+            if isinstance(child, Tree) and child.size is not None:
+                counts[child.path] = child.size
+                self._remembersize(immutablekey(ref, child.path), child.size)
+        return counts
+
+    def _remembersize(self, key, size):
+        '''Keeps the size of a tree, if it is identified by a commit id and cannot change'''
+        if key is None:
+            return
+        if len(self._treesizes) >= _MAX_CACHED_SIZES:
+            self._treesizes.clear()
+        self._treesizes[key] = size
 
     def feature(self, ref, path):
         '''Returns a Feature object corresponding to the passed ref and path'''
         return Feature(self, ref, path)
 
+    def featuretable(self, ref, path, dataframe=False, chunksize=DEFAULT_CHUNK_SIZE):
+        '''
+        Returns the attributes of all the features in the passed ref and path as a dict of
+        columns, with attribute names as keys. Feature paths are in the featuretable.PATH_COLUMN
+        column. Columns are numpy arrays if numpy is available.
+        If dataframe is True, a pandas DataFrame indexed by feature path is returned instead
+        '''
+        table = featuretable(self, _resolveref(ref), path, chunksize)
+        return todataframe(table) if dataframe else table
+
+    def iterfeaturetable(self, ref, path, chunksize=DEFAULT_CHUNK_SIZE):
+        '''Like featuretable, but returns a generator of tables with up to chunksize features each'''
+        return iterfeaturetable(self, _resolveref(ref), path, chunksize)
+
     def featuredata(self, ref, path):
         '''
         Returns the attributes of a given feature, as a dict with attributes
@@ -414,9 +735,14 @@ class Repository(object):
             raise GeoGigException("The specified feature does not exist")
         return data
 
-    def featuretype(self, ref, tree):
-        '''Returns the featuretype of a tree as a dict in the form attrib_name : attrib_type_name'''
-        return self.connector.featuretype(ref, tree)
+    def featuretype(self, ref, tree, ftypeid=None):
+        '''
+        Returns the featuretype of a tree as a dict in the form attrib_name : attrib_type_name
+        If the id of the feature type is already known, it can be passed in ftypeid
+        '''
+        if ftypeid is None:
+            return self.connector.featuretype(_resolveref(ref), tree)
+        return self.connector.featuretype(_resolveref(ref), tree, ftypeid)
 
     def versions(self, path):
         '''
@@ -464,6 +790,57 @@ class Repository(object):
     def exportgeopkg(self, ref, path, geopkg, interchange=True, overwrite=False):
         self.connector.exportgeopkg(_resolveref(ref), path, geopkg, interchange, overwrite)
 
+    def exportmany(self, jobs, maxworkers=DEFAULT_MAX_WORKERS, connector=CLIConnector,
+                   progressFunc=None, progressTextFunc=None):
+        '''
+        Exports a set of trees, running up to maxworkers exports at the same time.
+
+        Jobs are passed as bulkexport.ExportJob objects or as (ref, path, target[, options])
+        tuples. The target is a file path with a .shp, .gpkg, .sqlite or .db extension, or a
+        dict with the arguments of exportpg to export to PostGIS. options is a dict with
+        additional arguments for the export method, such as charset or overwrite.
+
+        Each worker uses its own Repository object, with a connector created by calling the
+        connector argument. With the default CLIConnector, each export runs in a separate
+        geogig process. If connector is None, this repository is used by all of them.
+
+        progressFunc and progressTextFunc take the same arguments as the ones passed to
+        py4jconnector.setProgressListener, and are called with the percentage of finished
+        jobs and a description of each job when it starts and finishes.
+
+        Returns the list of ExportJob objects, with the time each of them took in their
+        elapsed attribute. If any of them fails, a PoolException is raised once all have
+        been run
+        '''
+        return exportmany(self, jobs, maxworkers, connector, progressFunc, progressTextFunc)
+
+    def importmany(self, sources, maxworkers=DEFAULT_MAX_WORKERS, connector=CLIConnector,
+                   progressFunc=None, progressTextFunc=None):
+        '''
+        Imports a set of sources into the working tree, running up to maxworkers imports at
+        the same time, and adds all of them to the staging area with a single add.
+
+        Sources are passed as bulkimport.ImportSource objects, as (source, dest[, options])
+        tuples, or just as the source. A source is a file path with a .shp, .geojson, .json,
+        .gpkg, .sqlite or .db extension, or a dict with the arguments of importpg to import
+        from PostGIS. dest is the path to import it into, which defaults to the table name or
+        the file name. Each source must be imported into a different path, and replaces the
+        tree in that path. options is a dict with additional arguments for the import method,
+        such as table for GeoPackage and SpatiaLite files.
+
+        Each worker imports its sources into its own empty repository in a temporary folder,
+        using a connector created by calling the connector argument. Once all sources have
+        been imported, the content of those repositories is fetched and checked out into the
+        working tree of this one.
+
+        progressFunc and progressTextFunc are used as in exportmany.
+
+        Returns the list of ImportSource objects, with the time each of them took and the
+        number of features imported, from which their throughput is computed. If any source
+        fails, a PoolException is raised, once the other ones have been imported
+        '''
+        return importmany(self, sources, maxworkers, connector, progressFunc, progressTextFunc)
+
     def importgeojson(self, geojsonfile, add=False, dest=None, idAttribute=None, geomName=None, force=False):
         self.connector.importgeojson(geojsonfile, add, dest, idAttribute, geomName, force)
 
@@ -498,18 +875,40 @@ class Repository(object):
         '''
         self.connector.insertfeatures({path: attributes})
 
-    def insertfeatures(self, features):
+    def insertfeatures(self, features, batchsize=None, message=None):
         '''
         Inserts a set of features into the working tree.
 
-        Features are passed in a dict with paths as keys and attributes as values
+        Features are passed in a dict with paths as keys and attributes as values, or as an
+        iterable of (path, attributes) tuples, which is consumed as features are written, so
+        a generator can be used to insert more features than would fit in memory.
         The attributes for each feature are passed in a dict with attribute names as keys and attribute values as values.
         There must be one an only one geometry attribute, with a Geometry object.
 
         It will overwrite any feature in the same path, so this can be used to add new features or to
         modify existing ones
+
+        If batchsize is passed, features are inserted in groups of that size. If a commit message is
+        passed, each group is added to the staging area and committed with that message after
+        being inserted
         '''
-        self.connector.insertfeatures(features)
+        if batchsize is None and message is None:
+            self.connector.insertfeatures(features)
+            return
+        if isinstance(features, dict):
+            features = features.iteritems()
+        features = iter(features)
+        while True:
+            paths = []
+            batch = islice(features, batchsize) if batchsize else features
+            self.connector.insertfeatures(_recordpaths(batch, paths))
+            if not paths:
+                break
+            if message is not None:
+                self.add(paths)
+                self.commit(message)
+            if not batchsize:
+                break
 
     def removefeatures(self, paths):
         '''Removes the passed features paths from the working tree and index, so they are no longer versioned'''
@@ -524,12 +923,14 @@ class Repository(object):
         Returns the common ancestor of the two passed references as a commitish object
         Returns None if no common ancestor exists for the passed references
         '''
-        return self.connector.commonancestor(refa, refb)
+        ida, idb = self._indexcommits(refa, refb)
+        base = self.commitgraph.mergebase(ida, idb)
+        return None if base is None else Commitish(self, base)
 
     def merge(self, ref, nocommit=False, message=None):
         '''Merges the passed ref into the current branch'''
         self.connector.merge(_resolveref(ref), nocommit, message)
-        self.cleancache()
+        self._headadvanced()
 
     def rebase(self, ref):
         '''Rebases the current branch using the passed ref'''
@@ -550,11 +951,12 @@ class Repository(object):
         Does nothing if the repo is not in a conflicted state caused by a rebase operation
         '''
         self.connector.continue_()
+        self.cleancache()
 
     def cherrypick(self, ref):
         '''Cherrypicks a commit into the current branch'''
         self.connector.cherrypick(_resolveref(ref))
-        self.cleancache()
+        self._headadvanced()
 
     @property
     def remotes(self):
@@ -642,6 +1044,10 @@ class Repository(object):
         '''Returns the current value for a given parameter'''
         return self.connector.getconfig(param)
 
+    def fetch(self, remote=geogig.ORIGIN):
+        '''Fetches the branches and objects of the specified remote, without changing the current branch'''
+        self.connector.fetch(remote)
+
     def pull(self, remote=geogig.ORIGIN, branch=None, rebase=False):
         '''
         Pulls from the specified remote and specified branch.
@@ -653,7 +1059,7 @@ class Repository(object):
             raise GeoGigException("HEAD is detached. Cannot pull")
         branch = branch or self.head.ref
         self.connector.pull(remote, branch, rebase)
-        self.cleancache()
+        self._headadvanced()
 
     def push(self, remote, branch=None, all=False):
         '''
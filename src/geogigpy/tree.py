@@ -25,16 +25,24 @@ __copyright__ = '(C) 2013-2016 Boundless, http://boundlessgeo.com'
 __revision__ = '$Format:%H$'
 
 
+from utils import internref
+from featuretable import DEFAULT_CHUNK_SIZE
+
+
 class Tree(object):
     '''An object representing a tree path for a given commit'''
 
+    __slots__ = ('repo', 'ref', 'path', 'size', 'treeid', 'ftypeid')
+
     ROOT = None
 
-    def __init__(self, repo, ref, path=ROOT, size=None):
+    def __init__(self, repo, ref, path=ROOT, size=None, treeid=None, ftypeid=None):
         self.repo = repo
-        self.ref = ref
+        self.ref = internref(ref)
         self.path = path
         self.size = size
+        self.treeid = treeid
+        self.ftypeid = ftypeid
 
     @property
     def trees(self):
@@ -46,7 +54,15 @@ class Tree(object):
 
     @property
     def featuretype(self):
-        return self.repo.featuretype(self.ref, self.path)
+        return self.repo.featuretype(self.ref, self.path, self.ftypeid)
+
+    def featuretable(self, dataframe=False):
+        '''Returns the attributes of the features in this tree as columns. See Repository.featuretable'''
+        return self.repo.featuretable(self.ref, self.path, dataframe)
+
+    def iterfeaturetable(self, chunksize=DEFAULT_CHUNK_SIZE):
+        '''Returns the attributes of the features in this tree in chunks. See Repository.iterfeaturetable'''
+        return self.repo.iterfeaturetable(self.ref, self.path, chunksize)
 
     @property
     def children(self):
@@ -54,6 +70,9 @@ class Tree(object):
 
     @property
     def count(self):
+        '''Returns the number of features in this tree, using the size listed with it when available'''
+        if self.size is not None:
+            return self.size
         return self.repo.count(self.ref, self.path)
 
     def exportshp(self, shapefile):
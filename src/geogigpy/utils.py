@@ -42,6 +42,16 @@ def mkdir(newdir):
             os.mkdir(newdir)
 
 
+def internref(ref):
+    '''
+    Returns an interned version of a reference string, so all the objects created
+    for the same reference share a single copy of it
+    '''
+    if type(ref) is str:
+        return intern(ref)
+    return ref
+
+
 def prettydate(d):
     '''Formats a utc date'''
     diff = datetime.datetime.utcnow() - d
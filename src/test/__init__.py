@@ -32,6 +32,22 @@ from featuretest import GeogigFeatureTest
 from commitishtest import GeogigCommitishTest
 from committest import GeogigCommitTest
 from difftest import GeogigDiffTest
+from persistentconnectortest import GeogigPersistentConnectorTest
+from serverconnectortest import GeogigServerConnectorTest
+from modeltest import GeogigModelTest
+from geometrytest import GeogigGeometryTest
+from pooltest import GeogigPoolTest
+from asyncrepotest import GeogigAsyncRepositoryTest
+from commitgraphtest import GeogigCommitGraphTest
+from objectcachetest import GeogigObjectCacheTest
+from featuretabletest import GeogigFeatureTableTest
+from decodertest import GeogigDecoderTest
+from bulkexporttest import GeogigBulkExportTest
+from bulkimporttest import GeogigBulkImportTest
+from parsertest import GeogigParserTest
+from cliconnectortest import GeogigCLIConnectorTest
+from benchmarktest import GeogigBenchmarkTest
+from py4jconnectortest import GeogigPy4JConnectorTest
 
 
 def suite():
@@ -41,4 +57,20 @@ def suite():
     suite.addTests(unittest.makeSuite(GeogigCommitishTest, 'test'))
     suite.addTests(unittest.makeSuite(GeogigCommitTest, 'test'))
     suite.addTests(unittest.makeSuite(GeogigDiffTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigPersistentConnectorTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigServerConnectorTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigModelTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigGeometryTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigPoolTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigAsyncRepositoryTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigCommitGraphTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigObjectCacheTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigFeatureTableTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigDecoderTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigBulkExportTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigBulkImportTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigParserTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigCLIConnectorTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigBenchmarkTest, 'test'))
+    suite.addTests(unittest.makeSuite(GeogigPy4JConnectorTest, 'test'))
     return suite
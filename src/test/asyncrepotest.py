@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    asyncrepotest.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import time
+import logging
+import threading
+import unittest
+from multiprocessing import TimeoutError
+from multiprocessing.pool import ThreadPool
+from geogigpy.asyncrepo import AsyncRepository
+from geogigpy.connector import Connector
+from geogigpy.geogigexception import GeoGigException
+
+
+class _SlowConnector(Connector):
+    '''A connector that does not need geogig and takes some time to answer'''
+
+    def __init__(self):
+        self.running = 0
+        self.maxrunning = 0
+
+    def checkisrepo(self):
+        pass
+
+    def revparse(self, rev):
+        self.running += 1
+        self.maxrunning = max(self.running, self.maxrunning)
+        time.sleep(0.1)
+        self.running -= 1
+        if rev == "wrong":
+            raise GeoGigException("Cannot resolve the provided reference")
+        return rev + " of " + self.repo.url
+
+
+class _RecordingHandler(logging.Handler):
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class GeogigAsyncRepositoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = ThreadPool(4)
+
+    def tearDown(self):
+        self.pool.close()
+        self.pool.join()
+
+    def testResult(self):
+        repo = AsyncRepository("a", _SlowConnector(), self.pool)
+        result = repo.revparse("HEAD")
+        self.assertEquals("HEAD of a", result.get(5))
+
+    def testError(self):
+        repo = AsyncRepository("a", _SlowConnector(), self.pool)
+        result = repo.revparse("wrong")
+        self.assertRaises(GeoGigException, result.get, 5)
+
+    def testCallback(self):
+        repo = AsyncRepository("a", _SlowConnector(), self.pool)
+        done = threading.Event()
+        received = []
+
+        def callback(value):
+            received.append(value)
+            done.set()
+        repo.revparse("HEAD", callback=callback)
+        done.wait(5)
+        self.assertEquals(["HEAD of a"], received)
+
+    def testDifferentRepositoriesRunConcurrently(self):
+        repos = [AsyncRepository("repo%i" % i, _SlowConnector(), self.pool) for i in range(4)]
+        start = time.time()
+        results = [repo.revparse("HEAD") for repo in repos]
+        for result in results:
+            result.get(5)
+        self.assertTrue(time.time() - start < 0.3)
+
+    def testSameRepositoryRunsSerially(self):
+        connector = _SlowConnector()
+        repo = AsyncRepository("a", connector, self.pool)
+        results = [repo.revparse("HEAD") for i in range(3)]
+        for result in results:
+            result.get(5)
+        self.assertEquals(1, connector.maxrunning)
+
+    def testQueuedOperationsDoNotBlockOtherRepositories(self):
+        pool = ThreadPool(2)
+        try:
+            busy = AsyncRepository("a", _SlowConnector(), pool)
+            other = AsyncRepository("b", _SlowConnector(), pool)
+            results = [busy.revparse("HEAD") for i in range(4)]
+            start = time.time()
+            other.revparse("HEAD").get(5)
+            self.assertTrue(time.time() - start < 0.25)
+            for result in results:
+                result.get(5)
+        finally:
+            pool.close()
+            pool.join()
+
+    def testTimeout(self):
+        repo = AsyncRepository("a", _SlowConnector(), self.pool)
+        result = repo.revparse("HEAD")
+        self.assertRaises(TimeoutError, result.get, 0.01)
+        self.assertEquals("HEAD of a", result.get(5))
+
+    def testCallbackErrorsAreLogged(self):
+        handler = _RecordingHandler()
+        logger = logging.getLogger("geogigpy")
+        logger.addHandler(handler)
+        try:
+            repo = AsyncRepository("a", _SlowConnector(), self.pool)
+
+            def callback(value):
+                raise ValueError("wrong value")
+            result = repo.revparse("HEAD", callback=callback)
+            self.assertEquals("HEAD of a", result.get(5))
+            self.assertEquals("HEAD of a", repo.revparse("HEAD").get(5))
+        finally:
+            logger.removeHandler(handler)
+        self.assertEquals(1, len(handler.records))
+        self.assertTrue("wrong value" in handler.records[0].getMessage())
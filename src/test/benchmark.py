@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    benchmark.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import sys
+import json
+import time
+import shutil
+import datetime
+import platform
+import tempfile
+import argparse
+import geogigpy
+from geogigpy import geogig
+from geogigpy.repo import Repository
+from geogigpy.geometry import Geometry
+from geogigpy.objectcache import setObjectCache
+from geogigpy.cliconnector import CLIConnector
+from geogigpy.py4jconnector import Py4JCLIConnector, Py4JConnectionException
+
+# Benchmarks for the most used operations, run on synthetic repositories of a given size.
+#
+# Each repository has a single tree with the passed number of point features, and a history
+# with the passed number of commits, each of them modifying a fraction of the features.
+# Writing operations are timed while the repository is created, and reading ones are run
+# the passed number of times on the finished repository. Results are written as JSON, and
+# can be compared with the ones from a previous run to find regressions:
+#
+#     python benchmark.py --features 1000 10000 --commits 100 --output new.json --compare old.json
+
+CONNECTORS = {"cli": CLIConnector, "py4j": Py4JCLIConnector}
+
+WRITE_OPERATIONS = ["insertfeatures", "add", "commit"]
+READ_OPERATIONS = ["log", "children", "diff", "treediff", "featuresdata"]
+
+LAYER = "points"
+
+# Maximum number of features whose data is retrieved by the featuresdata benchmark
+_FEATURESDATA_SIZE = 1000
+
+_SEED = {"type": "FeatureCollection",
+         "features": [{"type": "Feature", "id": "0",
+                       "geometry": {"type": "Point", "coordinates": [0, 0]},
+                       "properties": {"fid": 0, "name": "feature 0", "version": 0, "value": 0.5}}]}
+
+
+def _attributes(i, version):
+    return {"fid": i, "name": "feature %i" % i, "version": version, "value": i * 0.5,
+            "geom": Geometry("POINT (%i %i)" % (i % 1000, i // 1000), "EPSG:4326")}
+
+
+def _features(start, count, total, version):
+    for i in xrange(start, start + count):
+        i %= total
+        yield "%s/%i" % (LAYER, i), _attributes(i, version)
+
+
+def _timed(timings, operation, func, *args):
+    start = time.time()
+    result = func(*args)
+    timings.setdefault(operation, []).append(time.time() - start)
+    return result
+
+
+def createrepo(path, connector, features, commits, timings):
+    '''
+    Creates a synthetic repository in the passed path, adding the times taken by the
+    writing operations to the timings dict
+    '''
+    repo = Repository(path, connector, init=True)
+    repo.config(geogig.USER_NAME, "benchmark")
+    repo.config(geogig.USER_EMAIL, "benchmark@localhost")
+    # insert needs the feature type of the tree, so it is created with a small import
+    seed = os.path.join(path, "seed.geojson")
+    with open(seed, "w") as f:
+        json.dump(_SEED, f)
+    repo.importgeojson(seed, dest=LAYER, geomName="geom")
+    _timed(timings, "insertfeatures", repo.insertfeatures, _features(0, features, features, 0))
+    _timed(timings, "add", repo.add)
+    _timed(timings, "commit", repo.commit, "Initial load")
+    changed = max(1, features // max(1, commits))
+    for version in xrange(1, commits):
+        repo.insertfeatures(_features(version * changed, changed, features, version))
+        repo.add()
+        repo.commit("Version %i" % version)
+    return repo
+
+
+def runreads(repo, features, repeat, timings):
+    '''Runs the reading operations on a repository created by createrepo'''
+    connector = repo.connector
+    head = repo.revparse(geogig.HEAD)
+    first = connector.log(head)[-1].commitid
+    refs = ["%s:%s/%i" % (head, LAYER, i) for i in xrange(min(features, _FEATURESDATA_SIZE))]
+    for i in xrange(repeat):
+        # the connector is called directly, so results cached by the repository are not used
+        _timed(timings, "log", connector.log, head)
+        _timed(timings, "children", connector.children, head, None, True)
+        _timed(timings, "diff", connector.diff, first, head)
+        _timed(timings, "treediff", connector.treediff, LAYER, first, head)
+        _timed(timings, "featuresdata", connector.featuresdata, refs)
+
+
+def _median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2.0
+
+
+def summarize(connectorname, features, commits, timings):
+    '''Returns a list of result records, one for each operation in the passed timings'''
+    results = []
+    for operation in WRITE_OPERATIONS + READ_OPERATIONS:
+        seconds = timings.get(operation)
+        if seconds:
+            results.append({"connector": connectorname, "features": features, "commits": commits,
+                            "operation": operation, "seconds": seconds,
+                            "min": min(seconds), "median": _median(seconds)})
+    return results
+
+
+def run(features=[1000], commits=[10], connectors=["cli", "py4j"], repeat=3, folder=None):
+    '''
+    Runs the benchmarks for each combination of repository size and connector, and returns a
+    dict with the results and a description of the environment. Connectors that cannot be used,
+    such as the Py4J one when there is no gateway running, are skipped
+    '''
+    setObjectCache(None)
+    tempfolder = folder or tempfile.mkdtemp(prefix="geogigbenchmark")
+    results = []
+    version = None
+    try:
+        for connectorname in connectors:
+            try:
+                for nfeatures in features:
+                    for ncommits in commits:
+                        path = os.path.join(tempfolder, "%s_%i_%i" % (connectorname, nfeatures, ncommits))
+                        timings = {}
+                        repo = createrepo(path, CONNECTORS[connectorname](), nfeatures, ncommits, timings)
+                        version = version or repo.connector.geogigversion()
+                        runreads(repo, nfeatures, repeat, timings)
+                        results.extend(summarize(connectorname, nfeatures, ncommits, timings))
+                        print >> sys.stderr, ("Finished %s connector, %i features, %i commits"
+                                              % (connectorname, nfeatures, ncommits))
+            except Py4JConnectionException:
+                print >> sys.stderr, "Cannot connect to a Py4J gateway. Skipping %s connector" % connectorname
+    finally:
+        if folder is None:
+            shutil.rmtree(tempfolder, ignore_errors=True)
+    return {"date": datetime.datetime.now().isoformat(),
+            "geogigpy": geogigpy.__version__,
+            "geogig": version,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "results": results}
+
+
+def compare(old, new, tolerance=0.2):
+    '''
+    Compares two sets of results, as returned by run, and returns a list of (key, oldmedian, newmedian)
+    tuples for the operations whose median time has increased by more than the passed fraction.
+    Keys are (connector, features, commits, operation) tuples
+    '''
+    def key(result):
+        return (result["connector"], result["features"], result["commits"], result["operation"])
+    before = dict((key(r), r["median"]) for r in old["results"])
+    regressions = []
+    for result in new["results"]:
+        oldmedian = before.get(key(result))
+        if oldmedian is not None and result["median"] > oldmedian * (1 + tolerance):
+            regressions.append((key(result), oldmedian, result["median"]))
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Runs the geogig-py benchmarks on synthetic repositories")
+    parser.add_argument("--features", type=int, nargs="+", default=[1000],
+                        help="number of features of the repositories")
+    parser.add_argument("--commits", type=int, nargs="+", default=[10],
+                        help="number of commits of the repositories")
+    parser.add_argument("--connectors", nargs="+", default=["cli", "py4j"], choices=sorted(CONNECTORS))
+    parser.add_argument("--repeat", type=int, default=3, help="number of times reading operations are run")
+    parser.add_argument("--folder", help="folder to create the repositories in. They are kept if it is passed")
+    parser.add_argument("--output", help="file to write the results to, as JSON")
+    parser.add_argument("--compare", help="results of a previous run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="increase in the median time of an operation considered a regression")
+    args = parser.parse_args(args)
+
+    results = run(args.features, args.commits, args.connectors, args.repeat, args.folder)
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output is None:
+        print output
+    else:
+        with open(args.output, "w") as f:
+            f.write(output)
+    for result in results["results"]:
+        print >> sys.stderr, "%(connector)-5s %(features)8i %(commits)6i %(operation)-15s %(median).3f s" % result
+    if args.compare is not None:
+        with open(args.compare) as f:
+            old = json.load(f)
+        regressions = compare(old, results, args.tolerance)
+        for key, oldmedian, newmedian in regressions:
+            print >> sys.stderr, "Regression in %s: %.3f s -> %.3f s" % (key, oldmedian, newmedian)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    benchmarktest.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import json
+import unittest
+from benchmark import summarize, compare, _features
+
+
+class GeogigBenchmarkTest(unittest.TestCase):
+
+    def testSummarize(self):
+        results = summarize("cli", 1000, 10, {"log": [0.3, 0.1, 0.2], "commit": [1.0, 2.0]})
+        self.assertEquals(["commit", "log"], [r["operation"] for r in results])
+        self.assertEquals(0.2, results[1]["median"])
+        self.assertEquals(0.1, results[1]["min"])
+        self.assertEquals(1.5, results[0]["median"])
+        self.assertEquals(results, json.loads(json.dumps(results)))
+
+    def testCompare(self):
+        old = {"results": summarize("cli", 1000, 10, {"log": [1.0], "diff": [1.0], "add": [1.0]})}
+        new = {"results": summarize("cli", 1000, 10, {"log": [1.1], "diff": [1.5], "commit": [9.0]})}
+        regressions = compare(json.loads(json.dumps(old)), new)
+        self.assertEquals([(("cli", 1000, 10, "diff"), 1.0, 1.5)], regressions)
+        self.assertEquals([], compare(old, new, tolerance=0.6))
+
+    def testSyntheticFeatures(self):
+        features = list(_features(8, 4, 10, 2))
+        self.assertEquals(["points/8", "points/9", "points/0", "points/1"], [path for path, attrs in features])
+        self.assertEquals(2, features[0][1]["version"])
+        self.assertEquals("POINT (8 0)", str(features[0][1]["geom"]))
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    bulkexporttest.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import time
+import threading
+import unittest
+from geogigpy.repo import Repository
+from geogigpy.connector import Connector
+from geogigpy.bulkexport import ExportJob, exportformat, SHP, GEOPKG, SPATIALITE, POSTGIS
+from geogigpy.geogigexception import GeoGigException, PoolException
+
+_exported = []
+_intervals = []
+_exportedLock = threading.Lock()
+
+
+class _FakeConnector(Connector):
+    '''A connector that records exports instead of running them'''
+
+    def checkisrepo(self):
+        pass
+
+    def _export(self, *args):
+        start = time.time()
+        time.sleep(0.05)
+        if args[1] == "broken":
+            raise GeoGigException("cannot export")
+        with _exportedLock:
+            _exported.append((threading.current_thread().name,) + args)
+            _intervals.append((start, time.time()))
+
+    def exportshp(self, ref, path, shapefile, charset=None):
+        self._export("shp", path, shapefile, charset)
+
+    def exportgeopkg(self, ref, path, geopkg, interchange=True, overwrite=False):
+        self._export("geopkg", path, geopkg, overwrite)
+
+    def exportsl(self, ref, path, database, user=None, table=None):
+        self._export("sl", path, database)
+
+    def exportpg(self, ref, path, table, database, user, password=None, schema=None,
+                 host=None, port=None, overwrite=False):
+        self._export("pg", path, database, table)
+
+
+class GeogigBulkExportTest(unittest.TestCase):
+
+    def setUp(self):
+        del _exported[:]
+        del _intervals[:]
+        self.repo = Repository("repo", _FakeConnector())
+
+    def testExportFormat(self):
+        self.assertEquals(SHP, exportformat("/tmp/parks.shp"))
+        self.assertEquals(GEOPKG, exportformat("/tmp/parks.GPKG"))
+        self.assertEquals(SPATIALITE, exportformat("/tmp/parks.sqlite"))
+        self.assertEquals(POSTGIS, exportformat({"database": "gis"}))
+        self.assertRaises(GeoGigException, exportformat, "/tmp/parks.csv")
+
+    def testExportMany(self):
+        jobs = self.repo.exportmany([("HEAD", "parks", "/tmp/parks.shp"),
+                                     ("HEAD", "roads", "/tmp/roads.gpkg", {"overwrite": True}),
+                                     ("HEAD", "rivers", "/tmp/rivers.sqlite"),
+                                     ("HEAD", "lakes", {"database": "gis", "user": "geo"})],
+                                    connector=_FakeConnector)
+        self.assertEquals(4, len(jobs))
+        self.assertTrue(all(job.elapsed >= 0.05 for job in jobs))
+        exported = dict((e[2], e[1:]) for e in _exported)
+        self.assertEquals(("shp", "parks", "/tmp/parks.shp", None), exported["parks"])
+        self.assertEquals(("geopkg", "roads", "/tmp/roads.gpkg", True), exported["roads"])
+        self.assertEquals(("sl", "rivers", "/tmp/rivers.sqlite"), exported["rivers"])
+        self.assertEquals(("pg", "lakes", "gis", None), exported["lakes"])
+
+    def testExportsRunInParallel(self):
+        jobs = [("HEAD", "layer%i" % i, "/tmp/layer%i.shp" % i) for i in range(4)]
+        self.repo.exportmany(jobs, maxworkers=2, connector=_FakeConnector)
+        self.assertTrue(len(set(e[0] for e in _exported)) <= 2)
+        events = sorted([(start, 1) for start, end in _intervals] + [(end, -1) for start, end in _intervals])
+        running = maxrunning = 0
+        for t, change in events:
+            running += change
+            maxrunning = max(running, maxrunning)
+        self.assertEquals(2, maxrunning)
+
+    def testProgress(self):
+        progress = []
+        texts = []
+        jobs = [ExportJob("HEAD", "layer%i" % i, "/tmp/layer%i.shp" % i) for i in range(4)]
+        self.repo.exportmany(jobs, connector=None, progressFunc=progress.append,
+                             progressTextFunc=texts.append)
+        self.assertEquals([25, 50, 75, 100], sorted(progress))
+        self.assertEquals(8, len(texts))
+        self.assertTrue("HEAD:layer0 -> /tmp/layer0.shp exported in" in " ".join(texts))
+
+    def testErrorsAreCollected(self):
+        jobs = [ExportJob("HEAD", "parks", "/tmp/parks.shp"),
+                ExportJob("HEAD", "broken", "/tmp/broken.shp")]
+        try:
+            self.repo.exportmany(jobs, connector=_FakeConnector)
+            self.fail()
+        except PoolException, e:
+            self.assertEquals([jobs[0]], e.results.keys())
+            self.assertEquals([jobs[1]], e.errors.keys())
+            self.assertTrue(isinstance(jobs[1].error, GeoGigException))
+        self.assertEquals(1, len(_exported))
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    bulkimporttest.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from geogigpy.repo import Repository
+from geogigpy.connector import Connector
+from geogigpy.cliconnector import CLIConnector
+from geogigpy.bulkimport import ImportSource, importformat, SHP, GEOJSON, GEOPKG, POSTGIS
+from geogigpy.geogigexception import GeoGigException, PoolException
+
+_commands = []
+_commandsLock = threading.Lock()
+
+
+class _FakeConnector(Connector):
+    '''A connector that records the commands run in each repository, without running geogig'''
+
+    def _record(self, *command):
+        with _commandsLock:
+            _commands.append((self.repo.url,) + command)
+
+    def checkisrepo(self):
+        if not os.path.exists(os.path.join(self.repo.url, ".geogig")):
+            raise GeoGigException("Not a repository")
+
+    def init(self, initParams=None):
+        os.makedirs(os.path.join(self.repo.url, ".geogig"))
+
+    def config(self, param, value, global_=False):
+        pass
+
+    def importshp(self, shapefile, add=False, dest=None, idAttribute=None, force=False, charset=None):
+        if "broken" in shapefile:
+            raise GeoGigException("cannot import")
+        self._record("import", shapefile, dest)
+
+    def importgeojson(self, geojsonfile, add=False, dest=None, idAttribute=None, geomName=None, force=False):
+        self._record("import", geojsonfile, dest)
+
+    def show(self, ref):
+        return "TREE ID:  0000\nSize:  10\nNumber of trees:  0"
+
+    def add(self, paths=[]):
+        self._record("add", sorted(paths))
+
+    def commit(self, message, paths=[]):
+        self._record("commit")
+
+    def revparse(self, rev):
+        return "commit of " + self.repo.url
+
+    def addremote(self, name, url, username, password):
+        self._record("addremote", name, url)
+
+    def removeremote(self, name):
+        self._record("removeremote", name)
+
+    def fetch(self, remote):
+        self._record("fetch", remote)
+
+    def checkout(self, ref, paths=None, force=False):
+        self._record("checkout", ref, sorted(paths))
+
+
+class _CLIAddConnector(_FakeConnector):
+    '''A fake connector that stages paths with the add method of CLIConnector'''
+
+    add = CLIConnector.add.im_func
+
+    def run(self, commands):
+        self._record(*commands)
+        return []
+
+
+class GeogigBulkImportTest(unittest.TestCase):
+
+    def setUp(self):
+        del _commands[:]
+        self.folder = tempfile.mkdtemp()
+        self.repo = Repository(self.folder, _FakeConnector(), init=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def _main(self, command):
+        return [c[1:] for c in _commands if c[0] == self.folder and c[1] == command]
+
+    def testImportFormat(self):
+        self.assertEquals(SHP, importformat("/data/parks.shp"))
+        self.assertEquals(GEOJSON, importformat("/data/parks.GeoJSON"))
+        self.assertEquals(GEOPKG, importformat("/data/parks.gpkg"))
+        self.assertEquals(POSTGIS, importformat({"database": "gis", "table": "parks"}))
+        self.assertRaises(GeoGigException, importformat, "/data/parks.csv")
+
+    def testDefaultDest(self):
+        self.assertEquals("parks", ImportSource("/data/parks.shp").dest)
+        self.assertEquals("lakes", ImportSource({"database": "gis", "table": "lakes"}).dest)
+        self.assertEquals("roads", ImportSource("/data/osm.gpkg", options={"table": "roads"}).dest)
+        self.assertRaises(GeoGigException, ImportSource, "/data/osm.gpkg")
+
+    def testImportMany(self):
+        sources = ["/data/town%i.shp" % i for i in range(6)] + [("/data/rivers.geojson", "water/rivers")]
+        imported = self.repo.importmany(sources, maxworkers=3, connector=_FakeConnector)
+        self.assertEquals(7, len(imported))
+        self.assertTrue(all(source.features == 10 for source in imported))
+        self.assertTrue(all(source.throughput > 0 for source in imported))
+        imports = [c for c in _commands if c[1] == "import"]
+        self.assertEquals(7, len(imports))
+        self.assertTrue(all(c[0] != self.folder for c in imports))
+        dests = ["town%i" % i for i in range(6)] + ["water/rivers"]
+        self.assertEquals([("add", [dest]) for dest in sorted(dests)], sorted(self._main("add")))
+        checkedout = sorted(path for c in self._main("checkout") for path in c[2])
+        self.assertEquals(sorted(dests), checkedout)
+        self.assertEquals(len(self._main("fetch")), len(self._main("removeremote")))
+
+    def testStagingRepositoriesAreRemoved(self):
+        self.repo.importmany(["/data/parks.shp"], connector=_FakeConnector)
+        staging = [c[0] for c in _commands if c[1] == "import"][0]
+        self.assertFalse(os.path.exists(staging))
+
+    def testSameDest(self):
+        self.assertRaises(GeoGigException, self.repo.importmany,
+                          ["/data/a/parks.shp", "/data/b/parks.shp"], connector=_FakeConnector)
+
+    def testErrorsAreCollected(self):
+        sources = [ImportSource("/data/parks.shp"), ImportSource("/data/broken.shp")]
+        try:
+            self.repo.importmany(sources, connector=_FakeConnector)
+            self.fail()
+        except PoolException, e:
+            self.assertEquals([sources[0]], e.results.keys())
+            self.assertEquals([sources[1]], e.errors.keys())
+        self.assertEquals([("add", ["parks"])], self._main("add"))
+
+    def testRemoteNamesAreUnique(self):
+        self.repo.importmany(["/data/parks.shp"], connector=_FakeConnector)
+        self.repo.importmany(["/data/roads.shp"], connector=_FakeConnector)
+        remotes = [c[1] for c in self._main("addremote")]
+        self.assertEquals(2, len(set(remotes)))
+        self.assertTrue(all(r.startswith("geogigimport") for r in remotes))
+
+    def testGeoPackageOptionsAreNotDropped(self):
+        source = ImportSource("/data/osm.gpkg", options={"table": "roads", "charset": "UTF-8"})
+        try:
+            self.repo.importmany([source], connector=_FakeConnector)
+            self.fail()
+        except PoolException, e:
+            self.assertTrue(isinstance(source.error, TypeError))
+
+    def testEachPathIsAddedInItsOwnCommand(self):
+        self.repo = Repository(self.folder, _CLIAddConnector())
+        sources = ["/data/parks.shp", ("/data/rivers.geojson", "water/rivers")]
+        self.repo.importmany(sources, maxworkers=1, connector=_CLIAddConnector)
+        self.assertEquals([("add", "parks"), ("add", "water/rivers")], sorted(self._main("add")))
+        staged = [c[1:] for c in _commands if c[0] != self.folder and c[1] == "add"]
+        self.assertEquals([("add", "parks"), ("add", "water/rivers")], sorted(staged))
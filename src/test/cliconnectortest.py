@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    cliconnectortest.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import unittest
+from geogigpy import cliconnector
+from geogigpy.cliconnector import CLIConnector
+
+
+class _RecordingConnector(CLIConnector):
+    '''A connector that records the command lines it would run instead of running them'''
+
+    def __init__(self, maxcommandlength):
+        CLIConnector.__init__(self)
+        self.maxcommandlength = maxcommandlength
+        self.commandlines = []
+
+    def run(self, commands):
+        self.commandlines.append(" ".join(["geogig"] + commands + cliconnector._NOCOLOR))
+        return []
+
+
+class GeogigCLIConnectorTest(unittest.TestCase):
+
+    def testRunPathsInChunks(self):
+        connector = _RecordingConnector(50)
+        paths = ["parks/new%i" % i for i in range(10)]
+        connector.runpaths(["rm"], paths)
+        self.assertTrue(len(connector.commandlines) > 1)
+        self.assertTrue(all(len(line) <= 50 for line in connector.commandlines))
+        self.assertEquals(paths, [p for line in connector.commandlines for p in line.split()[2:-2]])
+
+    def testRunPathsWithoutLimit(self):
+        connector = _RecordingConnector(None)
+        connector.runpaths(["rm"], ["parks/1", "parks/2"], ["-r"])
+        self.assertEquals(["geogig rm parks/1 parks/2 -r --color never"], connector.commandlines)
+
+    def testAddRunsOneCommandPerPath(self):
+        connector = _RecordingConnector(None)
+        connector.add(["parks/1", "parks/2"])
+        self.assertEquals(["geogig add parks/1 --color never", "geogig add parks/2 --color never"],
+                          connector.commandlines)
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    commitgraphtest.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import hashlib
+import datetime
+import tempfile
+import unittest
+from geogigpy.commit import Commit
+from geogigpy.geogig import NULL_ID
+from geogigpy.commitgraph import CommitGraph
+
+
+def _commit(commitid, parents):
+    date = datetime.datetime(2016, 10, 1)
+    return Commit(None, commitid, None, parents, "", "user", date, "user", date)
+
+# a - b - c - d ----- g
+#      \            /
+#       e ------- f
+_COMMITS = [_commit("g", ["d", "f"]), _commit("f", ["e"]), _commit("e", ["b"]),
+            _commit("d", ["c"]), _commit("c", ["b"]), _commit("b", ["a"]), _commit("a", None)]
+
+
+def _id(name):
+    return hashlib.sha1(name).hexdigest()
+
+# the same history with full commit ids, as stored in an index file
+_IDCOMMITS = [_commit(_id(c.commitid), [_id(p) for p in c._parents if p != NULL_ID]) for c in _COMMITS]
+
+
+class GeogigCommitGraphTest(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = CommitGraph()
+        self.graph.add(_COMMITS)
+
+    def testGenerations(self):
+        self.assertEquals([1, 2, 3, 4, 3, 4, 5], [self.graph.generation(c) for c in "abcdefg"])
+
+    def testMissingParents(self):
+        graph = CommitGraph()
+        graph.add(_COMMITS[:3])
+        self.assertEquals(0, len(graph))
+        self.assertEquals(set(["b", "d"]), graph.missingparents())
+        graph.add(_COMMITS[3:])
+        self.assertEquals(7, len(graph))
+        self.assertFalse(graph.missingparents())
+
+    def testIsAncestor(self):
+        self.assertTrue(self.graph.isancestor("e", "g"))
+        self.assertTrue(self.graph.isancestor("a", "f"))
+        self.assertTrue(self.graph.isancestor("d", "d"))
+        self.assertFalse(self.graph.isancestor("e", "d"))
+        self.assertFalse(self.graph.isancestor("g", "a"))
+
+    def testMergeBase(self):
+        self.assertEquals("b", self.graph.mergebase("d", "f"))
+        self.assertEquals("d", self.graph.mergebase("g", "d"))
+        self.assertEquals("c", self.graph.mergebase("c", "c"))
+
+    def testAheadBehind(self):
+        self.assertEquals((2, 2), self.graph.aheadbehind("d", "f"))
+        self.assertEquals((3, 0), self.graph.aheadbehind("g", "d"))
+        self.assertEquals((0, 6), self.graph.aheadbehind("a", "g"))
+        self.assertEquals((0, 0), self.graph.aheadbehind("c", "c"))
+
+    def testSaveAndLoad(self):
+        fd, filename = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            graph = CommitGraph(filename)
+            graph.add(_IDCOMMITS[3:])
+            graph.save()
+            graph = CommitGraph(filename)
+            self.assertEquals(4, len(graph))
+            graph.add(_IDCOMMITS[:3])
+            graph.save()
+            graph = CommitGraph(filename)
+            self.assertEquals(7, len(graph))
+            self.assertEquals([_id("d"), _id("f")], graph.parents(_id("g")))
+            self.assertEquals(_id("b"), graph.mergebase(_id("d"), _id("f")))
+        finally:
+            os.remove(filename)
+
+    def testCorruptLinesAreSkipped(self):
+        fd, filename = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            graph = CommitGraph(filename)
+            graph.add(_IDCOMMITS)
+            graph.save()
+            with open(filename) as f:
+                lines = f.readlines()
+            # e has a truncated parent id, so f and g, which descend from it, are dropped too
+            lines[lines.index([l for l in lines if l.startswith(_id("e"))][0])] = (
+                "%s 3 1475272800.0 %s\n" % (_id("e"), _id("b")[:20]))
+            lines.append("%s x 1475272800.0\n" % _id("h"))
+            lines.append("not-an-id 1 1475272800.0\n")
+            lines.append("%s 1 1475272800.0" % _id("i"))
+            with open(filename, "w") as f:
+                f.write("".join(lines))
+            graph = CommitGraph(filename)
+            self.assertEquals(4, len(graph))
+            self.assertTrue(graph.isancestor(_id("a"), _id("d")))
+            graph.add(_IDCOMMITS[:3])
+            self.assertEquals(7, len(graph))
+            self.assertEquals(_id("b"), graph.mergebase(_id("d"), _id("f")))
+        finally:
+            os.remove(filename)
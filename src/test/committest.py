@@ -27,7 +27,7 @@ __revision__ = '$Format:%H$'
 import unittest
 import os
 import time
-from geogigpy.commit import Commit
+from geogigpy.commit import Commit, CommitCache
 from testrepo import testRepo
 
 
@@ -56,3 +56,23 @@ class GeogigCommitTest(unittest.TestCase):
         diff = commit.diff()
         self.assertEquals(1, len(diff))
         self.assertEquals("parks/5", diff[0].path)
+
+    def testParentsFromCache(self):
+        log = self.repo.log()
+        ncommands = len(self.repo.connector.commandslog)
+        commit = log[0]
+        for i in range(len(log) - 1):
+            commit = commit.parent
+            self.assertEquals(log[i + 1].commitid, commit.commitid)
+        self.assertEquals(ncommands, len(self.repo.connector.commandslog))
+
+    def testCommitCacheEviction(self):
+        log = self.repo.log()
+        cache = CommitCache(2)
+        cache.putall(log[:3])
+        self.assertEquals(2, len(cache))
+        self.assertFalse(log[0].commitid in cache)
+        self.assertTrue(cache.get(log[1].commitid) is log[1])
+        self.assertTrue(cache.get(log[0].commitid) is None)
+        self.assertEquals(1, cache.hits)
+        self.assertEquals(1, cache.misses)
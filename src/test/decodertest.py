@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    decodertest.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import time
+import uuid
+import datetime
+import unittest
+from geogigpy import cliconnector
+from geogigpy.cliconnector import CLIConnector, registerDecoder
+from geogigpy.geometry import Geometry
+
+_LINES = ["name", "STRING", "park",
+          "area", "DOUBLE", "12.5",
+          "id", "LONG", "3",
+          "open", "BOOLEAN", "true",
+          "geom", "MULTIPOLYGON EPSG:4326", "MULTIPOLYGON (((0 0, 1 0, 1 1, 0 0)))",
+          "owner", "STRING", "[NULL]"]
+
+
+class GeogigDecoderTest(unittest.TestCase):
+
+    def tearDown(self):
+        for valuetype in ["DATE", "UUID"]:
+            cliconnector._decoders.pop(valuetype, None)
+        cliconnector._resolvedDecoders.clear()
+
+    def testParseAttributes(self):
+        attrs = CLIConnector().parseattribs(_LINES)
+        self.assertEquals(("park", "STRING"), attrs["name"])
+        self.assertEquals((12.5, "DOUBLE"), attrs["area"])
+        self.assertEquals((3, "LONG"), attrs["id"])
+        self.assertEquals((True, "BOOLEAN"), attrs["open"])
+        self.assertEquals((None, "STRING"), attrs["owner"])
+        geom = attrs["geom"][0]
+        self.assertTrue(isinstance(geom, Geometry))
+        self.assertEquals("EPSG:4326", geom.crs)
+
+    def testInvalidNumbersAreKeptAsStrings(self):
+        connector = CLIConnector()
+        self.assertEquals("1.5", connector.valuefromstring("1.5", "INTEGER"))
+        self.assertEquals("none", connector.valuefromstring("none", "DOUBLE"))
+
+    def testRegisteredDecoders(self):
+        registerDecoder("DATE", lambda v: datetime.datetime.strptime(v, "%Y-%m-%d").date())
+        registerDecoder("UUID", uuid.UUID)
+        connector = CLIConnector()
+        self.assertEquals(datetime.date(2016, 10, 1), connector.valuefromstring("2016-10-01", "DATE"))
+        self.assertEquals("not a date", connector.valuefromstring("not a date", "DATE"))
+        uid = str(uuid.uuid4())
+        self.assertEquals(uuid.UUID(uid), connector.valuefromstring(uid, "UUID"))
+
+
+def _oldvaluefromstring(value, valuetype):
+    '''The implementation of CLIConnector.valuefromstring before decoders were used'''
+    if value == "[NULL]":
+        return None
+    tokens = valuetype.split(" ")
+    try:
+        if valuetype == "BOOLEAN":
+            return str(value).lower() == "true"
+        elif valuetype in ["BYTE", "SHORT", "INTEGER", "LONG"]:
+            return int(value)
+        elif valuetype in ["FLOAT", "DOUBLE"]:
+            return float(value)
+        elif (valuetype in ["POINT", "LINESTRING", "POLYGON", "MULTIPOINT", "MULTILINESTRING", "MULTIPOLYGON"]
+                or len(tokens) > 1):
+            crs = " ".join(tokens[1:]) if len(tokens) > 1 else None
+            return Geometry(value, crs)
+        else:
+            return value
+    except:
+        return value
+
+
+def _oldparseattribs(lines):
+    '''The implementation of CLIConnector.parseattribs before decoders were used'''
+    attributes = {}
+    iterator = iter(lines)
+    while True:
+        try:
+            name = iterator.next()
+            attribtype = iterator.next()
+            value = iterator.next()
+            value = _oldvaluefromstring(value, attribtype)
+            attributes[name] = (value, attribtype)
+        except StopIteration:
+            return attributes
+
+
+def benchmark(n=1000000):
+    '''Compares the time needed to parse n attribute values with the old and new implementations'''
+    lines = _LINES * (n // (len(_LINES) // 3))
+    nvalues = len(lines) // 3
+    start = time.time()
+    _oldparseattribs(lines)
+    old = time.time() - start
+    connector = CLIConnector()
+    start = time.time()
+    connector.parseattribs(lines)
+    new = time.time() - start
+    print "old parseattribs: %.2f s for %i values" % (old, nvalues)
+    print "parseattribs with decoders: %.2f s for %i values (%.1fx)" % (new, nvalues, old / new)
+
+
+if __name__ == '__main__':
+    benchmark()
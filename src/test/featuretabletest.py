@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    featuretabletest.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import math
+import struct
+import unittest
+from geogigpy import featuretable
+from geogigpy.featuretable import PATH_COLUMN
+from geogigpy.feature import Feature
+from geogigpy.geometry import Geometry
+
+
+class _TableRepo(object):
+    '''A repository with a single tree, that does not need geogig'''
+
+    def __init__(self, n):
+        self.connector = self
+        self.queries = 0
+        self.data = {}
+        for i in range(n):
+            self.data["HEAD:parks/%i" % i] = {"id": (i, "LONG"),
+                                              "area": (None if i == 1 else i * 1.5, "DOUBLE"),
+                                              "open": (i % 2 == 0, "BOOLEAN"),
+                                              "name": ("park%i" % i, "STRING"),
+                                              "geom": (Geometry("POINT (%i 0)" % i, "EPSG:4326"), "POINT EPSG:4326")}
+
+    def featuretype(self, ref, path):
+        return {"id": "LONG", "area": "DOUBLE", "open": "BOOLEAN", "name": "STRING", "geom": "POINT"}
+
+    def iterchildren(self, ref, path):
+        for key in sorted(self.data, key=lambda k: int(k.split("/")[1])):
+            yield Feature(self, ref, key.split(":")[1])
+
+    def featuresdata(self, refs):
+        self.queries += 1
+        return dict((ref, self.data[ref]) for ref in refs)
+
+
+class GeogigFeatureTableTest(unittest.TestCase):
+
+    def checkTable(self, table):
+        self.assertEquals(["parks/0", "parks/1", "parks/2", "parks/3", "parks/4"], list(table[PATH_COLUMN]))
+        self.assertEquals([0, 1, 2, 3, 4], list(table["id"]))
+        self.assertEquals(4.5, table["area"][3])
+        self.assertTrue(math.isnan(table["area"][1]))
+        self.assertEquals([True, False, True, False, True], [bool(v) for v in table["open"]])
+        self.assertEquals("park2", table["name"][2])
+        self.assertEquals(struct.pack("<BIdd", 1, 1, 4, 0), table["geom"][4])
+
+    def testFeatureTable(self):
+        repo = _TableRepo(5)
+        table = featuretable.featuretable(repo, "HEAD", "parks", chunksize=2)
+        self.checkTable(table)
+        self.assertEquals(3, repo.queries)
+        if featuretable.numpy is not None:
+            self.assertEquals("int64", str(table["id"].dtype))
+            self.assertEquals("float64", str(table["area"].dtype))
+            self.assertEquals("bool", str(table["open"].dtype))
+
+    def testFeatureTableWithoutNumpy(self):
+        numpy = featuretable.numpy
+        featuretable.numpy = None
+        try:
+            self.checkTable(featuretable.featuretable(repo=_TableRepo(5), ref="HEAD", path="parks", chunksize=2))
+        finally:
+            featuretable.numpy = numpy
+
+    def testChunks(self):
+        chunks = list(featuretable.iterfeaturetable(_TableRepo(5), "HEAD", "parks", chunksize=2))
+        self.assertEquals([2, 2, 1], [len(c[PATH_COLUMN]) for c in chunks])
+
+    def testEmptyTree(self):
+        table = featuretable.featuretable(_TableRepo(0), "HEAD", "parks")
+        self.assertEquals(0, len(table["id"]))
+        self.assertEquals(0, len(table[PATH_COLUMN]))
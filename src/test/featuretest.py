@@ -69,6 +69,16 @@ class GeogigFeatureTest(unittest.TestCase):
         self.assertTrue("the_geom" in data)
         self.assertTrue(isinstance(data["the_geom"], Geometry))
 
+    def testBatchLoading(self):
+        features = self.repo.features(path="parks")
+        ncommands = len(self.repo.connector.commandslog)
+        features[0].attributes
+        self.assertEquals(ncommands + 1, len(self.repo.connector.commandslog))
+        for feature in features:
+            self.assertEquals(8, len(feature.attributes))
+        self.assertEquals(ncommands + 1, len(self.repo.connector.commandslog))
+        self.assertEquals("MULTIPOLYGON EPSG:4326", features[1].featuretype()['the_geom'])
+
     def testDiff(self):
         feature = Feature(self.repo, geogig.HEAD, "parks/5")
         featureB = Feature(self.repo, geogig.HEAD + "~1", "parks/5")
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    geometrytest.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import struct
+import unittest
+from geogigpy.geometry import Geometry
+
+
+class GeogigGeometryTest(unittest.TestCase):
+
+    def testPoint(self):
+        geom = Geometry("POINT (1 2)", "EPSG:4326")
+        self.assertEquals("POINT", geom.geomtype)
+        self.assertEquals(1, geom.numpoints)
+        self.assertEquals((1, 2, 1, 2), geom.bounds)
+        self.assertEquals(struct.pack("<BIdd", 1, 1, 1, 2), geom.wkb)
+
+    def testPointZ(self):
+        geom = Geometry("POINT Z (1 2 3)", None)
+        self.assertEquals(3, geom.dimension)
+        self.assertEquals(struct.pack("<BIddd", 1, 1001, 1, 2, 3), geom.wkb)
+
+    def testMultiPolygon(self):
+        wkt = "MULTIPOLYGON (((0 0, 10 0, 10 10, 0 0), (1 1, 2 1, 2 2, 1 1)), ((-5 20, -4 20, -4 21, -5 20)))"
+        geom = Geometry(wkt, None)
+        self.assertEquals("MULTIPOLYGON", geom.geomtype)
+        self.assertEquals(12, geom.numpoints)
+        self.assertEquals((-5, 0, 10, 21), geom.bounds)
+        self.assertEquals(2, len(geom.coordinates))
+        self.assertEquals(2, len(geom.coordinates[0]))
+        self.assertTrue(geom.intersectsbounds((9, 9, 11, 11)))
+        self.assertFalse(geom.intersectsbounds((11, 0, 12, 1)))
+        wkb = geom.wkb
+        self.assertEquals(struct.pack("<BII", 1, 6, 2), wkb[:9])
+        self.assertEquals(9 + 2 * 9 + 3 * 4 + 12 * 16, len(wkb))
+
+    def testMultiPointWithoutParentheses(self):
+        geom = Geometry("MULTIPOINT (1 2, 3 4)", None)
+        self.assertEquals(2, len(geom.coordinates))
+        self.assertEquals((1, 2, 3, 4), geom.bounds)
+
+    def testGeometryCollection(self):
+        geom = Geometry("GEOMETRYCOLLECTION (POINT (1 2), LINESTRING (3 4, 5 6))", None)
+        self.assertEquals(3, geom.numpoints)
+        self.assertEquals((1, 2, 5, 6), geom.bounds)
+
+    def testEmpty(self):
+        geom = Geometry("POLYGON EMPTY", None)
+        self.assertEquals(0, geom.numpoints)
+        self.assertTrue(geom.bounds is None)
+        self.assertFalse(geom.intersectsbounds((0, 0, 1, 1)))
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    modeltest.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import sys
+import hashlib
+import unittest
+from geogigpy import geogig
+from geogigpy.diff import Diffentry, TYPE_ADDED, TYPE_MODIFIED
+
+
+class _DictDiffentry(object):
+    '''A Diffentry using a per-instance dict and hex ids, to compare memory usage with'''
+
+    def __init__(self, repo, oldcommitref, newcommitref, oldref, newref, path):
+        self.repo = repo
+        self.path = path
+        self.oldref = oldref
+        self.newref = newref
+        self.oldcommitref = oldcommitref
+        self.newcommitref = newcommitref
+
+
+def _objectid(i):
+    return hashlib.sha1(str(i)).hexdigest()
+
+
+def _entries(cls, n):
+    for i in xrange(n):
+        # ids are parsed from command output, so each entry has its own copy of them
+        yield cls(None, "HEAD~1", "HEAD", _objectid(i), _objectid(i + n), "layer/%i" % i)
+
+
+def _size(entry):
+    '''Size of an entry, including the id strings it owns but not shared ones like repo or commit refs'''
+    size = sys.getsizeof(entry)
+    if hasattr(entry, "__dict__"):
+        size += sys.getsizeof(entry.__dict__)
+        size += sys.getsizeof(entry.oldref) + sys.getsizeof(entry.newref)
+    else:
+        size += sys.getsizeof(entry._oldref) + sys.getsizeof(entry._newref)
+    return size
+
+
+class GeogigModelTest(unittest.TestCase):
+
+    def testDiffentryIds(self):
+        entry = Diffentry(None, "HEAD~1", "HEAD", geogig.NULL_ID, _objectid(1), "layer/1")
+        self.assertEquals(geogig.NULL_ID, entry.oldref)
+        self.assertEquals(_objectid(1), entry.newref)
+        self.assertEquals(TYPE_ADDED, entry.type())
+        entry.oldref = _objectid(2)
+        self.assertEquals(_objectid(2), entry.oldref)
+        self.assertEquals(TYPE_MODIFIED, entry.type())
+
+    def testDiffentryHasNoDict(self):
+        entry = Diffentry(None, "HEAD~1", "HEAD", geogig.NULL_ID, _objectid(1), "layer/1")
+        self.assertFalse(hasattr(entry, "__dict__"))
+        self.assertRaises(AttributeError, setattr, entry, "newattribute", 1)
+
+    def testDiffentryMemory(self):
+        old = sum(_size(e) for e in _entries(_DictDiffentry, 1000))
+        new = sum(_size(e) for e in _entries(Diffentry, 1000))
+        self.assertTrue(new * 2 <= old)
+
+
+def benchmark(n=1000000):
+    '''Compares the memory used by a diff with n entries with the old and new Diffentry classes'''
+    old = sum(_size(e) for e in _entries(_DictDiffentry, n))
+    new = sum(_size(e) for e in _entries(Diffentry, n))
+    print "dict-based entries: %.1f MB (%i bytes/entry)" % (old / 1048576.0, old / n)
+    print "slotted entries: %.1f MB (%i bytes/entry)" % (new / 1048576.0, new / n)
+
+
+if __name__ == '__main__':
+    benchmark()
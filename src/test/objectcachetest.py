@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    objectcachetest.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import shutil
+import tempfile
+import unittest
+from geogigpy.objectcache import ObjectCache, setObjectCache, immutablekey, immutablerefspec
+from geogigpy.cliconnector import CLIConnector
+from geogigpy.geometry import Geometry
+
+_ID = "a" * 40
+
+
+class _NoGeogigConnector(CLIConnector):
+    '''A connector that answers a fixed output for show commands and counts them'''
+
+    def __init__(self):
+        CLIConnector.__init__(self)
+
+    def run(self, commands):
+        self.commandslog.append(" ".join(commands))
+        return ["parks/1", "id", "name", "STRING", "park", "geom", "POINT EPSG:4326", "POINT (1 2)"]
+
+
+class GeogigObjectCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.filename = os.path.join(self.folder, "cache.db")
+
+    def tearDown(self):
+        setObjectCache(None)
+        shutil.rmtree(self.folder)
+
+    def testPutAndGet(self):
+        cache = ObjectCache(self.filename)
+        self.assertTrue(cache.get("feature", _ID) is None)
+        cache.put("feature", _ID, {"name": ("park", "STRING")})
+        self.assertEquals({"name": ("park", "STRING")}, cache.get("feature", _ID))
+        self.assertTrue(cache.get("commit", _ID) is None)
+        self.assertEquals(1, cache.hits)
+        self.assertEquals(2, cache.misses)
+        cache.close()
+
+    def testPersistence(self):
+        cache = ObjectCache(self.filename)
+        cache.put("feature", _ID, {"geom": (Geometry("POINT (1 2)", "EPSG:4326"), "POINT")})
+        cache.close()
+        cache = ObjectCache(self.filename)
+        geom = cache.get("feature", _ID)["geom"][0]
+        self.assertEquals("POINT (1 2)", geom.geom)
+        self.assertEquals((1, 2, 1, 2), geom.bounds)
+        cache.close()
+
+    def testEviction(self):
+        cache = ObjectCache(self.filename, maxsize=10000)
+        for i in range(100):
+            cache.put("feature", str(i), "x" * 500)
+        self.assertTrue(len(cache) < 20)
+        self.assertTrue(cache.get("feature", "99") is not None)
+        self.assertTrue(cache.get("feature", "0") is None)
+        cache.close()
+
+    def testImmutableKeys(self):
+        self.assertEquals(_ID, immutablekey(_ID))
+        self.assertEquals(_ID + ":parks/1", immutablekey(_ID, "parks/1"))
+        self.assertEquals(_ID + ":parks/1", immutablerefspec(_ID + ":parks/1"))
+        self.assertTrue(immutablekey("HEAD", "parks/1") is None)
+        self.assertTrue(immutablerefspec("master:parks/1") is None)
+
+    def testCachedFeatureDataDoesNotRunCommands(self):
+        setObjectCache(self.filename)
+        connector = _NoGeogigConnector()
+        data = connector.featuredata(_ID, "parks/1")
+        self.assertEquals(1, len(connector.commandslog))
+        connector = _NoGeogigConnector()
+        self.assertEquals(data.keys(), connector.featuredata(_ID, "parks/1").keys())
+        self.assertEquals(0, len(connector.commandslog))
+        connector.featuredata("HEAD", "parks/1")
+        self.assertEquals(1, len(connector.commandslog))
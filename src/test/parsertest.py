@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    parsertest.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import time
+import datetime
+import unittest
+from geogigpy import cliconnector
+from geogigpy.cliconnector import CLIConnector
+from geogigpy.repo import Repository
+from geogigpy.diff import Diffentry
+from geogigpy.geogigexception import GeoGigException
+
+_ID = "a" * 40
+_PARENT = "b" * 40
+_TREE = "c" * 40
+
+_COMMIT = ["commit " + _ID,
+           "tree " + _TREE,
+           "parent " + _PARENT,
+           "author Victor Olaya volaya@boundlessgeo.com 1400000000000 0",
+           "committer Victor Olaya volaya@boundlessgeo.com 1400000000000 0",
+           "message",
+           "\tfirst line",
+           "\tsecond line"]
+
+
+class _ShowConnector(CLIConnector):
+
+    def __init__(self, output):
+        CLIConnector.__init__(self)
+        self.output = output
+
+    def checkisrepo(self):
+        pass
+
+    def _show(self, ref):
+        return self.output
+
+
+def _connector():
+    connector = CLIConnector()
+    connector.setRepository(None)
+    return connector
+
+
+class _FailingConnector(CLIConnector):
+    '''A connector whose commands print an error message and fail'''
+
+    class _Repo(object):
+        featurebatchsize = 1
+
+    def __init__(self):
+        CLIConnector.__init__(self)
+        self.setRepository(self._Repo())
+
+    def runiter(self, commands):
+        yield "Error:"
+        yield "Invalid reference: wrongref"
+        raise GeoGigException(["Error:", "Invalid reference: wrongref"])
+
+
+class _DescribeConnector(CLIConnector):
+    '''A connector that prints the description of a diff between two trees'''
+
+    def runiter(self, commands):
+        return iter(["parks/1", "M area", "1.5", "2.5", "U name", "park", "",
+                     "parks/2", "A name", "new park", "A the_geom", "POINT (0 0)", ""])
+
+
+class GeogigParserTest(unittest.TestCase):
+
+    def testParseCommit(self):
+        commit = _connector().commitFromString(_COMMIT)
+        self.assertEquals(_ID, commit.commitid)
+        self.assertEquals(_TREE, commit.treeid)
+        self.assertEquals([_PARENT], commit._parents)
+        self.assertEquals("first line\nsecond line", commit.message)
+        self.assertEquals("Victor Olaya", commit.authorname)
+        self.assertEquals("Victor Olaya", commit.committername)
+        self.assertEquals(datetime.datetime.fromtimestamp(1400000000), commit.committerdate)
+
+    def testParseMergeCommit(self):
+        lines = list(_COMMIT)
+        lines[2] = "parent %s %s" % (_PARENT, _TREE)
+        commit = _connector().commitFromString(lines)
+        self.assertEquals([_PARENT, _TREE], commit._parents)
+
+    def testParseEmptyOutput(self):
+        self.assertTrue(_connector().commitFromString([]) is None)
+
+    def testParseDiffEntryWithSpaces(self):
+        entry = _connector().diffentryFromString("HEAD~1", "HEAD", "my parks/park 1 %s %s" % (_PARENT, _ID))
+        self.assertEquals("my parks/park 1", entry.path)
+        self.assertEquals(_PARENT, entry.oldref)
+        self.assertEquals(_ID, entry.newref)
+
+    def testErrorsAreNotParsed(self):
+        connector = _FailingConnector()
+        self.assertRaises(GeoGigException, connector.children, "wrongref")
+        self.assertRaises(GeoGigException, connector.diff, "wrongref", "HEAD")
+        self.assertRaises(GeoGigException, list, connector._itertreediff({}, "parks", "wrongref", "HEAD", None, False))
+
+    def testChangedAttributes(self):
+        changed = dict(_DescribeConnector().iterchangedattributes("parks", "HEAD~1", "HEAD"))
+        self.assertEquals({"parks/1": set(["area"]), "parks/2": set(["name", "the_geom"])}, changed)
+
+    def testParseFeatureType(self):
+        connector = _ShowConnector("FEATURE_TYPE\nID:  %s\n\nname: <STRING>\narea: <DOUBLE>\n"
+                                   "survey:date: <DATE>\nthe_geom: <MULTIPOLYGON>" % _ID)
+        ftype = connector._featuretype(_ID)
+        self.assertEquals({"name": "STRING", "area": "DOUBLE", "survey:date": "DATE",
+                           "the_geom": "MULTIPOLYGON"}, ftype)
+
+    def testParseTreeSize(self):
+        repo = Repository("repo", _ShowConnector("TREE ID:  %s\nSize:  42\nNumber of trees:  0" % _TREE))
+        self.assertEquals(42, repo.count(_ID, "parks"))
+
+
+def _oldcommitfromstring(lines):
+    '''The implementation of CLIConnector.commitFromString before rev-list output was parsed by fields'''
+    message = False
+    messagetext = []
+    parents = None
+    commitid = None
+    for line in lines:
+        tokens = line.split(' ')
+        if message:
+            if line.startswith("\t") or line.startswith(" "):
+                messagetext.append(line.strip())
+            else:
+                message = False
+        else:
+            if tokens[0] == 'commit':
+                commitid = tokens[1]
+            if tokens[0] == 'tree':
+                tree = tokens[1]
+            if tokens[0] == 'parent':
+                if len(tokens) > 1:
+                    parents = [t for t in tokens[1:] if t != ""]
+            elif tokens[0] == 'author':
+                author = " ".join(tokens[1:-3])
+                authordate = datetime.datetime.fromtimestamp((int(tokens[-2]) - int(tokens[-1])) // 1000)
+            elif tokens[0] == 'committer':
+                committer = tokens[1]
+                committerdate = datetime.datetime.fromtimestamp((int(tokens[-2]) - int(tokens[-1])) // 1000)
+            elif tokens[0] == 'message':
+                message = True
+    if commitid is not None:
+        return (commitid, tree, parents, "\n".join(messagetext), author, authordate, committer, committerdate)
+
+
+def _olddiffentry(line):
+    '''The implementation of CLIConnector.diffentryFromString before ids were taken from the right'''
+    tokens = line.strip().split(" ")
+    path = " ".join(tokens[0:-2])
+    return Diffentry(None, "HEAD~1", "HEAD", tokens[-2], tokens[-1], path)
+
+
+def _time(func, items):
+    start = time.time()
+    for item in items:
+        func(item)
+    return time.time() - start
+
+
+def benchmark(n=200000):
+    '''Compares the time needed to parse n commits and n diff entries with the old and new implementations'''
+    commits = [_COMMIT] * n
+    old = _time(_oldcommitfromstring, commits)
+    new = _time(cliconnector._parsecommit, commits)
+    print "commits: %.2f s before, %.2f s now for %i commits (%.1fx)" % (old, new, n, old / new)
+    lines = ["parks/park %i %s %s" % (i, _PARENT, _ID) for i in xrange(n)]
+    old = _time(_olddiffentry, lines)
+    connector = _connector()
+    new = _time(lambda line: connector.diffentryFromString("HEAD~1", "HEAD", line), lines)
+    print "diff entries: %.2f s before, %.2f s now for %i entries (%.1fx)" % (old, new, n, old / new)
+
+
+if __name__ == '__main__':
+    benchmark()
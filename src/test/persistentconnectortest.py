@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    persistentconnectortest.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import unittest
+from geogigpy.repo import Repository
+from geogigpy import persistentconnector
+from geogigpy.persistentconnector import PersistentCLIConnector, GeoGigWorker
+from geogigpy.geogigexception import GeoGigException
+from py4j.protocol import Py4JNetworkError
+from testrepo import testRepo
+
+
+class _Process(object):
+    '''A worker process that keeps running until it is killed, but never accepts connections'''
+
+    def __init__(self, *args, **kwargs):
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+    def kill(self):
+        self.returncode = -9
+
+    def terminate(self):
+        self.returncode = -15
+
+    def wait(self):
+        pass
+
+
+class _Gateway(object):
+    '''A gateway that cannot connect to its server'''
+
+    instances = []
+
+    def __init__(self, client):
+        self.closed = False
+        _Gateway.instances.append(self)
+
+    @property
+    def entry_point(self):
+        raise Exception("Connection refused")
+
+    def close(self):
+        self.closed = True
+
+
+class GeogigPersistentConnectorTest(unittest.TestCase):
+
+    repo = testRepo()
+
+    def getRepo(self):
+        return Repository(self.repo.url, PersistentCLIConnector())
+
+    def testLog(self):
+        repo = self.getRepo()
+        log = repo.log()
+        self.assertEquals(4, len(log))
+        self.assertEquals("message_4", log[0].message)
+
+    def testWorkerIsReused(self):
+        repo = self.getRepo()
+        repo.revparse("HEAD~1")
+        proc = persistentconnector._worker(repo.url).proc
+        repo.revparse("HEAD~2")
+        self.assertTrue(proc is persistentconnector._worker(repo.url).proc)
+
+    def testWorkerIsRestarted(self):
+        repo = self.getRepo()
+        repo.revparse("HEAD~1")
+        worker = persistentconnector._worker(repo.url)
+        worker.proc.kill()
+        worker.proc.wait()
+        log = repo.log()
+        self.assertEquals(4, len(log))
+        self.assertTrue(worker.isalive())
+        repo.connector.stopworker()
+
+    def testStartupAttemptsShareGateway(self):
+        popen = persistentconnector.subprocess.Popen
+        gateway = persistentconnector.JavaGateway
+        timeout = persistentconnector._startupTimeout
+        persistentconnector.subprocess.Popen = _Process
+        persistentconnector.JavaGateway = _Gateway
+        persistentconnector.setStartupTimeout(0.5)
+        try:
+            worker = GeoGigWorker(self.repo.url)
+            self.assertRaises(GeoGigException, worker.start)
+            self.assertEquals(1, len(_Gateway.instances))
+            self.assertTrue(_Gateway.instances[0].closed)
+            self.assertTrue(worker.gateway is None)
+        finally:
+            persistentconnector.subprocess.Popen = popen
+            persistentconnector.JavaGateway = gateway
+            persistentconnector.setStartupTimeout(timeout)
+
+    def testWorkerCrashWhileIterating(self):
+        worker = GeoGigWorker(self.repo.url)
+        worker.proc = _Process()
+        worker.gateway = object()
+
+        def lines(commands, url, addcolor=True, gateway=None):
+            yield "first line"
+            worker.proc.kill()
+            raise Py4JNetworkError("Answer from Java side is empty")
+        runiter = persistentconnector._runGatewayIter
+        persistentconnector._runGatewayIter = lines
+        try:
+            output = worker.runiter(["log"])
+            self.assertEquals("first line", output.next())
+            self.assertRaises(GeoGigException, output.next)
+            self.assertTrue(worker.proc is None)
+            self.assertTrue(worker.gateway is None)
+        finally:
+            persistentconnector._runGatewayIter = runiter
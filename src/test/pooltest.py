@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    pooltest.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import time
+import tempfile
+import threading
+import unittest
+from geogigpy.pool import RepositoryPool
+from geogigpy.connector import Connector
+from geogigpy.cliconnector import CLIConnector
+from geogigpy.geogigexception import GeoGigException, PoolException
+
+
+class _FakeConnector(Connector):
+    '''A connector that does not need geogig, used to check how operations are distributed'''
+
+    def checkisrepo(self):
+        pass
+
+    def revparse(self, rev):
+        if self.repo.url.endswith("broken"):
+            raise GeoGigException("broken repository")
+        return rev + " of " + self.repo.url
+
+
+def _threadname(repo, delay):
+    time.sleep(delay)
+    return threading.current_thread().name
+
+
+def _pid(repo):
+    return os.getpid()
+
+
+class GeogigPoolTest(unittest.TestCase):
+
+    def testMapMethodName(self):
+        pool = RepositoryPool(["a", "b", "c"], connector=_FakeConnector)
+        results = pool.map("revparse", "HEAD")
+        self.assertEquals(["a", "b", "c"], results.keys())
+        self.assertEquals("HEAD of b", results["b"])
+
+    def testMapRunsInParallel(self):
+        pool = RepositoryPool(["repo%i" % i for i in range(4)], maxworkers=2, connector=_FakeConnector)
+        results = pool.map(_threadname, 0.1)
+        self.assertEquals(2, len(set(results.values())))
+
+    def testRepositoriesAreReused(self):
+        pool = RepositoryPool(["a", "b"], connector=_FakeConnector)
+        first = pool.map(lambda repo: repo)
+        second = pool.map(lambda repo: repo)
+        self.assertTrue(first["a"] is second["a"])
+
+    def testErrorsAreCollected(self):
+        pool = RepositoryPool(["a", "broken", "c"], connector=_FakeConnector)
+        try:
+            pool.map("revparse", "HEAD")
+            self.fail()
+        except PoolException, e:
+            self.assertEquals(["a", "c"], e.results.keys())
+            self.assertEquals(["broken"], e.errors.keys())
+            self.assertTrue(isinstance(e.errors["broken"], GeoGigException))
+
+    def testMapInProcesses(self):
+        pool = RepositoryPool(["a", "b"], processes=True, connector=_FakeConnector)
+        results = pool.map(_pid)
+        self.assertTrue(os.getpid() not in results.values())
+
+    def testRunDoesNotChangeWorkingDir(self):
+        class _Repo(object):
+            url = tempfile.gettempdir()
+        connector = CLIConnector()
+        connector.setRepository(_Repo())
+        cwd = os.getcwd()
+        try:
+            connector.run(["--version"])
+        except GeoGigException:
+            pass
+        self.assertEquals(cwd, os.getcwd())
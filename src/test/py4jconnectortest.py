@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    py4jconnectortest.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import unittest
+from geogigpy import py4jconnector
+
+
+class _Finalizer(object):
+    finalizers = {}
+
+
+class _Clock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+class _Collector(object):
+
+    def __init__(self):
+        self.collections = 0
+
+    def collect(self):
+        self.collections += 1
+
+
+class _Splitter(object):
+
+    def split(self, joined, limit):
+        return joined.split(py4jconnector._ARGS_SEPARATOR)
+
+
+class _Gateway(object):
+    '''A gateway that creates arrays without a JVM, recording how they were created'''
+
+    class jvm(object):
+        String = str
+
+        class java(object):
+            class util(object):
+                class regex(object):
+                    class Pattern(object):
+                        compiled = 0
+
+                        @classmethod
+                        def compile(cls, regex):
+                            cls.compiled += 1
+                            return _Splitter()
+
+    def __init__(self):
+        self.newarrays = 0
+
+    def new_array(self, cls, size):
+        self.newarrays += 1
+        return [None] * size
+
+
+class GeogigPy4JConnectorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = dict((name, getattr(py4jconnector, name)) for name in
+                          ["ThreadSafeFinalizer", "time", "gc", "_maxNewProxies", "_maxCollectInterval",
+                           "_lastCollectTime", "_proxiesAfterCollect"])
+        _Finalizer.finalizers = {}
+        self.clock = _Clock()
+        self.collector = _Collector()
+        py4jconnector.ThreadSafeFinalizer = _Finalizer
+        py4jconnector.time = self.clock
+        py4jconnector.gc = self.collector
+        py4jconnector._lastCollectTime = self.clock.now
+        py4jconnector._proxiesAfterCollect = 0
+        py4jconnector.setCollectionBudget(maxproxies=10, interval=60)
+
+    def tearDown(self):
+        for name, value in self.saved.iteritems():
+            setattr(py4jconnector, name, value)
+
+    def addProxies(self, n):
+        start = len(_Finalizer.finalizers)
+        for i in range(n):
+            _Finalizer.finalizers[start + i] = None
+
+    def testSetCollectionBudget(self):
+        py4jconnector.setCollectionBudget(maxproxies=5, interval=30)
+        self.assertEquals(5, py4jconnector._maxNewProxies)
+        self.assertEquals(30, py4jconnector._maxCollectInterval)
+        py4jconnector.setCollectionBudget(interval=20)
+        self.assertEquals(5, py4jconnector._maxNewProxies)
+        self.assertEquals(20, py4jconnector._maxCollectInterval)
+
+    def testCollectWhenProxiesExceedBudget(self):
+        self.addProxies(10)
+        py4jconnector._collectIfNeeded()
+        self.assertEquals(0, self.collector.collections)
+        self.addProxies(1)
+        py4jconnector._collectIfNeeded()
+        self.assertEquals(1, self.collector.collections)
+        py4jconnector._collectIfNeeded()
+        self.assertEquals(1, self.collector.collections)
+
+    def testCollectWhenIntervalIsExceeded(self):
+        self.clock.now += 60
+        py4jconnector._collectIfNeeded()
+        self.assertEquals(0, self.collector.collections)
+        self.clock.now += 1
+        py4jconnector._collectIfNeeded()
+        self.assertEquals(1, self.collector.collections)
+        self.clock.now += 30
+        py4jconnector._collectIfNeeded()
+        self.assertEquals(1, self.collector.collections)
+
+    def testChangedBudgetIsUsed(self):
+        self.addProxies(3)
+        py4jconnector._collectIfNeeded()
+        self.assertEquals(0, self.collector.collections)
+        py4jconnector.setCollectionBudget(maxproxies=2, interval=5)
+        py4jconnector._collectIfNeeded()
+        self.assertEquals(1, self.collector.collections)
+        self.clock.now += 6
+        py4jconnector._collectIfNeeded()
+        self.assertEquals(2, self.collector.collections)
+
+    def testJavaArrayIsCreatedBySplitting(self):
+        gateway = _Gateway()
+        compiled = _Gateway.jvm.java.util.regex.Pattern.compiled
+        commands = ["log", "--path", "parks", ""]
+        self.assertEquals(commands, py4jconnector._javaArray(gateway, commands))
+        self.assertEquals(commands, py4jconnector._javaArray(gateway, commands))
+        self.assertEquals(0, gateway.newarrays)
+        self.assertEquals(compiled + 1, _Gateway.jvm.java.util.regex.Pattern.compiled)
+
+    def testJavaArrayWithSeparatorInArguments(self):
+        gateway = _Gateway()
+        commands = ["commit", "-m", "a" + py4jconnector._ARGS_SEPARATOR + "b"]
+        self.assertEquals(commands, py4jconnector._javaArray(gateway, commands))
+        self.assertEquals(1, gateway.newarrays)
+        self.assertEquals([], py4jconnector._javaArray(gateway, []))
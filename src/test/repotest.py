@@ -31,6 +31,9 @@ from geogigpy.geogigexception import GeoGigException, GeoGigConflictException
 from geogigpy.commitish import Commitish
 from geogigpy.diff import TYPE_MODIFIED
 from geogigpy.feature import Feature
+from geogigpy.commit import Commit
+from geogigpy.connector import Connector
+import hashlib
 import unittest
 from geogigpy import geogig
 from geogigpy.osmmapping import OSMMapping, OSMMappingRule
@@ -39,6 +42,49 @@ from testrepo import testRepo
 from geogigpy.geometry import Geometry
 
 
+def _id(name):
+    return hashlib.sha1(name).hexdigest()
+
+
+class _BlameConnector(Connector):
+    '''
+    A connector with a history where parks/1 is added in the root commit, parks/2 in a commit
+    with a single parent, parks/3 and parks/4 in a merge commit, and parks/1 and parks/3 are
+    then modified. blame is only available for parks/4
+    '''
+
+    _features = {"root": ["parks/1"], "tip": ["parks/1", "parks/2", "parks/3", "parks/4"]}
+    _diffs = {"tip": [("parks/1", set(["name"])), ("parks/3", set(["area"]))],
+              "second": [("parks/2", set(["name", "area"]))]}
+
+    def checkisrepo(self):
+        pass
+
+    def iterchildren(self, ref, path=None, recursive=False):
+        name = "root" if ref == _id("root") else "tip"
+        for fpath in self._features[name]:
+            feature = Feature(self.repo, ref, fpath)
+            feature._attributes = {"name": fpath, "area": 1.0}
+            yield feature
+
+    def iterlog(self, tip, sincecommit=None, until=None, since=None, path=None, n=None):
+        date = datetime.datetime(2016, 10, 1)
+        history = [("tip", ["merge"]), ("merge", ["second", "other"]), ("second", ["root"]),
+                   ("root", [geogig.NULL_ID])]
+        for name, parents in history:
+            parents = [p if p == geogig.NULL_ID else _id(p) for p in parents]
+            yield Commit(self.repo, _id(name), None, parents, "", name, date, name, date)
+
+    def iterchangedattributes(self, path, refa, refb):
+        names = dict((_id(n), n) for n in self._diffs)
+        return iter(self._diffs.get(names.get(refb), []))
+
+    def blame(self, path):
+        if path != "parks/4":
+            raise GeoGigException("Unexpected blame")
+        return {"name": ("parks/4", _id("merge"), "merge"), "area": ("1.0", _id("merge"), "merge")}
+
+
 class GeogigRepositoryTest(unittest.TestCase):
 
     repo = testRepo()
@@ -84,6 +130,49 @@ class GeogigRepositoryTest(unittest.TestCase):
         self.assertEquals("user", commits[0].authorname)
         # TODO: add more
 
+    def testIterLog(self):
+        commits = list(self.repo.iterlog("conflicted"))
+        self.assertEquals(4, len(commits))
+        self.assertEquals("message_5", commits[0].message)
+
+    def testIterLogStopEarly(self):
+        for commit in self.repo.iterlog("conflicted"):
+            break
+        self.assertEquals("message_5", commit.message)
+        self.assertEquals(4, len(self.repo.log("conflicted")))
+
+    def testLogIsExtendedAfterCommit(self):
+        repo = self.getClonedRepo()
+        log = repo.log()
+        path = os.path.join(os.path.dirname(__file__), "data", "shp", "1", "parks.shp")
+        repo.importshp(path)
+        repo.addandcommit("new_message")
+        ncommands = len(repo.connector.commandslog)
+        newlog = repo.log()
+        self.assertEquals(5, len(newlog))
+        self.assertEquals("new_message", newlog[0].message)
+        self.assertEquals([c.commitid for c in log], [c.commitid for c in newlog[1:]])
+        revlists = [c for c in repo.connector.commandslog[ncommands:] if c.startswith("rev-list")]
+        self.assertEquals(1, len(revlists))
+        self.assertTrue(".." in revlists[0])
+
+    def testLogAfterMerge(self):
+        repo = self.getClonedRepo()
+        repo.log()
+        repo.merge("unconflicted")
+        log = repo.log()
+        expected = repo.connector.log(repo.revparse(geogig.HEAD))
+        self.assertEquals([c.commitid for c in expected], [c.commitid for c in log])
+        self.assertEquals([c.commitid for c in expected[:3]], [c.commitid for c in repo.log(n=3)])
+
+    def testFilteredLogFromCache(self):
+        repo = self.getClonedRepo()
+        log = repo.log()
+        ncommands = len(repo.connector.commandslog)
+        self.assertEquals([c.commitid for c in log[:2]], [c.commitid for c in repo.log(n=2)])
+        self.assertEquals([c.commitid for c in log[:1]], [c.commitid for c in repo.log(sincecommit=log[1].commitid)])
+        self.assertEquals(ncommands, len(repo.connector.commandslog))
+
     def testLogInBranch(self):
         entries = self.repo.log("conflicted")
         self.assertEquals(4, len(entries))
@@ -131,6 +220,14 @@ class GeogigRepositoryTest(unittest.TestCase):
         self.assertEquals("parks/5", feature.path)
         self.assertEquals("HEAD", feature.ref)
 
+    def testIterFeatures(self):
+        features = self.repo.iterfeatures(path="parks")
+        feature = features.next()
+        self.assertEquals("parks/5", feature.path)
+        # run other commands while the output is being read
+        self.assertEquals(8, len(feature.attributes))
+        self.assertEquals(4, len(list(features)))
+
     def testChildren(self):
         children = self.repo.children()
         self.assertEquals(1, len(children))
@@ -143,6 +240,10 @@ class GeogigRepositoryTest(unittest.TestCase):
         self.assertEquals("parks/5", diffs[0].path)
         self.assertEquals(TYPE_MODIFIED, diffs[0].type())
 
+    def testIterDiff(self):
+        diffs = list(self.repo.iterdiff("HEAD", "HEAD~3"))
+        self.assertEquals(2, len(diffs))
+
     def testDiffWithPath(self):
         repo = self.getClonedRepo()
         diffs = repo.diff("HEAD", "HEAD~3")
@@ -228,6 +329,33 @@ class GeogigRepositoryTest(unittest.TestCase):
         for k, v in blame.iteritems():
             self.assertTrue(v[0], attrs[k])
 
+    def testBlameMany(self):
+        blames = dict(self.repo.blamemany("parks"))
+        self.assertEquals(5, len(blames))
+        blame = self.repo.blame("parks/5")
+        self.assertEquals(sorted(blame.keys()), sorted(blames["parks/5"].keys()))
+        for k, v in blame.iteritems():
+            self.assertEquals(v[1:], blames["parks/5"][k][1:])
+
+    def testBlameManyFeaturesChangedByMerges(self):
+        repo = Repository("repo", _BlameConnector())
+        blames = dict(repo.blamemany("parks", _id("tip")))
+        authors = dict((fpath, dict((name, b[2]) for name, b in blame.iteritems()))
+                       for fpath, blame in blames.iteritems())
+        self.assertEquals({"name": "tip", "area": "root"}, authors["parks/1"])
+        self.assertEquals({"name": "second", "area": "second"}, authors["parks/2"])
+        self.assertEquals({"name": "tip", "area": "tip"}, authors["parks/3"])
+        self.assertEquals({"name": "merge", "area": "merge"}, authors["parks/4"])
+        self.assertEquals(1.0, blames["parks/4"]["area"][0])
+
+    def testBlameManyDoesNotQueryFeatureTypes(self):
+        repo = self.getClonedRepo()
+        ncommands = len(repo.connector.commandslog)
+        dict(repo.blamemany("parks"))
+        commands = repo.connector.commandslog[ncommands:]
+        self.assertTrue(any(c.startswith("diff-tree") for c in commands))
+        self.assertFalse([c for c in commands if c.startswith("show") and "--raw" not in c])
+
     def testVersions(self):
         versions = self.repo.versions("parks/5")
         self.assertEquals(2, len(versions))
@@ -257,6 +385,30 @@ class GeogigRepositoryTest(unittest.TestCase):
         attrs = Feature(repo, geogig.WORK_HEAD, "parks/1").attributes
         self.assertEquals(1234.5, attrs["area"])
 
+    def testTreeDiff(self):
+        repo = self.getClonedRepo()
+        attrs = Feature(repo, geogig.HEAD, "parks/1").attributes
+        attrs["area"] = 1234.5
+        repo.insertfeature("parks/1", attrs)
+        attribs, features = repo.treediff("parks", geogig.HEAD, geogig.WORK_HEAD)
+        self.assertEquals(1, len(features))
+        self.assertEquals(len(attribs), len(features[0]))
+        changes = dict(zip(attribs.keys(), features[0]))
+        self.assertEquals(("M", attrs["area"]), (changes["area"][0], changes["area"][2]))
+
+    def testIterTreeDiff(self):
+        repo = self.getClonedRepo()
+        attrs = Feature(repo, geogig.HEAD, "parks/1").attributes
+        attrs["area"] = 1234.5
+        repo.insertfeature("parks/1", attrs)
+        diffs = list(repo.itertreediff("parks", geogig.HEAD, geogig.WORK_HEAD, skipunchanged=True))
+        self.assertEquals(1, len(diffs))
+        path, changes = diffs[0]
+        self.assertEquals("parks/1", path)
+        self.assertEquals(["area"], changes.keys())
+        diffs = list(repo.itertreediff("parks", geogig.HEAD, geogig.WORK_HEAD, attributes=["name"]))
+        self.assertEquals(["name"], diffs[0][1].keys())
+
     def testAddFeature(self):
         repo = self.getClonedRepo()
         attrs = Feature(repo, geogig.HEAD, "parks/1").attributes
@@ -264,6 +416,25 @@ class GeogigRepositoryTest(unittest.TestCase):
         newattrs = Feature(repo, geogig.WORK_HEAD, "parks/newfeature").attributes
         self.assertAlmostEqual(attrs["area"], newattrs["area"], 5)
 
+    def testInsertFeaturesFromIterator(self):
+        repo = self.getClonedRepo()
+        attrs = Feature(repo, geogig.HEAD, "parks/1").attributes
+        features = (("parks/new%i" % i, attrs) for i in range(5))
+        repo.insertfeatures(features)
+        for i in range(5):
+            self.assertTrue(Feature(repo, geogig.WORK_HEAD, "parks/new%i" % i).exists())
+
+    def testInsertFeaturesInBatches(self):
+        repo = self.getClonedRepo()
+        attrs = Feature(repo, geogig.HEAD, "parks/1").attributes
+        features = (("parks/new%i" % i, attrs) for i in range(5))
+        repo.insertfeatures(features, batchsize=2, message="batch")
+        log = repo.log()
+        self.assertEqual(7, len(log))
+        self.assertEqual("batch", log[0].message)
+        self.assertFalse(repo.staged())
+        self.assertFalse(repo.unstaged())
+
     def testRemoveFeature(self):
         repo = self.getClonedRepo()
         repo.removefeatures(["parks/1"])
@@ -272,6 +443,57 @@ class GeogigRepositoryTest(unittest.TestCase):
         f = Feature(repo, geogig.STAGE_HEAD, "parks/1")
         self.assertFalse(f.exists())
 
+    def testAddManyPaths(self):
+        repo = self.getClonedRepo()
+        attrs = Feature(repo, geogig.HEAD, "parks/1").attributes
+        paths = ["parks/new%i" % i for i in range(10)]
+        for path in paths:
+            repo.insertfeature(path, attrs)
+        repo.add(paths)
+        self.assertEquals(10, len(repo.staged()))
+        self.assertFalse(repo.unstaged())
+
+    def testRemovePathsInChunks(self):
+        repo = self.getClonedRepo()
+        paths = ["parks/%i" % i for i in range(1, 6)]
+        repo.connector.maxcommandlength = 40
+        ncommands = len(repo.connector.commandslog)
+        repo.removefeatures(paths)
+        rms = [c for c in repo.connector.commandslog[ncommands:] if c.startswith("rm")]
+        self.assertTrue(len(rms) > 1)
+        self.assertTrue(all(len("geogig %s --color never" % c) <= 40 for c in rms))
+        self.assertFalse(any(Feature(repo, geogig.WORK_HEAD, p).exists() for p in paths))
+
+    def testRemoveFeaturesDoesNotModifyPaths(self):
+        repo = self.getClonedRepo()
+        paths = ["parks/1", "parks/2"]
+        repo.removefeatures(paths)
+        self.assertEquals(["parks/1", "parks/2"], paths)
+        self.assertFalse(Feature(repo, geogig.WORK_HEAD, "parks/2").exists())
+
+    def testAheadBehind(self):
+        repo = self.getClonedRepo()
+        self.assertEquals((0, 0), repo.aheadbehind(geogig.HEAD, geogig.HEAD))
+        self.assertEquals((1, 0), repo.aheadbehind(geogig.HEAD, geogig.HEAD + "~1"))
+        self.assertEquals((0, 3), repo.aheadbehind(geogig.HEAD + "~3", geogig.HEAD))
+
+    def testIsAncestor(self):
+        repo = self.getClonedRepo()
+        self.assertTrue(repo.isancestor(geogig.HEAD + "~1", geogig.HEAD))
+        self.assertFalse(repo.isancestor(geogig.HEAD, geogig.HEAD + "~1"))
+
+    def testCommonAncestor(self):
+        repo = self.getClonedRepo()
+        ancestor = repo.commonancestor(geogig.HEAD, geogig.HEAD + "~2")
+        self.assertEquals(repo.revparse(geogig.HEAD + "~2"), ancestor.ref)
+
+    def testCommitGraphIsPersisted(self):
+        repo = self.getClonedRepo()
+        repo.isancestor(geogig.HEAD + "~1", geogig.HEAD)
+        self.assertTrue(os.path.exists(os.path.join(repo.url, ".geogig", "commitgraph")))
+        repo2 = Repository(repo.url)
+        self.assertEquals(4, len(repo2.commitgraph))
+
     def testConflicts(self):
         repo = self.getClonedRepo()
         try:
@@ -542,6 +764,14 @@ class GeogigRepositoryTest(unittest.TestCase):
         count = self.repo.count(geogig.HEAD, "parks")
         self.assertEquals(5, count)
 
+    def testTreeCounts(self):
+        headid = self.repo.revparse(geogig.HEAD)
+        counts = self.repo.treecounts(headid)
+        self.assertEquals(5, counts["parks"])
+        ncommands = len(self.repo.connector.commandslog)
+        self.assertEquals(5, self.repo.count(headid, "parks"))
+        self.assertEquals(ncommands, len(self.repo.connector.commandslog))
+
     def testResetHard(self):
         repo = self.getClonedRepo()
         repo.reset(repo.head.parent.ref, geogig.RESET_MODE_HARD)
@@ -561,6 +791,16 @@ class GeogigRepositoryTest(unittest.TestCase):
         self.assertEqual("STRING", ftype["name"])
         self.assertEqual("MULTIPOLYGON", ftype["the_geom"])
 
+    def testFeatureTypeIsCached(self):
+        repo = self.getClonedRepo()
+        headid = repo.revparse(geogig.HEAD)
+        ftype = repo.featuretype(headid, "parks")
+        ncommands = len(repo.connector.commandslog)
+        self.assertEqual(ftype, repo.featuretype(headid, "parks"))
+        repo.treediff("parks", headid, headid)
+        shows = [c for c in repo.connector.commandslog[ncommands:] if c.startswith("show")]
+        self.assertFalse(shows)
+
     def testSynced(self):
         repo = self.getClonedRepo()
         path = os.path.join(os.path.dirname(__file__), "data", "shp", "1", "parks.shp")
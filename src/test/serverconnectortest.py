@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    serverconnectortest.py
+    ---------------------
+    Date                 : October 2016
+    Copyright            : (C) 2016 Boundless, http://boundlessgeo.com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Victor Olaya'
+__date__ = 'October 2016'
+__copyright__ = '(C) 2016 Boundless, http://boundlessgeo.com'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import json
+import time
+import threading
+import unittest
+import requests
+import BaseHTTPServer
+import SocketServer
+from geogigpy.repo import Repository
+from geogigpy import geogigserverconnector
+from geogigpy.geogigserverconnector import GeoGigServerConnector
+
+COMMITID = "a" * 40
+PARENTID = "b" * 40
+
+
+class _ServerHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    '''A stand-in for the geogig web API, answering just the requests used by the server connector'''
+
+    protocol_version = "HTTP/1.1"
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+        self.server.connections += 1
+
+    def do_GET(self):
+        self.server.auths.append(self.headers.get("Authorization"))
+        if "/refparse" in self.path:
+            body = "<response><Ref><objectId>%s</objectId></Ref></response>" % COMMITID
+            contenttype = "text/xml"
+        else:
+            commit = {"sha": COMMITID, "parent": [PARENTID], "message": "message",
+                      "author": {"name": "user", "date": 0},
+                      "committer": {"name": "user", "date": 0}}
+            body = json.dumps({"currentBranch": "master", "commits": [commit]})
+            contenttype = "application/json"
+        self.send_response(200)
+        self.send_header("Content-Type", contenttype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self):
+        BaseHTTPServer.HTTPServer.__init__(self, ("127.0.0.1", 0), _ServerHandler)
+        self.connections = 0
+        self.auths = []
+        self.url = "http://127.0.0.1:%i/repos/test" % self.server_address[1]
+
+
+def closeConnections():
+    for session in geogigserverconnector._sessions.values():
+        session.close()
+
+
+def startServer():
+    server = _Server()
+    t = threading.Thread(target=server.serve_forever)
+    t.daemon = True
+    t.start()
+    return server
+
+
+class GeogigServerConnectorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = startServer()
+
+    def tearDown(self):
+        closeConnections()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def testLog(self):
+        repo = Repository(self.server.url, GeoGigServerConnector())
+        log = repo.log(COMMITID, n=1)
+        self.assertEquals(1, len(log))
+        self.assertEquals(COMMITID, log[0].commitid)
+
+    def testConnectionsAreReused(self):
+        for i in range(5):
+            repo = Repository(self.server.url, GeoGigServerConnector())
+            repo.revparse("master")
+        self.assertEquals(1, self.server.connections)
+
+    def testCredentials(self):
+        repo = Repository(self.server.url, GeoGigServerConnector(("user", "pass")))
+        repo.revparse("master")
+        self.assertTrue(len(self.server.auths) > 1)
+        for auth in self.server.auths:
+            self.assertTrue(auth.startswith("Basic"))
+
+
+def benchmark(n=500):
+    '''Compares the time per request of the server connector with that of standalone requests'''
+    server = startServer()
+    try:
+        start = time.time()
+        for i in range(n):
+            requests.get(server.url + "/refparse", params={"name": "master"})
+        standalone = (time.time() - start) / n
+        connector = GeoGigServerConnector()
+        repo = Repository(server.url, connector)
+        start = time.time()
+        for i in range(n):
+            connector.revparse("master")
+        pooled = (time.time() - start) / n
+    finally:
+        closeConnections()
+        server.shutdown()
+        server.server_close()
+    print "standalone requests: %.3f ms/request" % (standalone * 1000)
+    print "server connector: %.3f ms/request" % (pooled * 1000)
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -29,6 +29,7 @@ import unittest
 import os
 import time
 from geogigpy.tree import Tree
+from geogigpy.featuretable import PATH_COLUMN
 from geogigpy import geogig
 from testrepo import testRepo
 
@@ -56,9 +57,39 @@ class GeogigTreeTest(unittest.TestCase):
         features = tree.features
         self.assertEquals(5, len(features))
 
+    def testFeatureTable(self):
+        tree = Tree(self.repo, geogig.HEAD, "parks")
+        table = tree.featuretable()
+        self.assertEquals(5, len(table["name"]))
+        self.assertEquals(5, len(table["the_geom"]))
+        self.assertEquals(sorted(f.path for f in tree.features), sorted(table[PATH_COLUMN]))
+
+    def testCountOfListedTree(self):
+        tree = [t for t in self.repo.trees if t.path == "parks"][0]
+        ncommands = len(self.repo.connector.commandslog)
+        self.assertEquals(5, tree.count)
+        self.assertEquals(ncommands, len(self.repo.connector.commandslog))
+
+    def testCountOfWorkingTree(self):
+        repo = self.getClonedRepo()
+        tree = Tree(repo, geogig.WORK_HEAD, "parks")
+        self.assertEquals(5, tree.count)
+        attrs = repo.feature(geogig.HEAD, "parks/1").attributes
+        repo.insertfeature("parks/newfeature", attrs)
+        self.assertEquals(6, tree.count)
+
     def testFeatureType(self):
         tree = Tree(self.repo, geogig.HEAD, "parks")
         ftype = tree.featuretype
         self.assertEqual("DOUBLE", ftype["perimeter"])
         self.assertEqual("STRING", ftype["name"])
         self.assertEqual("MULTIPOLYGON", ftype["the_geom"])
+
+    def testFeatureTypeOfListedTree(self):
+        tree = [t for t in self.repo.trees if t.path == "parks"][0]
+        self.assertTrue(tree.ftypeid is not None)
+        ncommands = len(self.repo.connector.commandslog)
+        ftype = tree.featuretype
+        self.assertEqual("STRING", ftype["name"])
+        ftype = tree.featuretype
+        self.assertTrue(len(self.repo.connector.commandslog) - ncommands <= 1)